@@ -7,6 +7,9 @@ from routes.fertilizer import fertilizer_bp
 from routes.fertilizer_raw import fertilizer_raw_bp
 from routes.weather import weather_bp
 from routes.chat import chat_bp
+from routes.health import health_bp
+from routes.crops import crops_bp
+from services.fertilizer_manager import start_recommendation_refresher
 
 load_dotenv()
 app = Flask(__name__)
@@ -17,6 +20,15 @@ app.register_blueprint(fertilizer_bp)
 app.register_blueprint(fertilizer_raw_bp)
 app.register_blueprint(weather_bp)
 app.register_blueprint(chat_bp)
+app.register_blueprint(health_bp)
+app.register_blueprint(crops_bp)
+
+# 저장된 비료 추천 백그라운드 갱신: import 시점이 아니라 요청을 처리하는 워커에서 시작
+# (gunicorn --preload의 master에서 시작한 스레드는 fork 후 사라짐, 노드당 잠금을 잡은 워커 1개만 실행)
+if os.getenv('RECOMMENDATION_REFRESH_ENABLED', 'true').lower() == 'true':
+    @app.before_request
+    def _start_background_refresh():
+        start_recommendation_refresher()
 
 if __name__ == '__main__':
     port = int(os.environ.get('PORT', 5001))
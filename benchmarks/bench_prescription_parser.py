@@ -0,0 +1,91 @@
+"""
+처방 XML 파서 마이크로 벤치마크
+기존 경로(xmltodict 전체 변환 + 라우트의 ElementTree.fromstring 재파싱)와
+단일 패스 파서(utils.prescription_parser)를 비교
+
+실행: python benchmarks/bench_prescription_parser.py [반복 횟수]
+"""
+import os
+import sys
+import timeit
+import xml.etree.ElementTree as ET
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import xmltodict  # noqa: E402
+
+from utils.fertilizer_records import PRESCRIPTION_FIELDS, Prescription  # noqa: E402
+from utils.prescription_parser import parse_prescription_xml  # noqa: E402
+
+ITEM = (
+    "<item><crop_Code>01001</crop_Code><crop_Nm>맥주보리</crop_Nm>"
+    "<pre_Fert_N>4.9</pre_Fert_N><pre_Fert_P>24.8</pre_Fert_P><pre_Fert_K>3.0</pre_Fert_K>"
+    "<post_Fert_N>3.3</post_Fert_N><post_Fert_P>0.0</post_Fert_P><post_Fert_K>0.0</post_Fert_K>"
+    "<pre_Compost_Cattl>1500</pre_Compost_Cattl><pre_Compost_Pig>330</pre_Compost_Pig>"
+    "<pre_Compost_Chick>255</pre_Compost_Chick><pre_Compost_Mix>488</pre_Compost_Mix></item>"
+)
+
+SAMPLES = {
+    "response": (
+        '<?xml version="1.0" encoding="UTF-8"?><response><header><result_Code>200</result_Code>'
+        f"<result_Msg>OK</result_Msg></header><body><items>{ITEM}</items></body></response>"
+    ),
+    "OpenAPI_ServiceResponse": (
+        '<?xml version="1.0" encoding="UTF-8"?><OpenAPI_ServiceResponse><cmmMsgHeader>'
+        f"<errMsg></errMsg></cmmMsgHeader><body><items>{ITEM}</items></body></OpenAPI_ServiceResponse>"
+    ),
+    "SERVICE ERROR": (
+        "<OpenAPI_ServiceResponse><cmmMsgHeader><errMsg>SERVICE ERROR</errMsg>"
+        "<returnAuthMsg>SERVICE_KEY_IS_NOT_REGISTERED_ERROR</returnAuthMsg>"
+        "<returnReasonCode>30</returnReasonCode></cmmMsgHeader></OpenAPI_ServiceResponse>"
+    ),
+}
+
+
+def legacy_parse(xml_content):
+    """기존 경로: xmltodict 전체 변환 후 필드 추출 + 라우트에서 ElementTree로 재파싱"""
+    try:
+        content = xmltodict.parse(xml_content)
+        if 'response' in content:
+            envelope = content['response']
+            header = envelope.get('header', {})
+            if (header.get('result_Code') or header.get('resultCode')) != '200':
+                return None
+        else:
+            envelope = content.get('OpenAPI_ServiceResponse', {})
+            if envelope.get('cmmMsgHeader', {}).get('errMsg', '') == 'SERVICE ERROR':
+                return None
+        items = envelope.get('body', {}).get('items', {})
+        item = items['item'] if isinstance(items, dict) and 'item' in items else items
+        if isinstance(item, list):
+            item = item[0]
+        if not item:
+            return None
+        result = {field: item.get(field) for field in PRESCRIPTION_FIELDS}
+    except Exception:
+        return None
+    root = ET.fromstring(xml_content)
+    route_item = root.find('.//item')
+    route_item.findtext('crop_Nm')
+    for tag in ('pre_Compost_Cattl', 'pre_Compost_Chick', 'pre_Compost_Mix', 'pre_Compost_Pig'):
+        float(route_item.findtext(tag))
+    return result
+
+
+def main():
+    number = int(sys.argv[1]) if len(sys.argv) > 1 else 20000
+    print(f"{'응답 형태':<26}{'기존(µs)':>12}{'단일 패스(µs)':>16}{'배속':>8}")
+    for name, xml in SAMPLES.items():
+        legacy = legacy_parse(xml)
+        parsed = parse_prescription_xml(xml)
+        if legacy is not None:
+            assert parsed.to_dict() == Prescription.from_api_fields(legacy).to_dict(), name
+        else:
+            assert not parsed.success, name
+        legacy_us = min(timeit.repeat(lambda: legacy_parse(xml), number=number, repeat=3)) / number * 1e6
+        single_us = min(timeit.repeat(lambda: parse_prescription_xml(xml), number=number, repeat=3)) / number * 1e6
+        print(f"{name:<26}{legacy_us:>12.1f}{single_us:>16.1f}{legacy_us / single_us:>7.1f}x")
+
+
+if __name__ == "__main__":
+    main()
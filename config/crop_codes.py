@@ -311,12 +311,14 @@ CROP_CODES = {
 CODE_TO_CROP = {v: k for k, v in CROP_CODES.items()}
 
 def get_crop_code(crop_name):
-    """작물명으로 코드 조회"""
-    return CROP_CODES.get(crop_name)
+    """작물명으로 코드 조회 (utils.crop_registry: 정확/정규화 일치, 없으면 None)"""
+    from utils.crop_registry import crop_registry
+    return crop_registry.code(crop_name)
 
 def get_crop_name(crop_code):
-    """코드로 작물명 조회"""
-    return CODE_TO_CROP.get(crop_code)
+    """코드로 작물명 조회 (작물코드표 대표 이름)"""
+    from utils.crop_registry import crop_registry
+    return crop_registry.name(crop_code)
 
 def get_available_crops():
     """사용 가능한 작물 목록 반환"""
@@ -18,6 +18,7 @@ SAMPLE_USER = {
 # farm 컬렉션 샘플  
 SAMPLE_FARM = {
     "_id": "farm001",
+    "userid": "user001",
     "name": "김농부네 농장",
     "address": "경기도 구리시 인창동 123-45",
     "stn": 108,
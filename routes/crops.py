@@ -0,0 +1,20 @@
+from flask import Blueprint, request, jsonify
+from utils.crop_search import SEARCH_LIMIT, SEARCH_MAX_LIMIT, crop_search
+
+crops_bp = Blueprint('crops', __name__)
+
+@crops_bp.route('/api/crops', methods=['GET'])
+def search_crops():
+    """작물 자동완성 (prefix: 입력 중인 작물명, 초성/미완성 음절 가능)"""
+    prefix = request.args.get('prefix', '')
+    try:
+        limit = int(request.args.get('limit', SEARCH_LIMIT))
+    except ValueError:
+        return jsonify({"status": "error", "message": "limit은 정수여야 합니다."}), 400
+    result = crop_search.search(prefix, min(max(limit, 0), SEARCH_MAX_LIMIT))
+    return jsonify({
+        "status": "success",
+        "prefix": prefix,
+        "total": result["total"],
+        "crops": result["crops"]
+    })
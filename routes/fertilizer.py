@@ -1,121 +1,106 @@
-from flask import Blueprint, request, jsonify
-from config.user_data import USER_DATA
+import itertools
+import json
+import math
+import os
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+
+import numpy as np
+from flask import Blueprint, Response, request, jsonify
+from services.farm_repository import FarmNotFoundError, InvalidFarmIdError, find_farm_context
+from services.fertilizer_manager import request_farm_refresh
 from services.soil_fertilizer_service import SoilFertilizerService
-from utils.crop_mapper import get_crop_code
-import os, json
-import xml.etree.ElementTree as ET
+from utils.crop_registry import crop_registry
+from utils.fertilizer_recommender import (
+    recommend_fertilizers, recommend_fertilizers_many, recommend_fertilizer_blend
+)
 
 fertilizer_bp = Blueprint('fertilizer', __name__)
 
-@fertilizer_bp.route('/api/fertilizer-recommendation', methods=['POST'])
-def get_fertilizer_recommendation():
-    data = request.get_json() if request.is_json else {}
-    crop_name = data.get('cropname', USER_DATA.get('crop', {}).get('name', '맥주보리'))
-    field_id = data.get('farmid', 'farm001')
-    farm_list = USER_DATA.get('farms', [])
-    farm = next((f for f in farm_list if f.get('_id') == field_id), USER_DATA.get('farm', {}))
-    area_sqm = farm.get('area_m2', USER_DATA.get('farm_size_a', 250) * 100)
-    soil_data = farm.get('soil', USER_DATA.get('soil', {}))
+# 배치 요청당 최대 작업 수
+FERTILIZER_BATCH_MAX_JOBS = int(os.getenv('FERTILIZER_BATCH_MAX_JOBS', 500))
+# 배치 처방 API 동시 호출 수
+FERTILIZER_BATCH_WORKERS = int(os.getenv('FERTILIZER_BATCH_WORKERS', 8))
+# 스트리밍 요청당 최대 작업 수 (결과를 모아두지 않으므로 배치보다 크게 허용)
+FERTILIZER_STREAM_MAX_JOBS = int(os.getenv('FERTILIZER_STREAM_MAX_JOBS', 10000))
+# 토양 민감도 분석 최대 격자점 수
+FERTILIZER_SWEEP_MAX_POINTS = int(os.getenv('FERTILIZER_SWEEP_MAX_POINTS', 2500))
+# 저장된 추천 증분 재계산 요청당 최대 농장 수
+FERTILIZER_REFRESH_MAX_FARMS = int(os.getenv('FERTILIZER_REFRESH_MAX_FARMS', 5000))
+
+# 배합 추천 최대 제품 수 (BlendSolver가 푸는 배합 크기)
+BLEND_MAX_PRODUCTS = 3
+
+# 민감도 분석 격자점별 최대 추천 제품 수
+SWEEP_MAX_TOP_N = 10
+
+# 민감도 분석에 사용할 수 있는 토양 항목 (SoilFertilizerService.prescription_key에 반영되는 soil 키)
+SWEEP_PARAMS = ('ph', 'om', 'vldpha', 'posifert_K', 'posifert_Ca', 'posifert_Mg', 'selc')
+
+
+def _resolve_job(data):
+    """
+    요청(또는 배치 작업) 데이터에서 농장/작물/토양 정보 구성 (농장은 저장소에서 농장 ID로 조회)
+
+    Raises:
+        InvalidFarmIdError, FarmNotFoundError: farmid 형식 오류 / 저장소에 없는 농장
+    """
+    context = find_farm_context(data.get('farmid'))
+    crop_name = data.get('cropname', (context.crop_names or ['맥주보리'])[0])
+    farm = context.farm
+    area_sqm = context.area_m2
+    soil_data = data.get('soil') or context.soil
     farm_size_a = area_sqm / 100
-    crop_code = get_crop_code(crop_name)
+    crop_code = crop_registry.code(crop_name)
     farm_info = {
         'crop_name': crop_name,
         'crop_code': crop_code,
         'soil': soil_data,
-        'farm_size_a': farm_size_a
-    }
-    service = SoilFertilizerService()
-    raw_result = service.get_raw_public_api_result(farm_info)
-    root = ET.fromstring(raw_result)
-    item = root.find('.//item')
-    def get_float(tag):
-        if item is None:
-            return 0.0
-        val = item.findtext(tag)
-        try:
-            return float(val)
-        except:
-            return 0.0
-    def get_text(tag, default=None):
-        if item is None:
-            return default
-        return item.findtext(tag, default)
-    # 퇴비 4종류
-    total_area_10a = area_sqm / 1000
-    compost = {
-        "cattle_kg": get_float("pre_Compost_Cattl") * total_area_10a,
-        "chicken_kg": get_float("pre_Compost_Chick") * total_area_10a,
-        "mixed_kg": get_float("pre_Compost_Mix") * total_area_10a,
-        "pig_kg": get_float("pre_Compost_Pig") * total_area_10a
+        'farm_size_a': farm_size_a,
+        'farm_size_10a': area_sqm / 1000
     }
+    return farm, farm_info
 
 
-    # 비료 추천 로직
-    service = SoilFertilizerService()
-    base_fertilizers = []
-    topdress_fertilizers = []
-    composts = []
+def _int_param(data, name, default):
+    """요청 본문의 정수 항목 → (값, 오류 메시지) (없으면 default, 정수가 아니면 오류)"""
+    value = data.get(name, default)
+    error = f"{name}은(는) 정수여야 합니다."
+    if isinstance(value, bool) or (isinstance(value, float) and not value.is_integer()):
+        return None, error
+    try:
+        return int(value), None
+    except (TypeError, ValueError):
+        return None, error
 
-    # 처방 API 호출 및 필요량 추출
-    prescription = service.fetch_fertilizer_api(farm_info)
 
-    from utils.fertilizer_recommender import recommend_fertilizers
-    base_fertilizers = recommend_fertilizers(service, prescription, "base", 3)
-    topdress_fertilizers = recommend_fertilizers(service, prescription, "topdress", 3)
+def _soil_error(data):
+    """요청 본문의 soil 검증 (토양 항목 객체가 아니면 오류 메시지, 생략은 농장의 최신 토양검사 사용)"""
+    soil = data.get('soil')
+    if soil is not None and not isinstance(soil, dict):
+        return "soil은 토양 항목 객체여야 합니다."
+    return None
+
+
+def _farm_lookup_error(error):
+    """농장 조회 오류 응답 (farmid 형식 오류 400, 저장소에 없는 농장 404)"""
+    status = 404 if isinstance(error, FarmNotFoundError) else 400
+    return jsonify({"status": "error", "message": str(error)}), status
+
+
+def _fertilizer_list(fertilizers):
+    """비료 추천 결과(ProductRecommendation)를 응답 형식으로 변환"""
+    return [fert.to_dict() for fert in fertilizers]
+
 
-    # 퇴비 추천
-    for comp in compost.items():
-        composts.append({
-            "name": comp[0],
-            "amount": comp[1],
-            "unit": "kg",
-            "type": "compost"
-        })
-
-    # 작물 코드
-    crop_code = get_crop_code(crop_name)
-
-    # 밑거름 비료 목록
-    base_list = []
-    for fert in base_fertilizers:
-        base_list.append({
-            "K_ratio": fert.get("K_ratio", 0),
-            "N_ratio": fert.get("N_ratio", 0),
-            "P_ratio": fert.get("P_ratio", 0),
-            "bags": fert.get("bags", 0),
-            "fertilizer_id": fert.get("fertilizer_id", fert.get("_id", "")),
-            "fertilizer_name": fert.get("fertilizer_name", fert.get("name", "")),
-            "need_K_kg": fert.get("need_K_kg", 0),
-            "need_N_kg": fert.get("need_N_kg", 0),
-            "need_P_kg": fert.get("need_P_kg", 0),
-            "shortage_K_kg": fert.get("shortage_K_kg", 0),
-            "shortage_P_kg": fert.get("shortage_P_kg", 0),
-            "usage_kg": fert.get("usage_kg", fert.get("amount", fert.get("bag_kg", 0)))
-        })
-
-    # 웃거름 비료 목록
-    additional_list = []
-    for fert in topdress_fertilizers:
-        additional_list.append({
-            "K_ratio": fert.get("K_ratio", 0),
-            "N_ratio": fert.get("N_ratio", 0),
-            "P_ratio": fert.get("P_ratio", 0),
-            "bags": fert.get("bags", 0),
-            "fertilizer_id": fert.get("fertilizer_id", fert.get("_id", "")),
-            "fertilizer_name": fert.get("fertilizer_name", fert.get("name", "")),
-            "need_K_kg": fert.get("need_K_kg", 0),
-            "need_N_kg": fert.get("need_N_kg", 0),
-            "need_P_kg": fert.get("need_P_kg", 0),
-            "shortage_K_kg": fert.get("shortage_K_kg", 0),
-            "shortage_P_kg": fert.get("shortage_P_kg", 0),
-            "usage_kg": fert.get("usage_kg", fert.get("amount", fert.get("bag_kg", 0)))
-        })
-
-    result_json = {
+def _recommendation_result(service, farm, farm_info, prescription, base_fertilizers, topdress_fertilizers):
+    """단건/배치 공통 추천 결과 JSON 구성"""
+    # 퇴비 4종류
+    compost = service.get_compost_amounts(prescription, farm_info)
+    return {
         "_id": farm.get("_id", "farm001"),
         "crop": {
-            "code": crop_code,
-            "name": get_text("crop_Nm", crop_name)
+            "code": farm_info['crop_code'],
+            "name": prescription.crop_name or farm_info['crop_name']
         },
         "compost": {
             "cattle_kg": compost["cattle_kg"],
@@ -124,8 +109,432 @@ def get_fertilizer_recommendation():
             "pig_kg": compost["pig_kg"]
         },
         "fertilizer": {
-            "base": base_list,
-            "additional": additional_list
+            "base": _fertilizer_list(base_fertilizers),
+            "additional": _fertilizer_list(topdress_fertilizers)
         }
     }
+
+
+@fertilizer_bp.route('/api/fertilizer-recommendation', methods=['POST'])
+def get_fertilizer_recommendation():
+    data = request.get_json() if request.is_json else {}
+    error = _soil_error(data)
+    if error:
+        return jsonify({"status": "error", "message": error}), 400
+    try:
+        farm, farm_info = _resolve_job(data)
+    except (InvalidFarmIdError, FarmNotFoundError) as e:
+        return _farm_lookup_error(e)
+    if not farm_info['crop_code']:
+        return jsonify({"status": "error", **_unknown_crop(farm_info['crop_name'])}), 400
+    service = SoilFertilizerService()
+
+    # 처방 API 호출 및 파싱 (요청당 1회, 퇴비량과 N/P/K 필요량을 모두 여기서 사용)
+    prescription = service.fetch_fertilizer_api(farm_info)
+    if not prescription.success:
+        # 처방 없이 0으로 채운 추천을 돌려주지 않음 (배치/스트림의 작업별 오류와 같은 기준)
+        return jsonify({
+            "status": "error",
+            "message": prescription.result_msg or "처방 API 조회에 실패했습니다."
+        }), 502
+
+    # 비료 추천 로직
+    base_fertilizers = recommend_fertilizers(service, prescription, "base", 3)
+    topdress_fertilizers = recommend_fertilizers(service, prescription, "topdress", 3)
+
+    result_json = _recommendation_result(
+        service, farm, farm_info, prescription, base_fertilizers, topdress_fertilizers
+    )
+    # 배합 추천 (요청 시): 1~3개 제품으로 N/P/K 과부족 최소화
+    if data.get('blend'):
+        max_products, error = _int_param(data, 'blend_max_products', BLEND_MAX_PRODUCTS)
+        if error:
+            return jsonify({"status": "error", "message": error}), 400
+        max_products = min(max(max_products, 1), BLEND_MAX_PRODUCTS)
+        result_json["blend"] = {
+            "base": recommend_fertilizer_blend(service, prescription, "base", max_products),
+            "additional": recommend_fertilizer_blend(service, prescription, "topdress", max_products)
+        }
     return jsonify(result_json)
+
+
+@fertilizer_bp.route('/api/fertilizer-recommendation/batch', methods=['POST'])
+def get_fertilizer_recommendation_batch():
+    """
+    여러 농장 × 작물 비료 추천 일괄 처리
+
+    요청: {"jobs": [{"farmid": ..., "cropname": ..., "soil": {...}}, ...]}
+    같은 처방 조건(작물 코드 + 토양)은 한 번만 조회하고, 비료 점수는 전체 작업을 한 번에 계산한다.
+    결과는 작업 순서대로 반환하며 실패한 작업은 해당 항목에만 오류를 표시한다.
+    """
+    jobs, error = _request_jobs(FERTILIZER_BATCH_MAX_JOBS)
+    if error:
+        return error
+
+    results, unique_prescriptions = run_fertilizer_batch(jobs)
+    succeeded = sum(1 for result in results if result["status"] == "success")
+    return jsonify({
+        "status": "success",
+        "results": results,
+        "summary": {
+            "total": len(jobs),
+            "succeeded": succeeded,
+            "failed": len(jobs) - succeeded,
+            "unique_prescriptions": unique_prescriptions
+        }
+    })
+
+
+@fertilizer_bp.route('/api/fertilizer-recommendation/stream', methods=['POST'])
+def stream_fertilizer_recommendations():
+    """
+    대량 비료 추천 NDJSON 스트리밍
+
+    요청 형식은 배치와 같고, 작업이 끝나는 순서대로 한 줄씩 결과를 내보낸다 (각 줄의 index로 작업 식별).
+    마지막 줄은 {"summary": {...}}. 결과를 모아두지 않으므로 작업 수와 무관하게 메모리가 일정하다.
+    """
+    jobs, error = _request_jobs(FERTILIZER_STREAM_MAX_JOBS)
+    if error:
+        return error
+    return Response(_stream_jobs(jobs), mimetype='application/x-ndjson')
+
+
+@fertilizer_bp.route('/api/fertilizer-recommendation/farms/refresh', methods=['POST'])
+def refresh_farm_recommendations():
+    """
+    저장된 농장별 비료 추천 증분 재계산 요청 (야간 전체 갱신 등)
+
+    요청: {"farms": [{"_id": ..., "area_m2": ..., "crops": [...], "soil": {토양검사 result}}, ...], "force": false}
+    또는 {"farm_ids": [...]} (농장 저장소의 농장 문서와 최신 토양검사 사용, 둘 다 생략 시 기본 농장)
+    농장들을 백그라운드 재계산 작업자에 넘기고 바로 202를 반환한다 (진행 상황은 /api/health의 background_refresh.farm).
+    토양검사 결과, 작물, 면적이 마지막 재계산과 같은 농장은 건너뛴다.
+    """
+    data = request.get_json(silent=True) or {}
+    farms = data.get('farms')
+    farm_ids = None
+    if farms is None:
+        farm_ids = data.get('farm_ids') or [None]
+        if not isinstance(farm_ids, list) or not all(_is_farm_id(farm_id) for farm_id in farm_ids):
+            return jsonify({"status": "error", "message": "farm_ids는 농장 ID 목록이어야 합니다."}), 400
+        farms = [None] * len(farm_ids)
+    elif not isinstance(farms, list) or not all(
+            isinstance(farm, dict) and _is_farm_id(farm.get('_id')) for farm in farms):
+        return jsonify({"status": "error", "message": "farms는 농장 객체 목록이어야 합니다."}), 400
+    if len(farms) > FERTILIZER_REFRESH_MAX_FARMS:
+        return jsonify({
+            "status": "error",
+            "message": f"재계산은 최대 {FERTILIZER_REFRESH_MAX_FARMS}개 농장까지 요청할 수 있습니다."
+        }), 400
+    return jsonify(request_farm_refresh(farms, farm_ids, force=bool(data.get('force')))), 202
+
+
+def _is_farm_id(value):
+    """농장 ID 형식 확인 (문자열/정수, None은 기본 농장)"""
+    return value is None or (isinstance(value, (str, int)) and not isinstance(value, bool))
+
+
+def _request_jobs(max_jobs):
+    """요청 본문의 jobs 목록 검증 (오류 시 (None, 400 응답))"""
+    data = request.get_json(silent=True) or {}
+    jobs = data.get('jobs')
+    if not isinstance(jobs, list) or not jobs:
+        return None, (jsonify({"status": "error", "message": "jobs 목록이 필요합니다."}), 400)
+    if len(jobs) > max_jobs:
+        return None, (jsonify({
+            "status": "error",
+            "message": f"배치 작업은 최대 {max_jobs}개까지 요청할 수 있습니다."
+        }), 400)
+    return jobs, None
+
+
+def _stream_jobs(jobs):
+    """작업을 워커 풀에서 실행하며 완료 순서대로 NDJSON 줄 생성 (동시 진행 작업 수 제한)"""
+    service = SoilFertilizerService()
+    workers = max(1, min(FERTILIZER_BATCH_WORKERS, len(jobs)))
+    executor = ThreadPoolExecutor(max_workers=workers)
+    pending = set()
+    succeeded = 0
+    try:
+        job_iter = enumerate(jobs)
+        while True:
+            # 완료 대기 중인 결과가 쌓이지 않도록 워커 수의 2배까지만 제출
+            for i, job in job_iter:
+                pending.add(executor.submit(_run_job, service, i, job))
+                if len(pending) >= workers * 2:
+                    break
+            if not pending:
+                break
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                result = future.result()
+                succeeded += result["status"] == "success"
+                yield json.dumps(result, ensure_ascii=False) + "\n"
+        summary = {"total": len(jobs), "succeeded": succeeded, "failed": len(jobs) - succeeded}
+        yield json.dumps({"summary": summary}, ensure_ascii=False) + "\n"
+    finally:
+        # 클라이언트 연결이 끊겨 생성기가 닫히면 대기 중인 작업은 취소
+        executor.shutdown(wait=False, cancel_futures=True)
+
+
+def _run_job(service, index, job):
+    """단일 작업 처리 (처방 조회 + 밑거름/웃거름 추천), 오류는 결과 항목으로 반환"""
+    if not isinstance(job, dict):
+        return _job_error(index, job, "작업 형식이 올바르지 않습니다.")
+    error = _soil_error(job)
+    if error:
+        return _job_error(index, job, error)
+    try:
+        farm, farm_info = _resolve_job(job)
+        if not farm_info['crop_code']:
+            return _job_error(index, job, **_unknown_crop(farm_info['crop_name']))
+        prescription = service.fetch_fertilizer_api(farm_info)
+        if not prescription.success:
+            return _job_error(index, job, prescription.result_msg or "처방 API 조회에 실패했습니다.")
+        base_fertilizers = recommend_fertilizers(service, prescription, "base", 3)
+        topdress_fertilizers = recommend_fertilizers(service, prescription, "topdress", 3)
+        result = _recommendation_result(
+            service, farm, farm_info, prescription, base_fertilizers, topdress_fertilizers
+        )
+        return {"index": index, "status": "success", **result}
+    except (InvalidFarmIdError, FarmNotFoundError) as e:
+        return _job_error(index, job, str(e))
+    except Exception as e:
+        return _job_error(index, job, f"추천 처리 중 오류: {e}")
+
+
+@fertilizer_bp.route('/api/fertilizer-recommendation/sweep', methods=['POST'])
+def sweep_fertilizer_recommendation():
+    """
+    토양 민감도 분석: 토양 항목 1~2개를 범위로 바꿔 가며 처방/추천 변화를 행렬로 반환
+
+    요청: {"cropname": ..., "farmid": ..., "soil": {...기준 토양},
+           "sweep": [{"param": "ph", "start": 5.5, "stop": 7.0, "steps": 20}, ...] (또는 "values": [...]),
+           "top_n": 3}
+    격자 전체를 캐시 처방 경로로 동시 조회하고 비료 점수는 한 번의 벡터 연산으로 계산한다.
+    """
+    data = request.get_json(silent=True) or {}
+    axes, error = _sweep_axes(data.get('sweep'))
+    if not error:
+        error = _soil_error(data)
+    if not error:
+        top_n, error = _int_param(data, 'top_n', 3)
+    if error:
+        return jsonify({"status": "error", "message": error}), 400
+    top_n = min(max(top_n, 1), SWEEP_MAX_TOP_N)
+    try:
+        farm, base_info = _resolve_job(data)
+    except (InvalidFarmIdError, FarmNotFoundError) as e:
+        return _farm_lookup_error(e)
+    if not base_info['crop_code']:
+        return jsonify({"status": "error", **_unknown_crop(base_info['crop_name'])}), 400
+
+    service = SoilFertilizerService()
+    params = [param for param, _ in axes]
+    points = list(itertools.product(*(values for _, values in axes)))
+    farm_infos = [
+        dict(base_info, soil={**base_info['soil'], **dict(zip(params, point))})
+        for point in points
+    ]
+    prescriptions, unique_count = _fetch_prescriptions(service, farm_infos)
+
+    ready = [i for i, prescription in enumerate(prescriptions) if prescription.success]
+    ready_prescriptions = [prescriptions[i] for i in ready]
+    base_lists = dict(zip(ready, recommend_fertilizers_many(service, ready_prescriptions, "base", top_n)))
+    topdress_lists = dict(zip(ready, recommend_fertilizers_many(service, ready_prescriptions, "topdress", top_n)))
+
+    cells = []
+    for i, (point, prescription) in enumerate(zip(points, prescriptions)):
+        cell = {"soil": dict(zip(params, point))}
+        if i not in base_lists:
+            cell.update(status="error", message=prescription.result_msg or "처방 API 조회에 실패했습니다.")
+        else:
+            cell.update(
+                status="success",
+                needs={
+                    "base": dict(zip("NPK", prescription.needs("base"))),
+                    "additional": dict(zip("NPK", prescription.needs("topdress")))
+                },
+                compost=prescription.compost_amounts(base_info['farm_size_10a']),
+                fertilizer={
+                    "base": _fertilizer_list(base_lists[i]),
+                    "additional": _fertilizer_list(topdress_lists[i])
+                }
+            )
+        cells.append(cell)
+    # 2차원 분석은 [첫 번째 항목 값][두 번째 항목 값] 행렬로 변환
+    if len(axes) == 2:
+        width = len(axes[1][1])
+        cells = [cells[row:row + width] for row in range(0, len(cells), width)]
+
+    return jsonify({
+        "status": "success",
+        "_id": farm.get("_id", "farm001"),
+        "crop": {"code": base_info['crop_code'], "name": base_info['crop_name']},
+        "axes": [{"param": param, "values": values} for param, values in axes],
+        "cells": cells,
+        "summary": {
+            "points": len(points),
+            "succeeded": len(ready),
+            "failed": len(points) - len(ready),
+            "unique_prescriptions": unique_count
+        }
+    })
+
+
+def _sweep_axes(sweep):
+    """
+    sweep 요청 검증 → ([(토양 항목, 값 목록), ...], 오류 메시지)
+
+    값 목록을 만들기 전에 항목별 값 개수와 전체 격자점 수를 먼저 제한한다 (큰 steps/values로 메모리를 쓰지 않도록).
+    """
+    if not isinstance(sweep, list) or not 1 <= len(sweep) <= 2:
+        return None, "sweep에는 토양 항목 1~2개를 지정해야 합니다."
+    specs = []
+    for axis in sweep:
+        param = axis.get('param') if isinstance(axis, dict) else None
+        if param not in SWEEP_PARAMS:
+            return None, f"지원하지 않는 토양 항목입니다: {param} (사용 가능: {', '.join(SWEEP_PARAMS)})"
+        if any(param == existing for existing, _, _ in specs):
+            return None, f"같은 토양 항목을 두 번 지정했습니다: {param}"
+        try:
+            if 'values' in axis:
+                if not isinstance(axis['values'], list):
+                    raise TypeError(param)
+                spec = axis['values']
+                count = len(spec)
+            else:
+                spec = (float(axis['start']), float(axis['stop']))
+                count = int(axis.get('steps', 10))
+        except (KeyError, TypeError, ValueError, OverflowError):
+            return None, f"{param}: start/stop/steps 또는 values 형식이 올바르지 않습니다."
+        if count < 1:
+            return None, f"{param}: 값이 없습니다."
+        if isinstance(spec, tuple) and not all(map(math.isfinite, spec)):
+            return None, f"{param}: 값은 유한한 숫자여야 합니다."
+        specs.append((param, spec, count))
+    points = math.prod(count for _, _, count in specs)
+    if points > FERTILIZER_SWEEP_MAX_POINTS:
+        return None, f"격자점은 최대 {FERTILIZER_SWEEP_MAX_POINTS}개까지 요청할 수 있습니다 (요청: {points}개)."
+
+    axes = []
+    for param, spec, count in specs:
+        if isinstance(spec, tuple):
+            values = [round(float(v), 4) for v in np.linspace(*spec, count)]
+        else:
+            try:
+                values = [float(v) for v in spec]
+            except (TypeError, ValueError, OverflowError):
+                return None, f"{param}: start/stop/steps 또는 values 형식이 올바르지 않습니다."
+            # NaN/inf는 처방 API 파라미터로 그대로 넘어가므로 거부
+            if not all(map(math.isfinite, values)):
+                return None, f"{param}: 값은 유한한 숫자여야 합니다."
+        axes.append((param, values))
+    return axes, None
+
+
+def run_fertilizer_batch(jobs):
+    """
+    배치 작업 실행
+
+    Returns:
+        (작업 순서대로 결과 리스트, 조회한 고유 처방 수)
+    """
+    service = SoilFertilizerService()
+    results = [None] * len(jobs)
+
+    # 1) 작업 검증
+    resolved = {}
+    for i, job in enumerate(jobs):
+        if not isinstance(job, dict):
+            results[i] = _job_error(i, job, "작업 형식이 올바르지 않습니다.")
+            continue
+        error = _soil_error(job)
+        if error:
+            results[i] = _job_error(i, job, error)
+            continue
+        # 작업 하나의 잘못된 입력값이 배치 전체를 실패시키지 않도록 농장 조회와 처방 키 계산을 작업별로 처리
+        try:
+            farm, farm_info = _resolve_job(job)
+            key = service.prescription_key(farm_info)
+            hash(key)
+        except (InvalidFarmIdError, FarmNotFoundError) as e:
+            results[i] = _job_error(i, job, str(e))
+            continue
+        except Exception as e:
+            results[i] = _job_error(i, job, f"작업 입력값 오류: {e}")
+            continue
+        if not farm_info['crop_code']:
+            results[i] = _job_error(i, job, **_unknown_crop(farm_info['crop_name']))
+            continue
+        resolved[i] = (farm, farm_info, key)
+
+    # 2) 고유 처방만 동시 조회
+    fetched, unique_count = _fetch_prescriptions(
+        service,
+        [farm_info for _, farm_info, _ in resolved.values()],
+        [key for _, _, key in resolved.values()]
+    )
+
+    # 3) 처방에 성공한 작업의 비료 점수를 한 번에 계산
+    ready = []
+    ready_prescriptions = []
+    for i, prescription in zip(resolved, fetched):
+        if not prescription.success:
+            results[i] = _job_error(i, jobs[i], prescription.result_msg or "처방 API 조회에 실패했습니다.")
+            continue
+        ready.append(i)
+        ready_prescriptions.append(prescription)
+    base_lists = recommend_fertilizers_many(service, ready_prescriptions, "base", 3)
+    topdress_lists = recommend_fertilizers_many(service, ready_prescriptions, "topdress", 3)
+
+    for i, prescription, base_fertilizers, topdress_fertilizers in zip(
+        ready, ready_prescriptions, base_lists, topdress_lists
+    ):
+        farm, farm_info, _ = resolved[i]
+        result = _recommendation_result(
+            service, farm, farm_info, prescription, base_fertilizers, topdress_fertilizers
+        )
+        results[i] = {"index": i, "status": "success", **result}
+    return results, unique_count
+
+
+def _fetch_prescriptions(service, farm_infos, keys=None):
+    """
+    처방 조건(작물 코드 + 토양) 기준으로 중복을 제거하고 고유 처방만 제한된 워커 풀로 동시 조회
+
+    Args:
+        keys: farm_infos 순서의 처방 키 (이미 계산했으면 전달, 생략 시 여기서 계산)
+
+    Returns:
+        (farm_infos 순서의 처방 리스트, 고유 처방 수)
+    """
+    if keys is None:
+        keys = [service.prescription_key(farm_info) for farm_info in farm_infos]
+    unique = dict(zip(keys, farm_infos))
+    if not unique:
+        return [], 0
+    workers = max(1, min(FERTILIZER_BATCH_WORKERS, len(unique)))
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        prescriptions = dict(zip(unique.keys(), executor.map(service.fetch_fertilizer_api, unique.values())))
+    return [prescriptions[key] for key in keys], len(unique)
+
+
+def _job_error(index, job, message, **extra):
+    """배치 작업별 오류 항목 (extra: 추가 필드, 예: 작물명 제안)"""
+    job = job if isinstance(job, dict) else {}
+    return {
+        "index": index,
+        "status": "error",
+        "message": message,
+        "farmid": job.get('farmid'),
+        "cropname": job.get('cropname'),
+        **extra
+    }
+
+
+def _unknown_crop(crop_name):
+    """지원하지 않는 작물 오류 내용 (비슷한 작물명 제안 포함)"""
+    return {
+        "message": f"지원하지 않는 작물입니다: {crop_name}",
+        "suggestions": crop_registry.suggest(crop_name)
+    }
@@ -1,19 +1,33 @@
 from flask import Blueprint, request, jsonify
-from config.user_data import USER_DATA
+from services.farm_repository import FarmNotFoundError, InvalidFarmIdError, find_farm_context
 from services.soil_fertilizer_service import SoilFertilizerService
-from config.crop_codes import get_crop_code
+from utils.crop_registry import crop_registry
+from utils.prescription_parser import parse_prescription_xml
+from utils.fertilizer_records import Prescription
+from utils.fertilizer_recommender import recommend_fertilizers
 
 fertilizer_raw_bp = Blueprint('fertilizer_raw', __name__)
 
 @fertilizer_raw_bp.route('/api/fertilizer-raw', methods=['POST'])
 def get_fertilizer_raw():
     data = request.get_json() if request.is_json else {}
-    crop_name = data.get('cropName', USER_DATA.get('crop', {}).get('name', '맥주보리'))
-    soil_data = data.get('soil', USER_DATA.get('soil', {}))
-    farm = USER_DATA.get('farm', {})
-    area_sqm = farm.get('area_m2', 25000)
+    try:
+        context = find_farm_context(data.get('farmid'))
+    except (InvalidFarmIdError, FarmNotFoundError) as e:
+        status = 404 if isinstance(e, FarmNotFoundError) else 400
+        return jsonify({"status": "error", "message": str(e)}), status
+    crop_name = data.get('cropName', (context.crop_names or ['맥주보리'])[0])
+    soil_data = data.get('soil', context.soil)
+    farm = context.farm
+    area_sqm = context.area_m2
     farm_size_a = area_sqm / 100
-    crop_code = get_crop_code(crop_name)
+    crop_code = crop_registry.code(crop_name)
+    if not crop_code:
+        return jsonify({
+            "status": "error",
+            "message": f"지원하지 않는 작물입니다: {crop_name}",
+            "suggestions": crop_registry.suggest(crop_name)
+        }), 400
     farm_info = {
         'crop_name': crop_name,
         'crop_code': crop_code,
@@ -23,56 +37,26 @@ def get_fertilizer_raw():
     service = SoilFertilizerService()
     # API 호출 및 파싱
     raw_result = service.get_raw_public_api_result(farm_info)
-    import xml.etree.ElementTree as ET
-    root = ET.fromstring(raw_result)
-    item = root.find('.//item')
-    def get_float(tag):
-        if item is None:
-            return 0.0
-        val = item.findtext(tag)
-        try:
-            return float(val)
-        except:
-            return 0.0
-    def get_text(tag, default=None):
-        if item is None:
-            return default
-        return item.findtext(tag, default)
+    if isinstance(raw_result, str):
+        prescription = parse_prescription_xml(raw_result)
+    else:
+        prescription = Prescription.error('', raw_result.get('error', ''))
+
+    if not prescription.success:
+        return jsonify({
+            "status": "error",
+            "message": prescription.result_msg or "처방 API 조회에 실패했습니다."
+        }), 502
 
     # 퇴비 4종류
     total_area_10a = area_sqm / 1000
-    compost = {
-        "cattle_kg": get_float("pre_Compost_Cattl") * total_area_10a,
-        "chicken_kg": get_float("pre_Compost_Chick") * total_area_10a,
-        "mixed_kg": get_float("pre_Compost_Mix") * total_area_10a,
-        "pig_kg": get_float("pre_Compost_Pig") * total_area_10a
-    }
+    compost = prescription.compost_amounts(total_area_10a)
 
-    # 비료 추천 로직 (함수 scope 밖으로 이동)
-    base_fertilizers = []
-    topdress_fertilizers = []
+    # 비료 추천 (파싱한 처방의 밑거름/웃거름 필요량 기준, 단계별 1회)
+    base_fertilizers = _raw_fertilizer_list(recommend_fertilizers(service, prescription, "base", 3), "base")
+    topdress_fertilizers = _raw_fertilizer_list(recommend_fertilizers(service, prescription, "topdress", 3), "topdress")
     composts = []
 
-    # 밑거름 추천
-    for fert in service.get_fertilizer_recommendations(crop_name, area_sqm).get('base', [])[:3]:
-        base_fertilizers.append({
-            "name": fert.get("name"),
-            "amount": fert.get("amount"),
-            "unit": fert.get("unit"),
-            "nutrient": fert.get("nutrient"),
-            "type": "base"
-        })
-
-    # 웃거름 추천
-    for fert in service.get_fertilizer_recommendations(crop_name, area_sqm).get('topdress', [])[:3]:
-        topdress_fertilizers.append({
-            "name": fert.get("name"),
-            "amount": fert.get("amount"),
-            "unit": fert.get("unit"),
-            "nutrient": fert.get("nutrient"),
-            "type": "topdress"
-        })
-
     # 퇴비 추천
     for comp in compost.items():
         composts.append({
@@ -84,14 +68,28 @@ def get_fertilizer_raw():
 
     result_json = {
         "compost": compost,
-        "crop": {"name": get_text("crop_Nm", crop_name)},
-            "fertilizer": {
-                "basal": base_fertilizers,
-                "topdress": topdress_fertilizers
-            },
+        "crop": {"name": prescription.crop_name or crop_name},
+        "fertilizer": {
+            "basal": base_fertilizers,
+            "topdress": topdress_fertilizers
+        },
         "field": {
             "area_sqm": area_sqm,
             "id": farm.get("_id", "farm001")
         }
     }
     return jsonify(result_json)
+
+
+def _raw_fertilizer_list(fertilizers, fert_type):
+    """추천 비료(ProductRecommendation) → 원본 API 응답의 비료 항목 형식"""
+    return [
+        {
+            "name": fert.fertilizer_name,
+            "amount": fert.usage_kg,
+            "unit": "kg",
+            "nutrient": {"N": fert.n_ratio, "P2O5": fert.p_ratio, "K2O": fert.k_ratio},
+            "type": fert_type
+        }
+        for fert in fertilizers
+    ]
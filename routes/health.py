@@ -1,4 +1,10 @@
 from flask import Blueprint, jsonify
+from services.farm_repository import farm_repository
+from services.fertilizer_manager import farm_refresher, recommendation_refresher
+from services.soil_fertilizer_service import prescription_cache, prescription_flight
+from services.weather_service import weather_cache
+from utils.http_client import http_client
+from utils.prescription_grid import prescription_grid
 
 health_bp = Blueprint('health', __name__)
 
@@ -7,5 +13,17 @@ def health_check():
     return jsonify({
         "status": "healthy",
         "message": "농업 AI 시스템이 정상 작동 중입니다.",
-        "version": "1.0.0"
+        "version": "1.0.0",
+        "cache": {
+            "prescription": prescription_cache.stats(),
+            "prescription_singleflight": prescription_flight.stats(),
+            "prescription_grid": prescription_grid.stats(),
+            "weather": weather_cache.stats()
+        },
+        "upstream": http_client.stats(),
+        "farm_repository": farm_repository.stats(),
+        "background_refresh": {
+            "recommendation": recommendation_refresher.stats(),
+            "farm": farm_refresher.stats()
+        }
     })
@@ -1,5 +1,6 @@
 from flask import Blueprint, request, jsonify
-from config.user_data import USER_DATA
+from services.farm_repository import FarmNotFoundError, find_farm_context
+from services.farm_state import farm_state
 from services.weather_service import weather_service
 from utils.weather_utils import classify_weather
 
@@ -7,10 +8,15 @@ weather_bp = Blueprint('weather', __name__)
 
 @weather_bp.route('/api/weather/current', methods=['GET'])
 def get_current_weather():
-    default_station = USER_DATA["location"]["station"]
-    station = request.args.get('station', default_station)
+    try:
+        context = find_farm_context(request.args.get('farmid'))
+    except FarmNotFoundError as e:
+        return jsonify({"status": "error", "message": str(e)}), 404
+    station = request.args.get('station', context.station)
     weather_data = weather_service.get_current_weather(station)
-    USER_DATA['weather'] = weather_data if weather_data else {}
+    # 농장 관측소의 기상만 농장 상태로 발행 (공유 USER_DATA는 수정하지 않음)
+    if str(station) == str(context.station):
+        farm_state.publish(context.farm_id, "weather", weather_data or {})
     if not weather_data:
         return jsonify({
             "temperature": None,
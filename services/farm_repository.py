@@ -0,0 +1,383 @@
+"""
+농장/토양검사/작물 저장소
+농장 ID와 사용자 ID 색인으로 농장 문서, 최신 토양검사 결과, 재배 작물을 조회해 요청별 농장 컨텍스트(FarmContext)로 제공
+FARM_DB_PATH 설정 시 SQLite 저장소, 아니면 config.user_data 샘플로 초기화한 메모리 저장소 사용
+자주 조회하는 농장 컨텍스트는 프로세스 내 LRU(TTLCache)에 보관 (다른 워커의 쓰기는 FARM_CACHE_TTL 안에 반영)
+
+SQLite 일괄 적재: python -m services.farm_repository --db data/farms.db --import farms.json
+(farms.json: {"users": [...], "farms": [...], "soiltests": [...]} - DB 컬렉션 문서 형식)
+"""
+import argparse
+import json
+import os
+import sqlite3
+import threading
+from typing import Dict, List, Optional
+
+from dotenv import load_dotenv
+
+from config.user_data import SAMPLE_FARM, SAMPLE_SOILTEST, SAMPLE_USER
+from utils.ttl_cache import TTLCache
+from utils.versioned_store import freeze, thaw
+
+# 전역 저장소를 import 시점에 만들므로 app.py보다 먼저 import되어도 .env의 FARM_* 설정을 사용하도록 여기서 로드
+load_dotenv()
+
+# 농장 ID를 지정하지 않은 요청의 기본 농장
+DEFAULT_FARM_ID = SAMPLE_FARM["_id"]
+
+# 면적 정보가 없는 농장의 기본 면적 (㎡)
+DEFAULT_AREA_M2 = 25000
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS users (
+    id TEXT PRIMARY KEY,
+    doc TEXT NOT NULL
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS farms (
+    id TEXT PRIMARY KEY,
+    user_id TEXT,
+    doc TEXT NOT NULL
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS farms_user ON farms (user_id);
+CREATE TABLE IF NOT EXISTS soiltests (
+    id TEXT PRIMARY KEY,
+    farm_id TEXT NOT NULL,
+    tested_at TEXT NOT NULL,
+    doc TEXT NOT NULL
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS soiltests_farm ON soiltests (farm_id, tested_at);
+"""
+
+
+class FarmContext:
+    """
+    요청 처리에 필요한 농장 정보 (농장 문서 + 최신 토양검사 결과 + 재배 중인 작물)
+
+    읽기 전용: 문서는 읽기 전용 구조(MappingProxyType/tuple)로 변환해 보관하고 속성 변경도 막으므로
+    LRU 캐시의 같은 컨텍스트를 여러 스레드의 요청이 공유해도 안전하다.
+    변경이 필요하면 dict(...)/{**...}로 요청별 복사본을 만들거나 저장소(save_*)를 통해 저장한다.
+    """
+    __slots__ = ("farm_id", "user_id", "farm", "soiltest", "soil", "crops")
+
+    def __init__(self, farm: Dict, soiltest: Optional[Dict] = None):
+        farm = freeze(farm)
+        soiltest = freeze(soiltest) if soiltest is not None else None
+        set_field = object.__setattr__
+        set_field(self, "farm_id", farm.get("_id", DEFAULT_FARM_ID))
+        set_field(self, "user_id", farm.get("userid"))
+        set_field(self, "farm", farm)
+        set_field(self, "soiltest", soiltest)
+        set_field(self, "soil", soiltest.get("result", freeze({})) if soiltest is not None else freeze({}))
+        set_field(self, "crops", tuple(
+            crop for crop in farm.get("crops", ()) if crop.get("status", "growing") == "growing"
+        ))
+
+    def __setattr__(self, name, value):
+        raise AttributeError("FarmContext는 읽기 전용입니다.")
+
+    @property
+    def area_m2(self) -> float:
+        return farm_area_m2(self.farm)
+
+    @property
+    def farm_size_a(self) -> float:
+        return self.area_m2 / 100
+
+    @property
+    def station(self):
+        return self.farm.get("stn")
+
+    @property
+    def crop_names(self) -> List[str]:
+        return [crop["cropname"] for crop in self.crops]
+
+
+def farm_area_m2(farm: Dict) -> float:
+    """농장 면적 (㎡, 없으면 기본 면적)"""
+    return farm.get("area_m2", DEFAULT_AREA_M2)
+
+
+class FarmRepository:
+    """
+    농장 저장소 공통 인터페이스
+
+    하위 클래스는 문서 단위 조회/저장(_load_*, _save_*)만 구현하고,
+    농장 컨텍스트 조합과 LRU 캐시, 쓰기 시 캐시 무효화는 여기서 처리한다.
+    """
+
+    def __init__(self, cache_size: int = 10000, cache_ttl: float = 60):
+        self._contexts = TTLCache(cache_size, cache_ttl)
+
+    def get_farm(self, farm_id: str) -> Optional[Dict]:
+        """농장 문서 (읽기 전용, 없으면 None)"""
+        return self._load_farm(farm_id)
+
+    def get_user(self, user_id: str) -> Optional[Dict]:
+        """사용자 문서 (없으면 None)"""
+        return self._load_user(user_id)
+
+    def get_user_farm_ids(self, user_id: str) -> List[str]:
+        """사용자의 농장 ID 목록"""
+        return self._load_user_farm_ids(user_id)
+
+    def get_latest_soiltest(self, farm_id: str) -> Optional[Dict]:
+        """농장의 가장 최근 토양검사 (없으면 None)"""
+        return self._load_latest_soiltest(farm_id)
+
+    def get_context(self, farm_id: str) -> Optional[FarmContext]:
+        """농장 컨텍스트 (LRU 캐시 → 저장소 순, 없는 농장이면 None)"""
+        context = self._contexts.get(farm_id)
+        if context is not None:
+            return context
+        farm = self._load_farm(farm_id)
+        if farm is None:
+            return None
+        context = FarmContext(farm, self._load_latest_soiltest(farm_id))
+        self._contexts.set(farm_id, context)
+        return context
+
+    def save_user(self, user: Dict):
+        self._save_user(user)
+
+    def save_farm(self, farm: Dict):
+        """농장 문서 저장 (작물 목록 포함)"""
+        self._save_farm(farm)
+        self._contexts.delete(farm["_id"])
+
+    def save_soiltest(self, soiltest: Dict):
+        """토양검사 저장 (tested_at이 가장 최근인 검사가 농장 컨텍스트의 토양 정보)"""
+        self._save_soiltest(soiltest)
+        self._contexts.delete(soiltest["farmid"])
+
+    def stats(self) -> dict:
+        return {
+            "backend": self.backend,
+            "farms": self.count_farms(),
+            "context_cache": self._contexts.stats()
+        }
+
+
+class MemoryFarmRepository(FarmRepository):
+    """프로세스 내 dict 색인 저장소 (개발/테스트용, 샘플 데이터로 초기화 - 문서는 읽기 전용 복사본으로 보관)"""
+    backend = "memory"
+
+    def __init__(self, cache_size: int = 10000, cache_ttl: float = 60):
+        super().__init__(cache_size, cache_ttl)
+        self._lock = threading.Lock()
+        self._users = {}
+        self._farms = {}
+        self._user_farms = {}
+        self._soiltests = {}
+
+    def _load_user(self, user_id):
+        return self._users.get(user_id)
+
+    def _load_farm(self, farm_id):
+        return self._farms.get(farm_id)
+
+    def _load_user_farm_ids(self, user_id):
+        return list(self._user_farms.get(user_id, ()))
+
+    def _load_latest_soiltest(self, farm_id):
+        return self._soiltests.get(farm_id)
+
+    def _save_user(self, user):
+        user = freeze(user)
+        with self._lock:
+            self._users[user["_id"]] = user
+
+    def _save_farm(self, farm):
+        farm = freeze(farm)
+        with self._lock:
+            previous = self._farms.get(farm["_id"])
+            if previous is not None:
+                self._user_farms.get(previous.get("userid"), {}).pop(farm["_id"], None)
+            self._farms[farm["_id"]] = farm
+            self._user_farms.setdefault(farm.get("userid"), {})[farm["_id"]] = None
+
+    def _save_soiltest(self, soiltest):
+        soiltest = freeze(soiltest)
+        with self._lock:
+            latest = self._soiltests.get(soiltest["farmid"])
+            if latest is None or soiltest["tested_at"] >= latest["tested_at"]:
+                self._soiltests[soiltest["farmid"]] = soiltest
+
+    def count_farms(self) -> int:
+        return len(self._farms)
+
+
+class SQLiteFarmRepository(FarmRepository):
+    """
+    SQLite 저장소 (문서는 JSON으로 저장, 농장 ID/사용자 ID/농장별 검사일 색인)
+
+    연결은 스레드별로 만들고 fork 이후 자식 프로세스에서는 새로 연결한다.
+    """
+    backend = "sqlite"
+
+    def __init__(self, path: str, cache_size: int = 10000, cache_ttl: float = 60):
+        super().__init__(cache_size, cache_ttl)
+        self.path = path
+        self._local = threading.local()
+
+    def _conn(self):
+        conn = getattr(self._local, "conn", None)
+        if conn is None or self._local.pid != os.getpid():
+            conn = sqlite3.connect(self.path, timeout=5, isolation_level=None, check_same_thread=False)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.executescript(_SCHEMA)
+            self._local.conn = conn
+            self._local.pid = os.getpid()
+        return conn
+
+    def _load_doc(self, sql, args):
+        row = self._conn().execute(sql, args).fetchone()
+        return freeze(json.loads(row[0])) if row else None
+
+    def _load_user(self, user_id):
+        return self._load_doc("SELECT doc FROM users WHERE id = ?", (user_id,))
+
+    def _load_farm(self, farm_id):
+        return self._load_doc("SELECT doc FROM farms WHERE id = ?", (farm_id,))
+
+    def _load_user_farm_ids(self, user_id):
+        rows = self._conn().execute("SELECT id FROM farms WHERE user_id = ?", (user_id,)).fetchall()
+        return [row[0] for row in rows]
+
+    def _load_latest_soiltest(self, farm_id):
+        return self._load_doc(
+            "SELECT doc FROM soiltests WHERE farm_id = ? ORDER BY tested_at DESC LIMIT 1", (farm_id,)
+        )
+
+    def _save_user(self, user):
+        self._conn().execute("INSERT OR REPLACE INTO users (id, doc) VALUES (?, ?)",
+                             (user["_id"], json.dumps(thaw(user), ensure_ascii=False)))
+
+    def _save_farm(self, farm):
+        self._conn().execute("INSERT OR REPLACE INTO farms (id, user_id, doc) VALUES (?, ?, ?)",
+                             (farm["_id"], farm.get("userid"), json.dumps(thaw(farm), ensure_ascii=False)))
+
+    def _save_soiltest(self, soiltest):
+        self._conn().execute(
+            "INSERT OR REPLACE INTO soiltests (id, farm_id, tested_at, doc) VALUES (?, ?, ?, ?)",
+            (soiltest["_id"], soiltest["farmid"], soiltest["tested_at"],
+             json.dumps(thaw(soiltest), ensure_ascii=False))
+        )
+
+    def import_documents(self, users=(), farms=(), soiltests=()):
+        """문서 일괄 저장 (한 트랜잭션) → (사용자 수, 농장 수, 토양검사 수)"""
+        users = [(user["_id"], json.dumps(user, ensure_ascii=False)) for user in users]
+        farms = [(farm["_id"], farm.get("userid"), json.dumps(farm, ensure_ascii=False)) for farm in farms]
+        soiltests = [
+            (test["_id"], test["farmid"], test["tested_at"], json.dumps(test, ensure_ascii=False))
+            for test in soiltests
+        ]
+        conn = self._conn()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            conn.executemany("INSERT OR REPLACE INTO users (id, doc) VALUES (?, ?)", users)
+            conn.executemany("INSERT OR REPLACE INTO farms (id, user_id, doc) VALUES (?, ?, ?)", farms)
+            conn.executemany(
+                "INSERT OR REPLACE INTO soiltests (id, farm_id, tested_at, doc) VALUES (?, ?, ?, ?)", soiltests
+            )
+            conn.execute("COMMIT")
+        except BaseException:
+            conn.execute("ROLLBACK")
+            raise
+        self._contexts.clear()
+        return len(users), len(farms), len(soiltests)
+
+    def count_farms(self) -> int:
+        try:
+            return self._conn().execute("SELECT COUNT(*) FROM farms").fetchone()[0]
+        except sqlite3.Error:
+            return 0
+
+
+def create_farm_repository() -> FarmRepository:
+    """
+    농장 저장소 생성
+
+    FARM_DB_PATH가 설정되어 있으면 SQLite 저장소, 아니면 샘플 데이터로 채운 메모리 저장소
+    """
+    cache_size = int(os.getenv('FARM_CACHE_SIZE', 10000))
+    cache_ttl = float(os.getenv('FARM_CACHE_TTL', 60))
+    path = os.getenv('FARM_DB_PATH')
+    if path:
+        return SQLiteFarmRepository(path, cache_size, cache_ttl)
+    repository = MemoryFarmRepository(cache_size, cache_ttl)
+    repository.save_user(SAMPLE_USER)
+    repository.save_farm(SAMPLE_FARM)
+    repository.save_soiltest(SAMPLE_SOILTEST)
+    return repository
+
+
+# 전역 농장 저장소
+farm_repository = create_farm_repository()
+
+
+# 저장소에 없는 농장 요청에 사용하는 샘플 농장 컨텍스트
+_DEFAULT_CONTEXT = FarmContext(SAMPLE_FARM, SAMPLE_SOILTEST)
+
+
+def default_farm_context() -> FarmContext:
+    """저장소에 없는 농장 요청에 사용하는 샘플 농장 컨텍스트"""
+    return _DEFAULT_CONTEXT
+
+
+def resolve_farm_context(farm_id: Optional[str] = None) -> FarmContext:
+    """
+    농장 ID → 농장 컨텍스트 (ID가 없거나 저장소에 없는 농장이면 기본 농장)
+
+    저장소 밖 농장 문서를 다루는 내부 경로(재계산, 백그라운드 갱신)용, 요청의 farmid는 find_farm_context 사용
+    """
+    return farm_repository.get_context(farm_id or DEFAULT_FARM_ID) or default_farm_context()
+
+
+class InvalidFarmIdError(ValueError):
+    """요청의 farmid가 문자열이 아닌 경우"""
+
+
+class FarmNotFoundError(LookupError):
+    """요청의 farmid가 저장소에 없는 경우"""
+
+
+def find_farm_context(farm_id: Optional[str] = None) -> FarmContext:
+    """
+    요청의 farmid → 농장 컨텍스트 (farmid를 생략하면 기본 농장)
+
+    다른 농장의 토양/면적으로 조용히 대체하지 않도록 저장소에 없는 농장은 오류로 처리한다.
+
+    Raises:
+        InvalidFarmIdError: farmid가 문자열이 아닌 경우
+        FarmNotFoundError: 저장소에 없는 농장
+    """
+    if farm_id is None or farm_id == "":
+        return resolve_farm_context()
+    if not isinstance(farm_id, str):
+        raise InvalidFarmIdError("farmid는 농장 ID 문자열이어야 합니다.")
+    context = farm_repository.get_context(farm_id)
+    if context is None:
+        raise FarmNotFoundError(f"농장을 찾을 수 없습니다: {farm_id}")
+    return context
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="농장/토양검사 문서를 SQLite 농장 저장소로 일괄 적재")
+    parser.add_argument('--db', default=os.getenv('FARM_DB_PATH'), required=not os.getenv('FARM_DB_PATH'),
+                        help="SQLite 파일 경로 (기본 FARM_DB_PATH)")
+    parser.add_argument('--import', dest='source', required=True,
+                        help='JSON 파일 ({"users": [...], "farms": [...], "soiltests": [...]})')
+    args = parser.parse_args(argv)
+
+    with open(args.source, encoding='utf-8') as f:
+        data = json.load(f)
+    counts = SQLiteFarmRepository(args.db).import_documents(
+        data.get('users', []), data.get('farms', []), data.get('soiltests', [])
+    )
+    print("적재 완료: 사용자 {}명, 농장 {}개, 토양검사 {}건".format(*counts))
+
+
+if __name__ == "__main__":
+    main()
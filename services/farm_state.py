@@ -0,0 +1,40 @@
+"""
+농장별 실시간 상태 (기상 관측 등)
+요청 처리 중 얻은 농장 상태를 공유 dict(USER_DATA)에 쓰지 않고 농장별 버전 스냅샷으로 발행
+읽는 쪽은 읽기 전용 스냅샷을 잠금 없이 사용
+"""
+from typing import Dict, Optional
+
+from config.user_data import USER_DATA
+from services.farm_repository import DEFAULT_FARM_ID
+from utils.versioned_store import VersionedStoreMap, thaw
+
+
+class FarmStateRegistry(VersionedStoreMap):
+    """농장 ID → 상태 항목(예: "weather") 스냅샷"""
+
+    def __init__(self):
+        super().__init__({})
+
+    def publish(self, farm_id: str, name: str, value):
+        """상태 항목 발행 → 새 스냅샷"""
+        _, snapshot = self.store(farm_id).update(lambda data: {**data, name: value}, copy=False)
+        return snapshot
+
+    def get(self, farm_id: str, name: str, default=None):
+        """상태 항목 (읽기 전용, 없으면 default)"""
+        return self.snapshot(farm_id).data.get(name, default)
+
+
+# 전역 농장 상태
+farm_state = FarmStateRegistry()
+
+
+def farm_profile(farm_id: Optional[str] = None) -> Dict:
+    """
+    프롬프트용 사용자/농장 정보 (USER_DATA 구조의 요청별 복사본 + 농장 상태)
+
+    USER_DATA 자체는 수정하지 않으며, 기상 정보는 farm_state에 발행된 최신 관측값을 사용한다.
+    """
+    farm_id = farm_id or DEFAULT_FARM_ID
+    return {**USER_DATA, "weather": thaw(farm_state.get(farm_id, "weather", {}))}
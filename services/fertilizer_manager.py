@@ -1,80 +1,242 @@
 """
 다중 작물 비료 추천 관리 시스템
-최대 3개 작물까지 지원하며 각 작물별 비료 추천 내용을 전역 변수로 관리
+농장별 작물 레지스트리(농장 → 작물명 → 작물 정보)로 작물 수 제한 없이 각 작물별 비료 추천 내용을 관리
+농장마다 버전 스냅샷 저장소를 두어 읽기는 잠금 없이 읽기 전용 스냅샷을 사용하고, 쓰기는 새 스냅샷을 원자적으로 발행
+저장된 추천은 만료 전에 백그라운드 작업자가 갱신하며, 읽기는 만료된 작물도 현재 스냅샷을 바로 반환하고 갱신만 요청
 """
+import hashlib
 import json
+import os
+import random
+import tempfile
+import threading
+import time
 from datetime import datetime
 from typing import List, Dict, Optional
 from config.user_data import USER_DATA
 from config.crop_codes import get_crop_code, get_crop_name
+from services.farm_repository import DEFAULT_FARM_ID, farm_area_m2, resolve_farm_context
 from services.soil_fertilizer_service import SoilFertilizerService
+from utils.fanout import FanoutTimeout, fan_out
+from utils.crop_registry import crop_registry
+from utils.process_lock import ProcessLock
+from utils.refresh_worker import RefreshWorker
+from utils.versioned_store import VersionedStoreMap, thaw
+
+
+# 농장당 최대 등록 작물 수 (시설 단지의 작물 구획 단위)
+MAX_CROPS_PER_FARM = int(os.getenv('MAX_CROPS_PER_FARM', 500))
+
+# 저장된 추천 유효 시간 (초) - 지나면 읽기 시 백그라운드 갱신 요청
+RECOMMENDATION_TTL = float(os.getenv('RECOMMENDATION_TTL', 21600))
+# 유효 시간 대비 선제 갱신 시점 비율 및 작물별 무작위 앞당김 비율 (갱신 시점 분산)
+RECOMMENDATION_REFRESH_AHEAD = float(os.getenv('RECOMMENDATION_REFRESH_AHEAD', 0.8))
+RECOMMENDATION_REFRESH_JITTER = float(os.getenv('RECOMMENDATION_REFRESH_JITTER', 0.1))
+# 갱신 실패 시 재시도 간격 (초)
+RECOMMENDATION_RETRY_DELAY = float(os.getenv('RECOMMENDATION_RETRY_DELAY', 300))
+
+
+class FarmCropRegistry(VersionedStoreMap):
+    """
+    농장별 작물 레지스트리
+
+    농장마다 VersionedStore 하나를 두고, 스냅샷의 crops는 작물명 → 작물 정보 매핑이다.
+    작물 조회/추가/제거는 작물명 키로 처리하고, 쓰기는 바뀐 작물만 새로 만들고 나머지는 이전 스냅샷과 공유한다.
+    """
+
+    def __init__(self):
+        super().__init__({
+            "crops": {},
+            "last_updated": None,
+            "soil_info": None,
+            "farm_size_a": 0
+        })
+
+    def farm_ids(self) -> List[str]:
+        return self.keys()
+
+
+# 전역 작물 레지스트리 (스냅샷 버전은 농장별 조건부 조회에 사용)
+farm_crop_registry = FarmCropRegistry()
+
+
+def _new_crop(crop_name: str, crop_code: str) -> Dict:
+    return {
+        "name": crop_name,
+        "code": crop_code,
+        "fertilizer_data": None,
+        "last_updated": None,
+        "inputs": None,
+        "expires_at": None,
+        "refresh_at": None
+    }
+
+
+def _with_results(data: Dict, updated: Dict, failed: List[str], invalidated=(), **fields) -> Dict:
+    """
+    처방 조회 결과를 반영한 새 농장 데이터 (바뀐 작물 항목만 새로 생성)
+
+    조회 중 제거되었거나 작물 코드가 바뀐 작물은 건너뛰고,
+    성공한 작물은 만료/선제 갱신 시각(지터 적용)을, 실패한 작물은 재시도 시각을 기록한다.
+    실패한 작물 중 invalidated에 있는 작물(입력값이 바뀐 작물)은 이전 입력값의 추천 데이터를 지운다.
+    """
+    now = time.time()
+    crops = dict(data["crops"])
+    for crop_name, result in updated.items():
+        crop = crops.get(crop_name)
+        if crop and crop["code"] == result["crop_code"]:
+            ahead = RECOMMENDATION_REFRESH_AHEAD - random.uniform(0, RECOMMENDATION_REFRESH_JITTER)
+            crops[crop_name] = {
+                **crop,
+                "fertilizer_data": result["fertilizer_data"],
+                "last_updated": result["updated_at"],
+                "inputs": result["inputs"],
+                "expires_at": now + RECOMMENDATION_TTL,
+                "refresh_at": now + RECOMMENDATION_TTL * max(ahead, 0)
+            }
+    for crop_name in failed:
+        crop = crops.get(crop_name)
+        if crop and crop_name in invalidated:
+            crops[crop_name] = {**_new_crop(crop_name, crop["code"]), "refresh_at": now + RECOMMENDATION_RETRY_DELAY}
+        elif crop:
+            crops[crop_name] = {**crop, "refresh_at": now + RECOMMENDATION_RETRY_DELAY}
+    return {**data, "crops": crops, "last_updated": datetime.now().isoformat(), **fields}
+
+
+def farm_inputs(farm: Dict):
+    """
+    농장 문서에서 추천 입력값 추출 → (농장 ID, 토양검사 결과, 재배 중인 작물명 목록, 면적 ㎡)
+
+    farm: {"_id": ..., "area_m2": ..., "crops": [작물명 또는 {"cropname", "status"}], "soil": 토양검사 result}
+          (soil이 없으면 농장 저장소의 최신 토양검사 결과, area_m2가 없으면 기본 면적)
+    """
+    crop_names = []
+    for crop in farm.get("crops", []):
+        if isinstance(crop, str):
+            crop_names.append(crop)
+        elif crop.get("status", "growing") == "growing":
+            crop_names.append(crop["cropname"])
+    farm_id = farm.get("_id", DEFAULT_FARM_ID)
+    return (
+        farm_id,
+        farm.get("soil") or resolve_farm_context(farm_id).soil,
+        list(dict.fromkeys(crop_names)),
+        float(farm_area_m2(farm))
+    )
+
+
+def farm_fingerprint(soil: Dict, crop_names: List[str], area_m2: float) -> str:
+    """농장 입력값 지문 (토양검사 결과 + 작물 코드 + 면적, 하나라도 바뀌면 달라짐)"""
+    payload = json.dumps(
+        [thaw(soil), [(name, get_crop_code(name)) for name in crop_names], area_m2],
+        sort_keys=True, ensure_ascii=False, default=str
+    )
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
 
-# 전역 변수: 작물별 비료 추천 데이터 저장
-FERTILIZER_RECOMMENDATIONS = {
-    "crops": [],  # 최대 3개 작물 정보
-    "last_updated": None,
-    "soil_info": None,
-    "farm_size_a": 0
-}
 
 class FertilizerManager:
     """다중 작물 비료 추천 관리자"""
-    
+
     def __init__(self):
         self.soil_service = SoilFertilizerService()
-        
-    def update_crop_list(self, crop_names: List[str]) -> Dict:
+
+    def update_crop_list(self, crop_names: List[str], farm_id: str = DEFAULT_FARM_ID) -> Dict:
         """
-        작물 목록 업데이트 (최대 3개)
-        
+        작물 목록 교체 (목록에 남은 작물의 기존 추천 데이터는 유지)
+
         Args:
-            crop_names: 작물명 리스트 (최대 3개)
-            
+            crop_names: 작물명 리스트
+            farm_id: 농장 ID
+
         Returns:
             업데이트 결과
         """
-        global FERTILIZER_RECOMMENDATIONS
-        
-        if len(crop_names) > 3:
+        crop_names = list(dict.fromkeys(crop_names))
+        if len(crop_names) > MAX_CROPS_PER_FARM:
             return {
                 "status": "error",
-                "message": "작물은 최대 3개까지만 등록 가능합니다."
+                "message": f"작물은 농장당 최대 {MAX_CROPS_PER_FARM}개까지만 등록 가능합니다."
             }
-        
+
         # 작물 코드 검증 및 매핑
-        crop_data = []
+        crop_codes = {}
         for crop_name in crop_names:
             crop_code = get_crop_code(crop_name)
             if not crop_code:
                 return {
                     "status": "error",
-                    "message": f"지원하지 않는 작물입니다: {crop_name}"
+                    "message": f"지원하지 않는 작물입니다: {crop_name}",
+                    "suggestions": crop_registry.suggest(crop_name)
                 }
-            
-            crop_data.append({
-                "name": crop_name,
-                "code": crop_code,
-                "fertilizer_data": None,
-                "last_updated": None
-            })
-        
-        FERTILIZER_RECOMMENDATIONS["crops"] = crop_data
-        FERTILIZER_RECOMMENDATIONS["last_updated"] = datetime.now().isoformat()
-        
+            crop_codes[crop_name] = crop_code
+
+        def _replace_crops(data):
+            current = data["crops"]
+            crops = {}
+            for crop_name, crop_code in crop_codes.items():
+                existing = current.get(crop_name)
+                crops[crop_name] = existing if existing and existing["code"] == crop_code else _new_crop(crop_name, crop_code)
+            return {**data, "crops": crops, "last_updated": datetime.now().isoformat()}
+        _, snapshot = farm_crop_registry.store(farm_id).update(_replace_crops, copy=False)
+
         return {
             "status": "success",
             "message": f"{len(crop_names)}개 작물이 등록되었습니다.",
-            "crops": [crop["name"] for crop in crop_data]
+            "crops": list(snapshot.data["crops"]),
+            "version": snapshot.version
+        }
+
+    def add_crop(self, crop_name: str, farm_id: str = DEFAULT_FARM_ID) -> Dict:
+        """
+        작물 1개 추가 (이미 등록된 작물이면 변경 없음)
+
+        Args:
+            crop_name: 작물명
+            farm_id: 농장 ID
+
+        Returns:
+            추가 결과
+        """
+        crop_code = get_crop_code(crop_name)
+        if not crop_code:
+            return {
+                "status": "error",
+                "message": f"지원하지 않는 작물입니다: {crop_name}",
+                "suggestions": crop_registry.suggest(crop_name)
+            }
+
+        def _add(data):
+            if crop_name in data["crops"] or len(data["crops"]) >= MAX_CROPS_PER_FARM:
+                return None
+            crops = dict(data["crops"])
+            crops[crop_name] = _new_crop(crop_name, crop_code)
+            return {**data, "crops": crops, "last_updated": datetime.now().isoformat()}
+        added, snapshot = farm_crop_registry.store(farm_id).update(_add, copy=False)
+
+        if not added and crop_name not in snapshot.data["crops"]:
+            return {
+                "status": "error",
+                "message": f"작물은 농장당 최대 {MAX_CROPS_PER_FARM}개까지만 등록 가능합니다."
+            }
+        return {
+            "status": "success",
+            "message": f"{crop_name} 작물이 등록되었습니다." if added else f"이미 등록된 작물입니다: {crop_name}",
+            "total_crops": len(snapshot.data["crops"]),
+            "version": snapshot.version
         }
-    
-    def get_fertilizer_recommendation_for_crop(self, crop_name: str, soil_data: Dict = None) -> Dict:
+
+    def get_fertilizer_recommendation_for_crop(self, crop_name: str, soil_data: Dict = None,
+                                               revalidate: bool = False,
+                                               farm_id: str = DEFAULT_FARM_ID) -> Dict:
         """
         특정 작물에 대한 비료 추천
-        
+
         Args:
             crop_name: 작물명
-            soil_data: 토양 데이터 (None이면 USER_DATA 사용)
-            
+            soil_data: 토양 데이터 (None이면 농장의 최신 토양검사 결과 사용)
+            revalidate: True면 처방 캐시를 건너뛰고 upstream에서 다시 조회
+            farm_id: 농장 ID (토양/면적 기본값 조회용)
+
         Returns:
             비료 추천 결과
         """
@@ -82,31 +244,34 @@ class FertilizerManager:
         if not crop_code:
             return {
                 "status": "error",
-                "message": f"지원하지 않는 작물입니다: {crop_name}"
+                "message": f"지원하지 않는 작물입니다: {crop_name}",
+                "suggestions": crop_registry.suggest(crop_name)
             }
-        
+
         # 토양 데이터 준비
+        context = resolve_farm_context(farm_id)
         if soil_data is None:
-            soil_data = USER_DATA["soil"]
-        
+            soil_data = context.soil
+
         # 농장 정보 준비
         farm_info = {
             "crop_code": crop_code,
             "crop_name": crop_name,
-            "farm_size_a": USER_DATA.get("farm_size_a", 250),
+            "farm_size_a": context.farm_size_a,
             "soil": soil_data
         }
-        
+
         try:
             # 비료 API 호출
-            fertilizer_result = self.soil_service.call_fertilizer_api(farm_info)
-            
-            if fertilizer_result and fertilizer_result.get("success"):
+            fertilizer_result = self.soil_service.fetch_fertilizer_api(farm_info, revalidate=revalidate)
+
+            if fertilizer_result and fertilizer_result.success:
                 return {
                     "status": "success",
                     "crop_name": crop_name,
                     "crop_code": crop_code,
-                    "fertilizer_data": fertilizer_result,
+                    "fertilizer_data": fertilizer_result.to_dict(),
+                    "inputs": self._crop_inputs(crop_code, soil_data),
                     "updated_at": datetime.now().isoformat()
                 }
             else:
@@ -115,132 +280,341 @@ class FertilizerManager:
                     "message": f"{crop_name}에 대한 비료 추천 데이터를 가져올 수 없습니다.",
                     "crop_name": crop_name
                 }
-                
+
         except Exception as e:
             return {
                 "status": "error",
                 "message": f"비료 추천 처리 중 오류 발생: {str(e)}",
                 "crop_name": crop_name
             }
-    
-    def update_all_fertilizer_recommendations(self, soil_data: Dict = None) -> Dict:
+
+    def _crop_inputs(self, crop_code: str, soil_data: Dict) -> List:
+        """처방 입력값(작물 코드 + 토양 7개 항목) 지문 - 같으면 처방 결과도 같음"""
+        return list(self.soil_service.prescription_key({"crop_code": crop_code, "soil": soil_data}))
+
+    def update_all_fertilizer_recommendations(self, soil_data: Dict = None, deadline: float = None,
+                                              farm_id: str = DEFAULT_FARM_ID, force: bool = False,
+                                              farm_size_a: float = None) -> Dict:
         """
-        등록된 모든 작물에 대한 비료 추천 업데이트
-        
+        등록된 작물의 비료 추천 업데이트 (입력값이 바뀐 작물만, 작물별 동시 조회)
+
         Args:
-            soil_data: 토양 데이터 (None이면 USER_DATA 사용)
-            
+            soil_data: 토양 데이터 (None이면 농장의 최신 토양검사 결과 사용)
+            deadline: 전체 마감 시간 (초, 기본 CROP_FANOUT_DEADLINE) - 넘긴 작물은 failed_crops로 반환
+            farm_id: 농장 ID
+            force: True면 입력값이 같아도 모든 작물을 다시 조회
+            farm_size_a: 농장 면적 (a, None이면 농장 저장소의 면적 사용)
+
         Returns:
-            전체 업데이트 결과
+            전체 업데이트 결과 (skipped_crops: 입력값이 그대로라 건너뛴 작물,
+            invalidated_crops: 입력값이 바뀌었지만 재조회에 실패해 이전 추천 데이터를 지운 작물)
         """
-        global FERTILIZER_RECOMMENDATIONS
-        
-        if not FERTILIZER_RECOMMENDATIONS["crops"]:
+        crops = farm_crop_registry.snapshot(farm_id).data["crops"]
+        if not crops:
             return {
                 "status": "error",
                 "message": "등록된 작물이 없습니다. 먼저 작물을 등록해주세요."
             }
-        
-        updated_crops = []
+
+        context = resolve_farm_context(farm_id)
+        soil = soil_data or context.soil
+        stale = []
+        changed = set()
+        skipped_crops = []
+        for crop_name, crop_info in crops.items():
+            if crop_info["fertilizer_data"] is None:
+                stale.append(crop_name)
+            elif list(crop_info["inputs"] or ()) != self._crop_inputs(crop_info["code"], soil):
+                stale.append(crop_name)
+                changed.add(crop_name)
+            elif force:
+                stale.append(crop_name)
+            else:
+                skipped_crops.append(crop_name)
+
+        # 작물별 처방 조회를 잠금 밖에서 동시에 수행 (전체 마감 시간 초과 작물은 실패로 처리)
+        # 결과만 새 스냅샷으로 발행
+        updated = {}
         failed_crops = []
-        
-        for crop_info in FERTILIZER_RECOMMENDATIONS["crops"]:
-            crop_name = crop_info["name"]
-            result = self.get_fertilizer_recommendation_for_crop(crop_name, soil_data)
-            
-            if result["status"] == "success":
-                crop_info["fertilizer_data"] = result["fertilizer_data"]
-                crop_info["last_updated"] = result["updated_at"]
-                updated_crops.append(crop_name)
+
+        results = fan_out(
+            lambda crop_name: self.get_fertilizer_recommendation_for_crop(crop_name, soil, farm_id=farm_id),
+            stale,
+            deadline
+        ) if stale else []
+        for crop_name, result in results:
+            if isinstance(result, FanoutTimeout):
+                failed_crops.append({
+                    "crop": crop_name,
+                    "error": f"처방 조회 시간 초과: {result}"
+                })
+            elif isinstance(result, Exception):
+                failed_crops.append({
+                    "crop": crop_name,
+                    "error": f"비료 추천 처리 중 오류 발생: {result}"
+                })
+            elif result["status"] == "success":
+                updated[crop_name] = result
             else:
                 failed_crops.append({
                     "crop": crop_name,
                     "error": result["message"]
                 })
-        
-        # 전역 변수 업데이트
-        FERTILIZER_RECOMMENDATIONS["last_updated"] = datetime.now().isoformat()
-        FERTILIZER_RECOMMENDATIONS["soil_info"] = soil_data or USER_DATA["soil"]
-        FERTILIZER_RECOMMENDATIONS["farm_size_a"] = USER_DATA.get("farm_size_a", 250)
-        
+
+        failed_names = [failed["crop"] for failed in failed_crops]
+        _, snapshot = farm_crop_registry.store(farm_id).update(
+            lambda data: _with_results(
+                data, updated, failed_names, changed,
+                soil_info=soil,
+                farm_size_a=context.farm_size_a if farm_size_a is None else farm_size_a
+            ),
+            copy=False
+        )
+
         return {
-            "status": "success" if updated_crops else "error",
-            "message": f"{len(updated_crops)}개 작물 업데이트 완료",
-            "updated_crops": updated_crops,
+            "status": "success" if updated or not failed_crops else "error",
+            "message": f"{len(updated)}개 작물 업데이트 완료",
+            "updated_crops": list(updated),
+            "skipped_crops": skipped_crops,
             "failed_crops": failed_crops,
-            "total_crops": len(FERTILIZER_RECOMMENDATIONS["crops"])
+            "invalidated_crops": [crop_name for crop_name in failed_names if crop_name in changed],
+            "total_crops": len(snapshot.data["crops"]),
+            "version": snapshot.version
         }
-    
-    def get_current_recommendations(self) -> Dict:
+
+    def refresh_farm(self, farm: Dict, force: bool = False, deadline: float = None) -> Dict:
+        """
+        농장 입력값(토양검사 결과, 작물, 면적)이 바뀐 경우에만 비료 추천 재계산
+
+        Args:
+            farm: 농장 입력값 (farm_inputs 형식)
+            force: True면 입력값이 같아도 모든 작물을 다시 조회
+            deadline: 작물별 처방 조회 전체 마감 시간 (초)
+
+        Returns:
+            재계산 결과 (status "skipped": 입력값 지문이 마지막 성공 재계산과 같아 건너뜀)
+        """
+        farm_id, soil, crop_names, area_m2 = farm_inputs(farm)
+        fingerprint = farm_fingerprint(soil, crop_names, area_m2)
+        data = farm_crop_registry.snapshot(farm_id).data
+        if not force and data.get("fingerprint") == fingerprint:
+            return {
+                "status": "skipped",
+                "farm_id": farm_id,
+                "message": "입력값 변경 없음"
+            }
+
+        if list(data["crops"]) != crop_names:
+            registered = self.update_crop_list(crop_names, farm_id)
+            if registered["status"] != "success":
+                return {**registered, "farm_id": farm_id}
+        store = farm_crop_registry.store(farm_id)
+        if not crop_names:
+            store.update(lambda current: {**current, "fingerprint": fingerprint, "farm_size_a": area_m2 / 100},
+                         copy=False)
+            return {
+                "status": "success",
+                "farm_id": farm_id,
+                "message": "등록된 작물 없음",
+                "updated_crops": [],
+                "skipped_crops": []
+            }
+
+        result = self.update_all_fertilizer_recommendations(soil, deadline, farm_id, force, area_m2 / 100)
+        # 모든 작물이 성공했을 때만 지문을 기록 (실패한 작물은 다음 재계산에서 다시 조회)
+        if not result.get("failed_crops"):
+            store.update(lambda current: {**current, "fingerprint": fingerprint}, copy=False)
+        return {**result, "farm_id": farm_id}
+
+    def refresh_farms(self, farms: List[Dict], force: bool = False, deadline: float = None) -> Dict:
+        """
+        여러 농장의 비료 추천 증분 재계산 (야간 전체 갱신용)
+
+        입력값 지문이 같은 농장은 건너뛰고, 바뀐 농장도 입력값이 바뀐 작물만 다시 조회하므로
+        비용이 전체 농장 수가 아니라 변경량에 비례한다.
+
+        Returns:
+            재계산 요약 (recomputed_farms, skipped_farms 수, failed_farms, 작물 단위 집계)
+        """
+        recomputed_farms = []
+        failed_farms = []
+        skipped_farms = 0
+        recomputed_crops = 0
+        skipped_crops = 0
+        for farm in farms:
+            try:
+                result = self.refresh_farm(farm, force, deadline)
+            except (KeyError, TypeError, ValueError) as e:
+                failed_farms.append({"farm_id": farm.get("_id") if isinstance(farm, dict) else None,
+                                     "error": f"농장 입력값 오류: {e}"})
+                continue
+            if result["status"] == "skipped":
+                skipped_farms += 1
+                continue
+            recomputed_crops += len(result.get("updated_crops", []))
+            skipped_crops += len(result.get("skipped_crops", []))
+            if result["status"] == "success" and not result.get("failed_crops"):
+                recomputed_farms.append(result["farm_id"])
+            else:
+                failed_farms.append({
+                    "farm_id": result["farm_id"],
+                    "error": result["message"],
+                    "failed_crops": result.get("failed_crops", [])
+                })
+
+        return {
+            "status": "success",
+            "message": f"{len(recomputed_farms)}개 농장 재계산, {skipped_farms}개 농장 변경 없음",
+            "recomputed_farms": recomputed_farms,
+            "skipped_farms": skipped_farms,
+            "failed_farms": failed_farms,
+            "recomputed_crops": recomputed_crops,
+            "skipped_crops": skipped_crops
+        }
+
+    def refresh_crop(self, farm_id: str, crop_name: str) -> Optional[Dict]:
+        """
+        작물 1개 처방 재검증 (백그라운드 갱신용, 마지막 업데이트의 토양 정보 기준)
+
+        갱신 중 토양 정보가 바뀌었으면(다른 업데이트가 먼저 발행) 결과를 버린다.
+
+        Returns:
+            비료 추천 결과 또는 None (등록되지 않은 작물)
+        """
+        data = farm_crop_registry.snapshot(farm_id).data
+        if crop_name not in data["crops"]:
+            return None
+        soil_info = data["soil_info"]
+        soil = thaw(soil_info) if soil_info is not None else resolve_farm_context(farm_id).soil
+        result = self.get_fertilizer_recommendation_for_crop(crop_name, soil, revalidate=True, farm_id=farm_id)
+
+        def _apply(current):
+            if current["soil_info"] is not soil_info:
+                return None
+            if result["status"] == "success":
+                return _with_results(current, {crop_name: result}, [])
+            return _with_results(current, {}, [crop_name])
+        farm_crop_registry.store(farm_id).update(_apply, copy=False)
+        return result
+
+    def due_crops(self, now: float = None):
+        """선제 갱신 시점이 된 (농장 ID, 작물명) 목록 (추천 데이터가 아직 없는 작물 포함)"""
+        now = time.time() if now is None else now
+        due = []
+        for farm_id in farm_crop_registry.farm_ids():
+            crops = farm_crop_registry.snapshot(farm_id).data["crops"]
+            for crop_name, crop in crops.items():
+                if crop["refresh_at"] is None or crop["refresh_at"] <= now:
+                    due.append((farm_id, crop_name))
+        return due
+
+    def _revalidate_expired(self, farm_id: str, crops, now: float) -> List[str]:
+        """만료된 작물의 백그라운드 갱신 요청 (기다리지 않음) → 만료된 작물명 목록"""
+        expired = [crop_name for crop_name, crop in crops.items()
+                   if crop["expires_at"] is not None and crop["expires_at"] <= now]
+        for crop_name in expired:
+            recommendation_refresher.request((farm_id, crop_name))
+        return expired
+
+    def get_current_recommendations(self, known_version: Optional[int] = None,
+                                    farm_id: str = DEFAULT_FARM_ID) -> Dict:
         """
         현재 저장된 모든 비료 추천 데이터 반환
-        
+
+        만료된 작물이 있어도 현재 스냅샷을 바로 반환하고, 해당 작물은 백그라운드에서 갱신한다.
+
+        Args:
+            known_version: 클라이언트가 가진 스냅샷 버전 (현재 버전과 같으면 데이터 없이 not_modified 반환)
+            farm_id: 농장 ID
+
         Returns:
-            전체 비료 추천 데이터
+            전체 비료 추천 데이터 (crops는 등록 순서 리스트, summary.stale_crops: 갱신 대기 중인 만료 작물)
         """
-        global FERTILIZER_RECOMMENDATIONS
-        
+        snapshot = farm_crop_registry.snapshot(farm_id)
+        expired = self._revalidate_expired(farm_id, snapshot.data["crops"], time.time())
+        if known_version is not None and known_version == snapshot.version:
+            return {
+                "status": "not_modified",
+                "version": snapshot.version
+            }
+
+        data = snapshot.to_dict()
+        crops = list(data["crops"].values())
+        data["crops"] = crops
         return {
             "status": "success",
-            "data": FERTILIZER_RECOMMENDATIONS,
+            "version": snapshot.version,
+            "farm_id": farm_id,
+            "data": data,
             "summary": {
-                "total_crops": len(FERTILIZER_RECOMMENDATIONS["crops"]),
-                "crops_with_data": len([crop for crop in FERTILIZER_RECOMMENDATIONS["crops"] if crop["fertilizer_data"]]),
-                "last_updated": FERTILIZER_RECOMMENDATIONS["last_updated"]
+                "total_crops": len(crops),
+                "crops_with_data": len([crop for crop in crops if crop["fertilizer_data"]]),
+                "stale_crops": expired,
+                "last_updated": data["last_updated"]
             }
         }
-    
-    def get_crop_recommendation(self, crop_name: str) -> Dict:
+
+    def get_crop_recommendation(self, crop_name: str, farm_id: str = DEFAULT_FARM_ID) -> Dict:
         """
         특정 작물의 저장된 비료 추천 데이터 반환
-        
+
         Args:
             crop_name: 작물명
-            
+            farm_id: 농장 ID
+
         Returns:
             해당 작물의 비료 추천 데이터
         """
-        global FERTILIZER_RECOMMENDATIONS
-        
-        for crop_info in FERTILIZER_RECOMMENDATIONS["crops"]:
-            if crop_info["name"] == crop_name:
-                return {
-                    "status": "success",
-                    "crop_name": crop_name,
-                    "crop_code": crop_info["code"],
-                    "fertilizer_data": crop_info["fertilizer_data"],
-                    "last_updated": crop_info["last_updated"]
-                }
-        
+        snapshot = farm_crop_registry.snapshot(farm_id)
+        crop_info = snapshot.data["crops"].get(crop_name)
+        if crop_info is not None:
+            expired = self._revalidate_expired(farm_id, {crop_name: crop_info}, time.time())
+            return {
+                "status": "success",
+                "crop_name": crop_name,
+                "crop_code": crop_info["code"],
+                "fertilizer_data": thaw(crop_info["fertilizer_data"]),
+                "last_updated": crop_info["last_updated"],
+                "stale": bool(expired),
+                "version": snapshot.version
+            }
+
         return {
             "status": "error",
             "message": f"등록되지 않은 작물입니다: {crop_name}"
         }
-    
-    def remove_crop(self, crop_name: str) -> Dict:
+
+    def remove_crop(self, crop_name: str, farm_id: str = DEFAULT_FARM_ID) -> Dict:
         """
         작물 제거
-        
+
         Args:
             crop_name: 제거할 작물명
-            
+            farm_id: 농장 ID
+
         Returns:
             제거 결과
         """
-        global FERTILIZER_RECOMMENDATIONS
-        
-        original_count = len(FERTILIZER_RECOMMENDATIONS["crops"])
-        FERTILIZER_RECOMMENDATIONS["crops"] = [
-            crop for crop in FERTILIZER_RECOMMENDATIONS["crops"] 
-            if crop["name"] != crop_name
-        ]
-        
-        if len(FERTILIZER_RECOMMENDATIONS["crops"]) < original_count:
-            FERTILIZER_RECOMMENDATIONS["last_updated"] = datetime.now().isoformat()
+        if crop_name not in farm_crop_registry.snapshot(farm_id).data["crops"]:
+            return {
+                "status": "error",
+                "message": f"제거할 작물을 찾을 수 없습니다: {crop_name}"
+            }
+
+        def _remove(data):
+            if crop_name not in data["crops"]:
+                return None
+            crops = dict(data["crops"])
+            del crops[crop_name]
+            return {**data, "crops": crops, "last_updated": datetime.now().isoformat()}
+        removed, snapshot = farm_crop_registry.store(farm_id).update(_remove, copy=False)
+
+        if removed:
             return {
                 "status": "success",
                 "message": f"{crop_name} 작물이 제거되었습니다.",
-                "remaining_crops": [crop["name"] for crop in FERTILIZER_RECOMMENDATIONS["crops"]]
+                "remaining_crops": list(snapshot.data["crops"]),
+                "version": snapshot.version
             }
         else:
             return {
@@ -252,6 +626,120 @@ class FertilizerManager:
 # 전역 매니저 인스턴스
 fertilizer_manager = FertilizerManager()
 
+# 저장된 추천 백그라운드 갱신 작업자
+# 주기 스캔 스케줄러는 start_recommendation_refresher로 노드당 한 프로세스에서만 실행,
+# 읽기 경로의 만료 작물 갱신 요청은 모든 워커에서 동작
+recommendation_refresher = RefreshWorker(
+    fertilizer_manager.due_crops,
+    lambda key: fertilizer_manager.refresh_crop(*key),
+    interval=float(os.getenv('RECOMMENDATION_REFRESH_INTERVAL', 30)),
+    workers=int(os.getenv('RECOMMENDATION_REFRESH_WORKERS', 2)),
+    name="recommendation-refresh"
+)
+
+# 스케줄러 실행 프로세스 선정 잠금 (같은 노드의 워커끼리 같은 파일 사용)
+recommendation_refresh_lock = ProcessLock(os.getenv(
+    'RECOMMENDATION_REFRESH_LOCK',
+    os.path.join(tempfile.gettempdir(), 'agrilook-recommendation-refresh.lock')
+))
+
+# 잠금을 잡지 못한 워커의 재시도 간격 (초) - 스케줄러 프로세스가 종료되면 다른 워커가 이어받음
+_REFRESH_LOCK_RETRY = 60
+_refresh_lock_checked_at = None
+
+
+def start_recommendation_refresher() -> bool:
+    """
+    백그라운드 갱신 스케줄러 시작 (요청을 처리하는 워커 프로세스에서 호출, 예: Flask before_request)
+
+    모듈 import 시점에 시작하면 gunicorn --preload에서는 master 프로세스의 스레드가 fork 후 사라지고,
+    preload 없이는 워커마다 스케줄러가 생기므로, 워커에서 잠금 파일을 잡은 한 프로세스만 시작한다.
+    잠금을 못 잡은 워커는 _REFRESH_LOCK_RETRY 간격으로만 다시 시도한다.
+
+    Returns:
+        현재 프로세스에서 스케줄러가 실행 중이면 True
+    """
+    global _refresh_lock_checked_at
+    if recommendation_refresher.running:
+        return True
+    now = time.monotonic()
+    if _refresh_lock_checked_at is not None and now - _refresh_lock_checked_at < _REFRESH_LOCK_RETRY:
+        return False
+    _refresh_lock_checked_at = now
+    if not recommendation_refresh_lock.acquire():
+        return False
+    recommendation_refresher.start()
+    return True
+
+
+def farm_document(context) -> Dict:
+    """농장 컨텍스트 → 재계산 입력 농장 문서 (최신 토양검사 결과 포함)"""
+    return {**context.farm, 'soil': context.soil}
+
+
+# 재계산 대기 중인 농장 (농장 ID → (농장 문서 또는 None(저장소에서 조회), force))
+# 같은 농장을 대기 중에 다시 요청하면 마지막 요청의 입력값으로 한 번만 재계산 (force는 하나라도 True면 True)
+_queued_farms = {}
+_queued_farms_lock = threading.Lock()
+
+
+def _run_farm_refresh(farm_id):
+    """대기 중인 농장 재계산 실행 (실행 중 다시 요청된 입력값이 있으면 이어서 재계산)"""
+    while True:
+        with _queued_farms_lock:
+            queued = _queued_farms.pop(farm_id, None)
+        if queued is None:
+            return
+        farm, force = queued
+        if farm is None:
+            farm = farm_document(resolve_farm_context(farm_id))
+        result = fertilizer_manager.refresh_farm(farm, force)
+        if result["status"] == "error" or result.get("failed_crops"):
+            raise RuntimeError(result["message"])
+
+
+# 농장 단위 재계산 작업자 (주기 스캔 없이 요청된 농장만 재계산, 모든 워커에서 동작)
+farm_refresher = RefreshWorker(
+    lambda: (),
+    _run_farm_refresh,
+    workers=int(os.getenv('FARM_REFRESH_WORKERS', 2)),
+    name="farm-refresh"
+)
+
+
+def request_farm_refresh(farms: List[Optional[Dict]], farm_ids: List = None, force: bool = False) -> Dict:
+    """
+    여러 농장의 비료 추천 재계산 요청 (바로 반환, 재계산은 farm_refresher가 백그라운드에서 실행)
+
+    Args:
+        farms: 농장 문서 목록 (farm_inputs 형식, None이면 저장소의 농장 문서와 최신 토양검사 사용)
+        farm_ids: farms와 같은 순서의 농장 ID 목록 (생략 시 농장 문서의 _id)
+        force: True면 입력값이 같아도 모든 작물을 다시 조회
+
+    Returns:
+        요청 요약 (queued_farms: 새로 요청한 농장 수, already_queued: 이미 대기/실행 중이던 농장 수)
+    """
+    if farm_ids is None:
+        farm_ids = [farm.get("_id") for farm in farms]
+    queued = 0
+    already_queued = 0
+    for farm_id, farm in zip(farm_ids, farms):
+        farm_id = DEFAULT_FARM_ID if farm_id is None else farm_id
+        with _queued_farms_lock:
+            # 대기 중인 강제 재계산(force=True)이 뒤이은 일반 요청으로 사라지지 않도록 force는 합침
+            queued_force = _queued_farms.get(farm_id, (None, False))[1]
+            _queued_farms[farm_id] = (farm, queued_force or force)
+        if farm_refresher.request(farm_id):
+            queued += 1
+        else:
+            already_queued += 1
+    return {
+        "status": "accepted",
+        "message": f"{queued}개 농장 재계산 요청, {already_queued}개 농장 이미 대기 중",
+        "queued_farms": queued,
+        "already_queued": already_queued
+    }
+
 # 초기 설정: USER_DATA의 작물들로 초기화
 def initialize_from_user_data():
     """USER_DATA의 작물 정보로 초기화"""
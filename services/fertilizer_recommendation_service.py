@@ -3,8 +3,8 @@
 요청 받은 작물에 대해서만 비료 추천을 간소화하여 처리
 """
 from typing import Dict
-from config.user_data import USER_DATA
 from config.crop_codes import get_crop_code
+from services.farm_repository import resolve_farm_context
 from services.soil_fertilizer_service import SoilFertilizerService
 
 class FertilizerRecommendationService:
@@ -12,19 +12,17 @@ class FertilizerRecommendationService:
     def __init__(self):
         self.soil_service = SoilFertilizerService()
 
-    def get_fertilizer_recommendation(self, crop_name: str, soil_data: Dict = None) -> Dict:
+    def get_fertilizer_recommendation(self, crop_name: str, soil_data: Dict = None, context=None) -> Dict:
         """
         단일 작물에 대한 비료 추천 처리 (간소화 구조)
+
+        soil_data가 없으면 농장의 최신 토양검사 결과, context(FarmContext)가 없으면 기본 농장 사용
         """
-        if soil_data is None:
-            soil_data = USER_DATA["soil"]
-        farm = USER_DATA.get("farm", {})
-        farm_size_a = USER_DATA.get("farm_size_a", 250)
-        area_sqm = farm.get("area_m2", farm_size_a * 100)
-        field_id = farm.get("_id", "farm001")
-        # SoilFertilizerService에서 통합 추천 결과 반환
-        self.soil_service.get_farm_info()['crop_name'] = crop_name
-        result = self.soil_service.get_recommendation_bundle()
+        context = context or resolve_farm_context()
+        area_sqm = context.area_m2
+        field_id = context.farm_id
+        # SoilFertilizerService에서 통합 추천 결과 반환 (작물/토양은 요청별 farm_info로 전달)
+        result = self.soil_service.get_recommendation_bundle(context, crop_name, soil_data)
         return result
 
     # 상세 추천 함수는 더 이상 사용하지 않음 (통합 추천으로 대체)
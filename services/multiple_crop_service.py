@@ -2,31 +2,38 @@
 단일 작물 비료 추천 서비스
 요청 받은 작물에 대해서만 비료 추천을 간소화하여 처리
 """
-from typing import Dict
-from config.user_data import USER_DATA
+from typing import Dict, List
 from config.crop_codes import get_crop_code
+from services.farm_repository import resolve_farm_context
 from services.soil_fertilizer_service import SoilFertilizerService
+from utils.fanout import fan_out
+from utils.fertilizer_recommender import recommend_fertilizers
 
 class FertilizerRecommendationService:
     """작물 비료 추천 서비스 (요청 받은 작물만 추천)"""
     def __init__(self):
         self.soil_service = SoilFertilizerService()
 
-    def get_fertilizer_recommendation(self, crop_name: str, soil_data: Dict = None) -> Dict:
+    def get_fertilizer_recommendation(self, crop_name: str, soil_data: Dict = None, context=None) -> Dict:
         """
         단일 작물에 대한 비료 추천 처리 (간소화 구조)
+
+        soil_data가 없으면 농장의 최신 토양검사 결과, context(FarmContext)가 없으면 기본 농장 사용
+        처방 조회에 실패하면 {"status": "error", "message", "crop"} 반환
         """
-        if soil_data is None:
-            soil_data = USER_DATA["soil"]
-        farm = USER_DATA.get("farm", {})
-        farm_size_a = USER_DATA.get("farm_size_a", 250)
-        area_sqm = farm.get("area_m2", farm_size_a * 100)
-        field_id = farm.get("_id", "farm001")
-        # SoilFertilizerService에서 통합 추천 결과 반환
-        self.soil_service.get_farm_info()['crop_name'] = crop_name
-        result = self.soil_service.get_recommendation_bundle()
-        compost = result.get("compost_recommendations", {})
-        ferts = result.get("fertilizer_recommendations", {})
+        context = context or resolve_farm_context()
+        area_sqm = context.area_m2
+        field_id = context.farm_id
+        # 처방 조회 + 제품 추천 (처방 조회 실패나 지원하지 않는 작물은 빈 결과)
+        result = self._get_single_crop_recommendation(crop_name, soil_data, context.farm_size_a, context)
+        if not result:
+            return {
+                "status": "error",
+                "message": f"{crop_name}에 대한 비료 추천 데이터를 가져올 수 없습니다.",
+                "crop": {"name": crop_name}
+            }
+        compost = result["compost_recommendations"]
+        ferts = result["fertilizer_recommendations"]
         def simple_fert_list(fert_list):
             return [
                 {
@@ -41,6 +48,7 @@ class FertilizerRecommendationService:
                 for item in fert_list if item
             ]
         return {
+            "status": "success",
             "crop": {"name": crop_name},
             "field": {"id": field_id, "area_sqm": area_sqm},
             "fertilizer": {
@@ -56,7 +64,45 @@ class FertilizerRecommendationService:
         }
 
 
-    def _get_single_crop_recommendation(self, crop_name: str, soil_data: Dict, farm_size_a: int) -> Dict:
+    def get_fertilizer_recommendations(self, crop_names: List[str], soil_data: Dict = None,
+                                       deadline: float = None, context=None) -> Dict:
+        """
+        여러 작물 비료 추천 (작물별 동시 처리, 전체 마감 시간 적용)
+
+        Args:
+            crop_names: 작물명 리스트
+            soil_data: 토양 데이터 (None이면 농장의 최신 토양검사 결과 사용)
+            deadline: 전체 마감 시간 (초, 기본 CROP_FANOUT_DEADLINE)
+            context: FarmContext (None이면 기본 농장)
+
+        Returns:
+            {"status", "recommendations": {작물명: 추천 결과}, "updated_crops", "failed_crops"}
+            마감 시간을 넘기거나 처방 조회에 실패한 작물은 failed_crops에만 포함 (나머지 결과는 그대로 반환)
+        """
+        context = context or resolve_farm_context()
+        recommendations = {}
+        failed_crops = []
+        results = fan_out(
+            lambda crop_name: self.get_fertilizer_recommendation(crop_name, soil_data, context),
+            list(dict.fromkeys(crop_names)),
+            deadline
+        )
+        for crop_name, result in results:
+            if isinstance(result, Exception):
+                failed_crops.append({"crop": crop_name, "error": str(result)})
+            elif result["status"] == "error":
+                failed_crops.append({"crop": crop_name, "error": result["message"]})
+            else:
+                recommendations[crop_name] = result
+        return {
+            "status": "success" if recommendations else "error",
+            "recommendations": recommendations,
+            "updated_crops": list(recommendations),
+            "failed_crops": failed_crops
+        }
+
+    def _get_single_crop_recommendation(self, crop_name: str, soil_data: Dict, farm_size_a: int,
+                                        context=None) -> Dict:
         """
         단일 작물에 대한 상세한 비료 추천 (단일 작물 API와 동일한 수준)
         
@@ -64,6 +110,7 @@ class FertilizerRecommendationService:
             crop_name: 작물명
             soil_data: 토양 데이터
             farm_size_a: 농장 면적 (a)
+            context: FarmContext (기본 토양 데이터, None이면 기본 농장)
             
         Returns:
             상세한 단일 작물 비료 추천 결과
@@ -72,61 +119,44 @@ class FertilizerRecommendationService:
         crop_code = get_crop_code(crop_name)
         if not crop_code:
             return {}
-        # 농장 정보 준비 (단일 작물 API와 동일한 구조)
-        farm_info = self.soil_service.get_farm_info()
-        farm_info['crop_name'] = crop_name
-        farm_info['crop_code'] = crop_code
-        farm_info['soil'].update(soil_data)
-        farm_info['farm_size_a'] = farm_size_a
-        # 비료 API 호출
-        fertilizer_result = self.soil_service.call_fertilizer_api(farm_info)
-        if not fertilizer_result or not fertilizer_result.get("success"):
+        # 농장 정보 준비 (단일 작물 API와 동일한 구조, 공유 토양 데이터는 수정하지 않고 요청별 복사본 구성)
+        base_info = self.soil_service.get_farm_info(context)
+        farm_info = {
+            **base_info,
+            'crop_name': crop_name,
+            'crop_code': crop_code,
+            'soil': {**base_info['soil'], **(soil_data or {})},
+            'farm_size_a': farm_size_a,
+            'farm_size_10a': farm_size_a / 10
+        }
+        # 처방 API 호출 (캐시/병합 경로)
+        fertilizer_result = self.soil_service.fetch_fertilizer_api(farm_info)
+        if not fertilizer_result.success:
             return {}
-        # 영양분 요구량 계산
-        nutrient_needs = self.soil_service.calculate_total_nutrients(fertilizer_result, farm_info)
-        # 비료 제품 추천
-        base_recommendations = self.soil_service.recommend_fertilizers(
-            nutrient_needs['base']['N'],
-            nutrient_needs['base']['P'], 
-            nutrient_needs['base']['K'],
-            "base", 3
-        )
-        additional_recommendations = self.soil_service.recommend_fertilizers(
-            nutrient_needs['additional']['N'],
-            nutrient_needs['additional']['P'], 
-            nutrient_needs['additional']['K'],
-            "additional", 3
-        )
-        # 퇴비 추천 계산
-        compost_needs = self.soil_service.calculate_compost_needs(fertilizer_result, farm_info)
-        # 비료 사용량 계산 (헬퍼 함수)
-        def _process_fertilizers(recommendations, fert_type):
-            fertilizers = []
-            for rec in recommendations:
-                usage_data = self.soil_service.calculate_fertilizer_usage(
-                    rec, 
-                    nutrient_needs[fert_type]['N'],   # 전체 농장 필요량 (kg)
-                    nutrient_needs[fert_type]['P'],  # 전체 농장 필요량 (kg)
-                    nutrient_needs[fert_type]['K']   # 전체 농장 필요량 (kg)
-                )
-                fertilizers.append(usage_data)
-            return fertilizers
-        base_fertilizers = _process_fertilizers(base_recommendations, 'base')
-        additional_fertilizers = _process_fertilizers(additional_recommendations, 'additional')
+        # 농장 전체 영양분 요구량 및 퇴비량
+        nutrient_needs = self.soil_service.get_nutrient_requirements(fertilizer_result, farm_info)
+        compost_needs = self.soil_service.get_compost_amounts(fertilizer_result, farm_info)
+        # 비료 제품 추천 (단일 작물 API와 같은 처방 기준 사용량)
+        base_fertilizers = [
+            fert.to_dict() for fert in recommend_fertilizers(self.soil_service, fertilizer_result, "base", 3)
+        ]
+        additional_fertilizers = [
+            fert.to_dict() for fert in recommend_fertilizers(self.soil_service, fertilizer_result, "topdress", 3)
+        ]
         return {
             "crop_name": crop_name,
             "crop_code": crop_code,
             "fertilizer_prescription": {
                 "standard_per_1000sqm": {
                     "base": {
-                        "N": float(fertilizer_result.get("pre_Fert_N", 0)),
-                        "P": float(fertilizer_result.get("pre_Fert_P", 0)),
-                        "K": float(fertilizer_result.get("pre_Fert_K", 0))
+                        "N": fertilizer_result.pre_n,
+                        "P": fertilizer_result.pre_p,
+                        "K": fertilizer_result.pre_k
                     },
                     "additional": {
-                        "N": float(fertilizer_result.get("post_Fert_N", 0)),
-                        "P": float(fertilizer_result.get("post_Fert_P", 0)),
-                        "K": float(fertilizer_result.get("post_Fert_K", 0))
+                        "N": fertilizer_result.post_n,
+                        "P": fertilizer_result.post_p,
+                        "K": fertilizer_result.post_k
                     }
                 },
                 "total_farm_needs": nutrient_needs
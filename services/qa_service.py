@@ -6,7 +6,7 @@ from langchain.chains.retrieval_qa.base import RetrievalQA
 from langchain.prompts import PromptTemplate
 from langchain_community.retrievers import BM25Retriever
 from langchain.retrievers import EnsembleRetriever
-from config.user_data import USER_DATA
+from services.farm_state import farm_profile
 from config.crop_codes import get_crop_code, get_crop_name
 
 
@@ -83,7 +83,7 @@ def load_qa_chain():
         api_key=adotx_api_key
     )
     
-    # USER_DATA 기반 프롬프트
+    # 사용자/농장 정보 기반 프롬프트 (USER_DATA + 농장 상태)
 
     template = f"""
 너는 작물 재배, 병충해 방제, 농업 기상 해석에 전문성을 가진 농업 전문가다. 
@@ -96,7 +96,7 @@ def load_qa_chain():
 
 현재 사용자 농장 정보:
 - 현재 날짜: 2025년 8월 14일
-- 사용자 정보 : {USER_DATA}
+- 사용자 정보 : {farm_profile()}
 
 사용자 농지 데이터는 참고만 하고, 절대 새로운 수치·사실 생성 근거로 사용하지 마,
 RAG 컨텍스트에서 동일 주제 관련 정보가 있을 때만 조언에 포함.
@@ -1,5 +1,5 @@
 from langchain.prompts import PromptTemplate
-from config.user_data import USER_DATA
+from services.farm_state import farm_profile
 
 
 def create_routing_chain(llm):
@@ -30,7 +30,7 @@ def create_routing_chain(llm):
 
 
 def answer_without_retrieval(question: str, llm) -> str:
-    """검색 없이 USER_DATA 정보만으로 답변"""
+    """검색 없이 사용자/농장 정보만으로 답변"""
     current_date = "2025년 8월 14일"
     direct_prompt = f"""
 너는 농업 전문가야. 아래 사용자 정보를 바탕으로 질문에 답변해줘.
@@ -42,7 +42,7 @@ def answer_without_retrieval(question: str, llm) -> str:
 
 현재 정보:
 - 현재 날짜: {current_date}
-- 사용자 정보: {USER_DATA}
+- 사용자 정보: {farm_profile()}
 
 질문: {question}
 
@@ -1,40 +1,74 @@
-import requests
 import os
-import json
-import xmltodict
 from dotenv import load_dotenv
-from config.user_data import USER_DATA
+from services.farm_repository import resolve_farm_context
+from utils.sqlite_cache import create_cache
+from utils.singleflight import SingleFlight
+from utils.http_client import http_client
+from utils.fertilizer_catalog import fertilizer_catalog
+from utils.prescription_parser import parse_prescription_xml
+from utils.fertilizer_records import Prescription
+from utils.prescription_grid import prescription_grid
 
 # 환경변수 로드
 load_dotenv()
 
+# 처방 캐시: 작물 코드 + 토양 조건 → (XML 원문, 파싱 결과)
+# SHARED_CACHE_PATH 설정 시 gunicorn 워커 간 공유 (SQLite WAL)
+prescription_cache = create_cache(
+    'prescription',
+    maxsize=int(os.getenv('PRESCRIPTION_CACHE_SIZE', 2048)),
+    ttl=float(os.getenv('PRESCRIPTION_CACHE_TTL', 86400))
+)
+
+# 처방 조회 방식: live(실시간 API), grid(격자점 일치 시 격자 사용), interpolate(격자 범위 안이면 보간)
+# grid/interpolate에서도 격자 밖 조건은 실시간 API로 조회
+PRESCRIPTION_MODE = os.getenv('PRESCRIPTION_MODE', 'live')
+
+# 동일 처방 동시 요청 병합 (캐시 miss 시 upstream 호출 1회로 합침)
+prescription_flight = SingleFlight()
+
+
+def prescription_cache_key(params):
+    """처방 API 파라미터를 캐시 키로 변환 (6.5와 '6.5'를 같은 키로 취급)"""
+    def _normalize(value):
+        try:
+            return float(value)
+        except (TypeError, ValueError):
+            return value
+    return (
+        params['crop_Code'],
+        _normalize(params['acid']),
+        _normalize(params['om']),
+        _normalize(params['vldpha']),
+        _normalize(params['posifert_K']),
+        _normalize(params['posifert_Ca']),
+        _normalize(params['posifert_Mg']),
+        _normalize(params['selc'])
+    )
+
+
+class PrescriptionAPIError(Exception):
+    """처방 API가 200 이외의 상태 코드를 반환한 경우"""
+    def __init__(self, status_code):
+        super().__init__(f"API response error: {status_code}")
+        self.status_code = status_code
+
+
 class SoilFertilizerService:
     def get_raw_public_api_result(self, farm_info):
         """공공데이터포털 API 원본 결과 반환"""
         try:
-            soil = farm_info['soil']
-            params = {
-                'serviceKey': self.api_key,
-                'crop_Code': farm_info['crop_code'],
-                'acid': soil.get('ph', 6.5),
-                'om': soil.get('om', 22),
-                'vldpha': soil.get('vldpha', 10),
-                'posifert_K': soil.get('posifert_K', 4),
-                'posifert_Ca': soil.get('posifert_Ca', 6),
-                'posifert_Mg': soil.get('posifert_Mg', 13),
-                'selc': soil.get('selc', 6)
-            }
-            response = requests.get(self.api_url, params=params, timeout=10)
-            if response.status_code == 200:
-                return response.text
-            else:
-                return {"error": "API response error", "status_code": response.status_code}
+            xml_text, _ = self._get_prescription(farm_info, use_grid=False)
+            return xml_text
+        except PrescriptionAPIError as e:
+            return {"error": "API response error", "status_code": e.status_code}
         except Exception as e:
             return {"error": str(e)}
-    def get_recommendation_bundle(self):
+    def get_recommendation_bundle(self, context=None, crop_name=None, soil=None):
         print("[DEBUG] get_recommendation_bundle called")
-        """비료 추천 결과를 통합 구조로 반환 (프론트엔드용)"""
-        farm_info = self.get_farm_info()
+        """비료 추천 결과를 통합 구조로 반환 (프론트엔드용, context: FarmContext - 없으면 기본 농장)"""
+        context = context or resolve_farm_context()
+        farm_info = self.get_farm_info(context, crop_name, soil)
         fertilizer_data = self.fetch_fertilizer_api(farm_info)
         compost = self.get_compost_amounts(fertilizer_data, farm_info)
         nutrients = self.get_nutrient_requirements(fertilizer_data, farm_info)
@@ -55,7 +89,7 @@ class SoilFertilizerService:
         add_ferts = simple_fert_list(self.recommend_products(
             nutrients['additional']['N'], nutrients['additional']['P'], nutrients['additional']['K'], "additional", 3))
         crop_name = farm_info.get('crop_name', '')
-        farm = USER_DATA.get('farm', {})
+        farm = context.farm
         area_sqm = farm.get('area_m2', 0)
         farm_id = farm.get('_id', '')
         return {
@@ -74,201 +108,232 @@ class SoilFertilizerService:
         """퇴비 필요량 반환"""
         farm_size_10a = farm_info['farm_size_10a']
         print(f"[DEBUG] farm_size_10a: {farm_size_10a}")
-        return {
-            "cattle_kg": float(fertilizer_data.get('pre_Compost_Cattl', '0')) * farm_size_10a,
-            "chicken_kg": float(fertilizer_data.get('pre_Compost_Chick', '0')) * farm_size_10a,
-            "mixed_kg": float(fertilizer_data.get('pre_Compost_Mix', '0')) * farm_size_10a,
-            "pig_kg": float(fertilizer_data.get('pre_Compost_Pig', '0')) * farm_size_10a,
-        }
+        return fertilizer_data.compost_amounts(farm_size_10a)
     def get_nutrient_requirements(self, fertilizer_data, farm_info):
         """농장 전체 양분 필요량 반환"""
         farm_size_10a = farm_info['farm_size_10a']
+        base_n, base_p, base_k = fertilizer_data.needs("base")
+        add_n, add_p, add_k = fertilizer_data.needs("topdress")
         return {
             'base': {
-                'N': float(fertilizer_data.get('pre_Fert_N', '0')) * farm_size_10a,
-                'P': float(fertilizer_data.get('pre_Fert_P', '0')) * farm_size_10a,
-                'K': float(fertilizer_data.get('pre_Fert_K', '0')) * farm_size_10a
+                'N': base_n * farm_size_10a,
+                'P': base_p * farm_size_10a,
+                'K': base_k * farm_size_10a
             },
             'additional': {
-                'N': float(fertilizer_data.get('post_Fert_N', '0')) * farm_size_10a,
-                'P': float(fertilizer_data.get('post_Fert_P', '0')) * farm_size_10a,
-                'K': float(fertilizer_data.get('post_Fert_K', '0')) * farm_size_10a
+                'N': add_n * farm_size_10a,
+                'P': add_p * farm_size_10a,
+                'K': add_k * farm_size_10a
             }
         }
-    def fetch_fertilizer_api(self, farm_info):
-        """공공데이터 API 호출"""
+    def fetch_fertilizer_api(self, farm_info, revalidate=False):
+        """
+        공공데이터 API 호출
+
+        Args:
+            revalidate: True면 캐시를 읽지 않고 upstream에서 다시 조회해 캐시 갱신 (백그라운드 갱신용)
+        """
         try:
-            soil = farm_info['soil']
-            params = {
-                'serviceKey': self.api_key,
-                'crop_Code': farm_info['crop_code'],
-                'acid': soil.get('ph', 6.5),
-                'om': soil.get('om', 22),
-                'vldpha': soil.get('vldpha', 10),
-                'posifert_K': soil.get('posifert_K', 4),
-                'posifert_Ca': soil.get('posifert_Ca', 6),
-                'posifert_Mg': soil.get('posifert_Mg', 13),
-                'selc': soil.get('selc', 6)
-            }
-            response = requests.get(self.api_url, params=params, timeout=10)
-            if response.status_code == 200:
-                parsed_data = self.parse_fertilizer_response(response.text)
-                if parsed_data and parsed_data.get('success'):
-                    return parsed_data
-                else:
-                    return self._get_test_data()
+            _, parsed_data = self._get_prescription(farm_info, revalidate=revalidate)
+            if parsed_data.success:
+                # 캐시의 레코드를 그대로 공유 (Prescription은 읽기 전용)
+                return parsed_data
             else:
                 return self._get_test_data()
         except Exception:
             return self._get_test_data()
+    def _get_test_data(self):
+        """API 실패 시 기본 처방 (수치 0, success=False)"""
+        return Prescription.error('', '처방 API 응답 없음 (기본값)')
+    def _build_api_params(self, farm_info):
+        """처방 API 요청 파라미터 구성 (serviceKey 제외)"""
+        soil = farm_info['soil']
+        return {
+            'crop_Code': farm_info['crop_code'],
+            'acid': soil.get('ph', 6.5),
+            'om': soil.get('om', 22),
+            'vldpha': soil.get('vldpha', 10),
+            'posifert_K': soil.get('posifert_K', 4),
+            'posifert_Ca': soil.get('posifert_Ca', 6),
+            'posifert_Mg': soil.get('posifert_Mg', 13),
+            'selc': soil.get('selc', 6)
+        }
+    def prescription_key(self, farm_info):
+        """처방 조건(작물 코드 + 토양 7개 항목) 키 - 같은 키는 같은 처방 (중복 조회 제거/캐시 키)"""
+        return prescription_cache_key(self._build_api_params(farm_info))
+    def _get_prescription(self, farm_info, use_grid=True, revalidate=False):
+        """
+        처방 조회 (격자 → 캐시 → 실시간 API 순)
+
+        처방 결과는 작물 코드와 토양 7개 항목에만 의존하므로 해당 값으로 캐시한다.
+        캐시 miss 시 같은 키의 동시 요청은 upstream 호출 1회로 병합한다.
+        정상 파싱된 응답만 캐시하며, (XML 원문, 파싱 결과) 튜플을 반환한다 (격자 응답은 XML 원문이 None).
+        revalidate=True면 캐시 조회를 건너뛰고 upstream 결과로 캐시를 덮어쓴다.
+        """
+        params = self._build_api_params(farm_info)
+        if use_grid and PRESCRIPTION_MODE != 'live':
+            record = prescription_grid.lookup(params, interpolate=PRESCRIPTION_MODE == 'interpolate')
+            if record is not None:
+                return None, record
+        key = prescription_cache_key(params)
+        cached = None if revalidate else prescription_cache.get(key)
+        if cached is not None:
+            return cached
+        return prescription_flight.do(key, lambda: self._request_prescription(params, key))
+    def _request_prescription(self, params, key):
+        """처방 API 실제 호출 (singleflight 리더만 실행)"""
+        result = self._call_prescription_api(params)
+        if result[1].success:
+            prescription_cache.set(key, result)
+        return result
+    def _call_prescription_api(self, params):
+        """처방 API 호출 및 파싱 → (XML 원문, Prescription)"""
+        response = http_client.get(self.api_url, params={'serviceKey': self.api_key, **params}, timeout=10)
+        if response.status_code != 200:
+            raise PrescriptionAPIError(response.status_code)
+        return response.text, self.parse_fertilizer_response(response.text)
+    def request_prescription_live(self, params):
+        """캐시/격자 없이 처방 API 직접 조회 (처방 격자 생성용)"""
+        return self._call_prescription_api(params)[1]
     def __init__(self):
         """토양-비료 처방 서비스 (흙토람 스타일)"""
         self.api_key = os.getenv('FERTILIZER_API_KEY')
         self.api_url = "http://apis.data.go.kr/1390802/SoilEnviron/FrtlzrUseExp/getSoilFrtlzrExprnInfo"
     
     def parse_fertilizer_response(self, xml_content):
-        """비료 추천 API의 XML 응답을 파싱하여 구조화된 데이터로 변환"""
-        try:
-            json_content = xmltodict.parse(xml_content)
-            
-            # 두 가지 응답 형태 처리
-            if 'response' in json_content:
-                # 일반적인 response 구조
-                response_data = json_content.get('response', {})
-                header = response_data.get('header', {})
-                result_code = header.get('result_Code') or header.get('resultCode')
-                result_msg = header.get('result_Msg') or header.get('resultMsg')
-                
-                if result_code != '200' and result_code != 200:
-                    return None
-                
-                # body에서 items 추출
-                body = response_data.get('body', {})
-                items = body.get('items', {})
-                
-                if isinstance(items, dict) and 'item' in items:
-                    item_data = items['item']
-                    if isinstance(item_data, list) and len(item_data) > 0:
-                        item = item_data[0]
-                    else:
-                        item = item_data
-                else:
-                    item = items
-                    
-            elif 'OpenAPI_ServiceResponse' in json_content:
-                # OpenAPI 응답 구조
-                service_response = json_content.get('OpenAPI_ServiceResponse', {})
-                header = service_response.get('cmmMsgHeader', {})
-                
-                error_msg = header.get('errMsg', '')
-                
-                if error_msg == 'SERVICE ERROR':
-                    return None
-                
-                # OpenAPI body 처리
-                body = service_response.get('body', {})
-                items = body.get('items', {})
-                
-                if isinstance(items, dict) and 'item' in items:
-                    item = items['item']
-                else:
-                    item = items
-            else:
-                return None
-            
-            # item이 비어있거나 None인 경우 처리
-            if not item:
-                return None
-            
-            result = {
-                'success': True,
-                'result_Code': '200',
-                'result_Msg': 'OK',
-                'crop_Code': item.get('crop_Code', ''),
-                'crop_Nm': item.get('crop_Nm', ''),
-                'pre_Fert_N': item.get('pre_Fert_N', '0'),
-                'pre_Fert_P': item.get('pre_Fert_P', '0'),
-                'pre_Fert_K': item.get('pre_Fert_K', '0'),
-                'post_Fert_N': item.get('post_Fert_N', '0'),
-                'post_Fert_P': item.get('post_Fert_P', '0'),
-                'post_Fert_K': item.get('post_Fert_K', '0'),
-                'pre_Compost_Cattl': item.get('pre_Compost_Cattl', '0'),
-                'pre_Compost_Pig': item.get('pre_Compost_Pig', '0'),
-                'pre_Compost_Chick': item.get('pre_Compost_Chick', '0'),
-                'pre_Compost_Mix': item.get('pre_Compost_Mix', '0')
-            }
-            
-            return result
-            
-        except Exception as e:
-            return None
+        """
+        비료 추천 API의 XML 응답을 파싱하여 구조화된 데이터로 변환
+
+        사용하는 처방 필드만 단일 패스로 추출해 Prescription 레코드로 반환 (utils.prescription_parser)
+        오류 응답은 success=False 레코드로 반환
+        """
+        return parse_prescription_xml(xml_content)
     
-    def get_farm_info(self):
-        """농장 정보 가져오기 (면적 a 단위 직접 계산)"""
-        farm = USER_DATA.get('farm', {})
-        area_m2 = farm.get('area_m2', 25000)  # 기본값 25,000㎡
+    def get_farm_info(self, context=None, crop_name=None, soil=None):
+        """
+        농장 정보 가져오기 (면적 a 단위 직접 계산)
+
+        Args:
+            context: FarmContext (없으면 기본 농장)
+            crop_name: 작물명 (없으면 농장의 첫 작물)
+            soil: 토양 데이터 (없으면 농장의 최신 토양검사 결과)
+
+        Returns:
+            요청별 새 dict (수정해도 농장 컨텍스트에 영향 없음)
+        """
+        context = context or resolve_farm_context()
+        farm = context.farm
+        area_m2 = context.area_m2  # 기본값 25,000㎡
         farm_size_a = area_m2 / 100  # 100㎡ = 1a
         farm_size_10a = farm_size_a / 10  # 10a 단위로 변환
         crops = farm.get('crops', [])
         current_crop = crops[0] if crops else {}
         from config.crop_codes import get_crop_code
-        crop_name = current_crop.get('cropname', '맥주보리')
+        crop_name = crop_name or current_crop.get('cropname', '맥주보리')
         crop_code = get_crop_code(crop_name) or '01001'
         return {
             'farm_size_a': farm_size_a,
             'farm_size_10a': farm_size_10a,
             'crop_code': crop_code,
             'crop_name': crop_name,
-            'soil': USER_DATA.get('soil', {})
+            'soil': context.soil if soil is None else soil
         }
     
-    def recommend_products(self, target_n, target_p, target_k, fertilizer_type="base", top_n=2):
-        """NPK 기준 비료 추천"""
+    def recommend_products(self, target_n, target_p, target_k, fertilizer_type="base", top_n=2,
+                           metric="l1", weights=None, tolerance=None, ranges=None):
+        """
+        NPK 기준 비료 추천
+
+        Args:
+            metric: 점수 지표 ("l1" 기본, "l2", "cosine": NPK 비율 유사도)
+            weights: N, P, K 가중치 (기본 1, 1, 1)
+            tolerance: 지정 시 점수가 tolerance 이하인 제품 전체 반환 (top_n이 None이 아니면 top_n개까지)
+            ranges: 성분별 함량 범위 조건 {"N": (하한, 상한), "P": ..., "K": ...}
+        """
         try:
-            fertilizer_file = os.path.join(os.path.dirname(__file__), '..', 'data', 'fertilizers.json')
-            
-            if not os.path.exists(fertilizer_file):
-                return []
-            
-            with open(fertilizer_file, 'r', encoding='utf-8') as f:
-                all_fertilizers = json.load(f)
-            
-            # 단계에 따른 비료 필터링
-            filtered_fertilizers = []
+            # 단계에 따른 비료 필터링 (질소 함량이 있는 비료만, 카탈로그에서 미리 분할됨)
             stage_key = "basal" if fertilizer_type == "base" else "topdress"
+            nitrogen_fertilizers, index = fertilizer_catalog.nitrogen_index(stage_key)
             
-            for fert in all_fertilizers:
-                if stage_key in fert.get("stage", []):
-                    filtered_fertilizers.append(fert)
-            
-            if not filtered_fertilizers:
+            if not nitrogen_fertilizers:
                 return []
             
-            # 질소 함량이 있는 비료만 필터링
-            nitrogen_fertilizers = [f for f in filtered_fertilizers 
-                                   if float(f.get('grade', {}).get('N', 0)) > 0]
-            
-            # NPK 비율 점수 계산
-            scored_fertilizers = []
-            for fert in nitrogen_fertilizers:
-                grade = fert.get('grade', {})
-                n_diff = abs(float(grade.get('N', 0)) - target_n)
-                p_diff = abs(float(grade.get('P2O5', 0)) - target_p) 
-                k_diff = abs(float(grade.get('K2O', 0)) - target_k)
-                score = n_diff + p_diff + k_diff
-                
-                fert_copy = fert.copy()
-                fert_copy['추천점수'] = round(score, 1)
-                scored_fertilizers.append(fert_copy)
-            
-            # 점수 순 정렬
-            scored_fertilizers.sort(key=lambda x: x['추천점수'])
-            return scored_fertilizers[:top_n]
+            # NPK 최근접 검색 (동점은 카탈로그 순서)
+            if tolerance is not None:
+                ranked = index.within(target_n, target_p, target_k, tolerance, metric, weights, ranges)
+                if top_n is not None:
+                    ranked = ranked[:top_n]
+            else:
+                ranked = index.nearest(target_n, target_p, target_k, top_n, metric, weights, ranges)
+            return self._scored_products(nitrogen_fertilizers, ranked)
             
         except Exception as e:
             print(f"⚠️ 비료 추천 오류: {e}")
             return []
     
+    def recommend_products_many(self, targets, fertilizer_type="base", top_n=2, metric="l1", weights=None):
+        """
+        여러 N/P/K 목표에 대한 비료 추천을 한 번에 계산 (목표별 recommend_products와 같은 결과)
+
+        Args:
+            targets: [(target_n, target_p, target_k), ...]
+
+        Returns:
+            목표 순서대로 추천 비료 리스트
+        """
+        if not targets:
+            return []
+        try:
+            stage_key = "basal" if fertilizer_type == "base" else "topdress"
+            nitrogen_fertilizers, index = fertilizer_catalog.nitrogen_index(stage_key)
+            if not nitrogen_fertilizers:
+                return [[] for _ in targets]
+            return [
+                self._scored_products(nitrogen_fertilizers, ranked)
+                for ranked in index.nearest_many(targets, top_n, metric, weights)
+            ]
+        except Exception as e:
+            print(f"⚠️ 비료 추천 오류: {e}")
+            return [[] for _ in targets]
+    
+    def _scored_products(self, products, ranked):
+        """(점수, 행 번호) 순위를 추천점수가 붙은 제품 dict 리스트로 변환"""
+        result = []
+        for score, row in ranked:
+            fert = products[row]
+            fert_copy = dict(fert)
+            fert_copy['grade'] = dict(fert['grade'])
+            fert_copy['stage'] = list(fert['stage'])
+            fert_copy['추천점수'] = score
+            result.append(fert_copy)
+        return result
+    
+    def recommend_blend(self, target_n, target_p, target_k, fertilizer_type="base", max_products=3):
+        """
+        N/P/K 필요량을 함께 맞추는 1~3개 제품 배합 추천
+
+        Returns:
+            [(제품 레코드 dict, 사용량 kg), ...] (후보가 없으면 빈 리스트)
+        """
+        try:
+            stage_key = "basal" if fertilizer_type == "base" else "topdress"
+            products, solver = fertilizer_catalog.blend_solver(stage_key)
+            blend = solver.solve(target_n, target_p, target_k, max_products)
+            if not blend:
+                return []
+            result = []
+            for row, amount_kg in zip(blend["rows"], blend["amounts_kg"]):
+                fert = products[row]
+                fert_copy = dict(fert)
+                fert_copy['grade'] = dict(fert['grade'])
+                fert_copy['stage'] = list(fert['stage'])
+                result.append((fert_copy, amount_kg))
+            return result
+
+        except Exception as e:
+            print(f"⚠️ 비료 배합 추천 오류: {e}")
+            return []
+    
     def get_fertilizer_usage(self, fertilizer, total_n_needed, total_p_needed, total_k_needed, farm_size_a=None):
         """전체 농장 양분 기준 비료 사용량 반환"""
         try:
@@ -3,8 +3,16 @@
 농업 맞춤형 기상 정보 제공
 """
 import os
-import requests
 from config.user_data import USER_DATA
+from utils.http_client import http_client
+from utils.sqlite_cache import create_cache
+
+# 관측소별 최근 관측값 캐시 (KMA 지상 관측은 매시 갱신, SHARED_CACHE_PATH 설정 시 워커 간 공유)
+weather_cache = create_cache(
+    'weather',
+    maxsize=256,
+    ttl=float(os.getenv('KMA_CACHE_TTL', 600))
+)
 
 class WeatherService:
     def __init__(self):
@@ -15,6 +23,9 @@ class WeatherService:
         import logging
         if station is None:
             station = USER_DATA["location"]["station"]
+        cached = weather_cache.get(str(station))
+        if cached is not None:
+            return dict(cached)
         try:
             url = f"{self.base_url}/kma_sfctm2.php"
             params = {
@@ -22,7 +33,7 @@ class WeatherService:
                 'help': 1,
                 'authKey': self.auth_key
             }
-            response = requests.get(url, params=params, timeout=30)
+            response = http_client.get(url, params=params, timeout=30)
             logging.info(f"KMA API Request URL: {url} | Params: {params}")
             logging.info(f"KMA API Response Status: {response.status_code}")
             logging.info(f"KMA API Response Text: {response.text[:500]}")
@@ -39,6 +50,9 @@ class WeatherService:
                 logging.error(f"No data found for station {station}")
                 return None
             parsed = self._parse_fixed_width_data(target_station_data)
+            if parsed:
+                weather_cache.set(str(station), parsed)
+                return dict(parsed)
             return parsed
         except Exception as e:
             logging.error(f"Weather API error: {e}")
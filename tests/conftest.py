@@ -0,0 +1,60 @@
+"""
+테스트 공용 fixture
+처방 API는 실제로 호출하지 않고 SoilFertilizerService의 upstream 호출만 가짜 응답으로 교체
+"""
+import pytest
+from flask import Flask
+
+from services.soil_fertilizer_service import SoilFertilizerService, prescription_cache
+from utils.fertilizer_records import Prescription
+from utils.prescription_parser import parse_prescription_xml
+
+ITEM = (
+    "<item><crop_Code>01001</crop_Code><crop_Nm>맥주보리</crop_Nm>"
+    "<pre_Fert_N>4.9</pre_Fert_N><pre_Fert_P>24.8</pre_Fert_P><pre_Fert_K>3.0</pre_Fert_K>"
+    "<post_Fert_N>3.3</post_Fert_N><post_Fert_P>0.0</post_Fert_P><post_Fert_K>0.0</post_Fert_K>"
+    "<pre_Compost_Cattl>1500</pre_Compost_Cattl><pre_Compost_Pig>330</pre_Compost_Pig>"
+    "<pre_Compost_Chick>255</pre_Compost_Chick><pre_Compost_Mix>488</pre_Compost_Mix></item>"
+)
+
+PRESCRIPTION_XML = (
+    '<?xml version="1.0" encoding="UTF-8"?><response><header><result_Code>200</result_Code>'
+    f"<result_Msg>OK</result_Msg></header><body><items>{ITEM}</items></body></response>"
+)
+
+
+class FakePrescriptionAPI:
+    """처방 API 가짜 upstream (호출 파라미터 기록, fail=True면 오류 응답)"""
+
+    def __init__(self):
+        self.calls = []
+        self.fail = False
+
+    def __call__(self, params):
+        self.calls.append(dict(params))
+        if self.fail:
+            return "", Prescription.error('99', '처방 API 오류')
+        return PRESCRIPTION_XML, parse_prescription_xml(PRESCRIPTION_XML)
+
+
+@pytest.fixture
+def prescription_api(monkeypatch):
+    api = FakePrescriptionAPI()
+    monkeypatch.setattr(SoilFertilizerService, "_call_prescription_api", api)
+    prescription_cache.clear()
+    yield api
+    prescription_cache.clear()
+
+
+@pytest.fixture
+def client(prescription_api):
+    """챗봇(LLM) 의존 라우트를 제외한 테스트용 앱"""
+    from routes.crops import crops_bp
+    from routes.fertilizer import fertilizer_bp
+    from routes.fertilizer_raw import fertilizer_raw_bp
+
+    app = Flask(__name__)
+    app.register_blueprint(fertilizer_bp)
+    app.register_blueprint(fertilizer_raw_bp)
+    app.register_blueprint(crops_bp)
+    return app.test_client()
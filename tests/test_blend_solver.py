@@ -0,0 +1,56 @@
+import numpy as np
+import pytest
+
+from utils.blend_solver import BlendSolver
+
+GRADES = np.array([
+    [21.0, 17.0, 17.0],
+    [46.0, 0.0, 0.0],
+    [0.0, 20.0, 0.0],
+    [0.0, 0.0, 60.0],
+    [21.0, 17.0, 17.0],  # 첫 행과 같은 성분 (후보에서 제외)
+])
+
+
+def _supplied(result):
+    return sum(GRADES[row] / 100 * amount for row, amount in zip(result["rows"], result["amounts_kg"]))
+
+
+def test_three_product_blend_meets_needs_exactly():
+    result = BlendSolver(GRADES).solve(10, 5, 6)
+    assert len(result["rows"]) == 3
+    assert result["residual"] == pytest.approx(0, abs=1e-9)
+    assert _supplied(result) == pytest.approx([10, 5, 6])
+
+
+def test_single_product_least_squares_amount():
+    # 복합비료 한 가지로 N만 필요: x = a·b / a·a
+    grades = np.array([[20.0, 10.0, 10.0]])
+    result = BlendSolver(grades).solve(10, 0, 0, max_products=1)
+    a = grades[0] / 100
+    assert result["rows"] == [0]
+    assert result["amounts_kg"][0] == pytest.approx(a @ [10, 0, 0] / (a @ a))
+
+
+def test_max_products_limits_blend_size():
+    solver = BlendSolver(GRADES)
+    for max_products in (1, 2, 3):
+        result = solver.solve(10, 5, 6, max_products)
+        assert 1 <= len(result["rows"]) <= max_products
+        assert all(amount > 0 for amount in result["amounts_kg"])
+
+
+def test_duplicate_grades_use_first_row():
+    result = BlendSolver(GRADES).solve(21, 17, 17, max_products=1)
+    assert result["rows"] == [0]
+    assert result["amounts_kg"][0] == pytest.approx(100)
+
+
+def test_no_negative_amounts_when_need_is_zero():
+    result = BlendSolver(GRADES).solve(0, 0, 0)
+    assert all(amount >= 0 for amount in result["amounts_kg"])
+    assert result["residual"] == pytest.approx(0)
+
+
+def test_empty_catalog():
+    assert BlendSolver(np.empty((0, 3))).solve(10, 5, 5) is None
@@ -0,0 +1,114 @@
+import threading
+import time
+
+from utils import ttl_cache
+from utils.singleflight import SingleFlight
+from utils.sqlite_cache import SQLiteCache, create_cache
+from utils.ttl_cache import TTLCache
+
+
+def test_ttl_cache_hit_and_miss():
+    cache = TTLCache(maxsize=4, ttl=60)
+    assert cache.get("a") is None
+    cache.set("a", 1)
+    assert cache.get("a") == 1
+    stats = cache.stats()
+    assert (stats["hits"], stats["misses"]) == (1, 1)
+
+
+def test_ttl_cache_expires(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(ttl_cache.time, "monotonic", lambda: now[0])
+    cache = TTLCache(maxsize=4, ttl=10)
+    cache.set("a", 1)
+    now[0] += 9
+    assert cache.get("a") == 1
+    now[0] += 1
+    assert cache.get("a", "gone") == "gone"
+    assert cache.stats()["expirations"] == 1
+    assert len(cache) == 0
+
+
+def test_ttl_cache_evicts_least_recently_used():
+    cache = TTLCache(maxsize=2, ttl=60)
+    cache.set("a", 1)
+    cache.set("b", 2)
+    cache.get("a")
+    cache.set("c", 3)
+    assert cache.get("b") is None
+    assert cache.get("a") == 1
+    assert cache.get("c") == 3
+    assert cache.stats()["evictions"] == 1
+
+
+def test_sqlite_cache_round_trip_and_namespaces(tmp_path):
+    path = str(tmp_path / "cache.db")
+    prescriptions = SQLiteCache(path, "prescription")
+    weather = SQLiteCache(path, "weather")
+    prescriptions.set(("01001", 6.5), {"n": 4.9})
+    assert prescriptions.get(("01001", 6.5)) == {"n": 4.9}
+    assert weather.get(("01001", 6.5)) is None
+    # 같은 파일을 여는 다른 인스턴스(다른 워커)와 공유
+    assert SQLiteCache(path, "prescription").get(("01001", 6.5)) == {"n": 4.9}
+
+
+def test_sqlite_cache_expires_and_evicts(tmp_path):
+    cache = SQLiteCache(str(tmp_path / "cache.db"), "prescription", maxsize=2)
+    cache.set("old", 1, ttl=-1)
+    assert cache.get("old") is None
+    assert cache.stats()["expirations"] == 1
+
+    cache.set("a", 1)
+    time.sleep(0.01)
+    cache.set("b", 2)
+    time.sleep(0.01)
+    cache.set("c", 3)
+    assert len(cache) == 2
+    assert cache.get("a") is None
+    assert cache.get("c") == 3
+
+
+def test_create_cache_selects_backend(monkeypatch, tmp_path):
+    monkeypatch.delenv("SHARED_CACHE_PATH", raising=False)
+    assert isinstance(create_cache("test", 8, 60), TTLCache)
+    monkeypatch.setenv("SHARED_CACHE_PATH", str(tmp_path / "shared.db"))
+    assert isinstance(create_cache("test", 8, 60), SQLiteCache)
+
+
+def test_singleflight_merges_concurrent_calls():
+    flight = SingleFlight()
+    release = threading.Event()
+    calls = []
+
+    def slow():
+        calls.append(1)
+        release.wait(5)
+        return "result"
+
+    results = []
+    threads = [threading.Thread(target=lambda: results.append(flight.do("key", slow))) for _ in range(5)]
+    for thread in threads:
+        thread.start()
+    while flight.stats()["merged"] < 4:
+        time.sleep(0.001)
+    release.set()
+    for thread in threads:
+        thread.join()
+    assert results == ["result"] * 5
+    assert len(calls) == 1
+    assert flight.stats() == {"in_flight": 0, "executions": 1, "merged": 4}
+
+
+def test_singleflight_propagates_errors_and_forgets_key():
+    flight = SingleFlight()
+
+    def fail():
+        raise ValueError("upstream")
+
+    try:
+        flight.do("key", fail)
+    except ValueError as e:
+        assert str(e) == "upstream"
+    else:
+        raise AssertionError("예외가 전달되지 않음")
+    assert flight.do("key", lambda: "ok") == "ok"
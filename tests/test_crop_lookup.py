@@ -0,0 +1,45 @@
+import pytest
+
+from utils.crop_registry import UnknownCropError, crop_registry
+from utils.crop_search import crop_search, decompose_jamo, initial_consonants
+
+
+@pytest.mark.parametrize("name, code, matched", [
+    ("맥주보리", "01001", "exact"),
+    ("토마토 노지", "04016", "normalized"),
+    ("토마토 (노지)", "04016", "normalized"),
+    ("방울 토마토", "04009", "normalized"),
+    ("쌀", "00001", "exact"),
+])
+def test_lookup(name, code, matched):
+    entry = crop_registry.lookup(name)
+    assert (entry.code, entry.matched) == (code, matched)
+
+
+def test_unknown_crop_has_suggestions():
+    with pytest.raises(UnknownCropError) as error:
+        crop_registry.resolve("토마또")
+    assert error.value.suggestions[0]["name"].startswith("토마")
+    assert crop_registry.code(None) is None
+    assert crop_registry.suggest("") == []
+
+
+def test_jamo_decomposition():
+    assert decompose_jamo("토마토") == "ㅌㅗㅁㅏㅌㅗ"
+    assert decompose_jamo("닭과") == "ㄷㅏㄹㄱㄱㅗㅏ"
+    assert initial_consonants("토마토") == "ㅌㅁㅌ"
+
+
+@pytest.mark.parametrize("prefix", ["토마", "톰", "토ㅁ", "ㅌㅁ", "토마토 "])
+def test_search_matches_partial_syllables_and_initials(prefix):
+    names = [crop["name"] for crop in crop_search.search(prefix)["crops"]]
+    assert names[0] == "토마토"
+    assert all(name.startswith("토마토") for name in names)
+
+
+def test_search_returns_code_category_and_respects_limit():
+    result = crop_search.search("고", limit=2)
+    assert result["total"] > 2 and len(result["crops"]) == 2
+    assert crop_search.search("xyz") == {"total": 0, "crops": []}
+    tomato = crop_search.search("토마토")["crops"][0]
+    assert tomato == {"name": "토마토", "code": "04016", "category": "과채류"}
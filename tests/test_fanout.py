@@ -0,0 +1,32 @@
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from utils.fanout import FanoutTimeout, fan_out
+
+
+def test_results_keep_key_order_and_errors():
+    def work(key):
+        if key == "bad":
+            raise ValueError(key)
+        return key * 2
+
+    with ThreadPoolExecutor(max_workers=4) as executor:
+        results = fan_out(work, ["a", "bad", "c"], deadline=5, executor=executor)
+    assert [key for key, _ in results] == ["a", "bad", "c"]
+    assert results[0][1] == "aa" and results[2][1] == "cc"
+    assert isinstance(results[1][1], ValueError)
+
+
+def test_deadline_returns_partial_results():
+    release = threading.Event()
+
+    def work(key):
+        if key == "slow":
+            release.wait(5)
+        return key
+
+    with ThreadPoolExecutor(max_workers=2) as executor:
+        results = dict(fan_out(work, ["fast", "slow"], deadline=0.1, executor=executor))
+        release.set()
+    assert results["fast"] == "fast"
+    assert isinstance(results["slow"], FanoutTimeout)
@@ -0,0 +1,103 @@
+import pytest
+
+from config.user_data import SAMPLE_FARM, SAMPLE_SOILTEST
+from services.farm_repository import (
+    FarmNotFoundError, InvalidFarmIdError, MemoryFarmRepository, SQLiteFarmRepository, create_farm_repository,
+    find_farm_context, resolve_farm_context
+)
+
+FARM = {"_id": "farm9", "userid": "user9", "area_m2": 5000,
+        "crops": [{"cropname": "콩", "status": "growing"}, {"cropname": "벼(일반답)", "status": "harvested"}]}
+
+
+def _soiltest(test_id, tested_at, ph):
+    return {"_id": test_id, "farmid": "farm9", "tested_at": tested_at, "result": {"ph": ph}}
+
+
+@pytest.fixture(params=["memory", "sqlite"])
+def repository(request, tmp_path):
+    if request.param == "memory":
+        return MemoryFarmRepository()
+    return SQLiteFarmRepository(str(tmp_path / "farms.db"))
+
+
+def test_context_combines_farm_latest_soiltest_and_growing_crops(repository):
+    repository.save_farm(FARM)
+    repository.save_soiltest(_soiltest("t1", "2025-01-01", 5.5))
+    repository.save_soiltest(_soiltest("t2", "2025-06-01", 6.5))
+    repository.save_soiltest(_soiltest("t0", "2024-06-01", 7.5))
+    context = repository.get_context("farm9")
+    assert context.soil["ph"] == 6.5
+    assert context.crop_names == ["콩"]
+    assert (context.area_m2, context.farm_size_a) == (5000, 50)
+    assert repository.get_user_farm_ids("user9") == ["farm9"]
+    assert repository.get_context("missing") is None
+
+
+def test_writes_invalidate_cached_context(repository):
+    repository.save_farm(FARM)
+    repository.save_soiltest(_soiltest("t1", "2025-01-01", 5.5))
+    assert repository.get_context("farm9").soil["ph"] == 5.5
+    repository.save_soiltest(_soiltest("t2", "2025-06-01", 6.0))
+    repository.save_farm({**FARM, "area_m2": 8000})
+    context = repository.get_context("farm9")
+    assert (context.soil["ph"], context.area_m2) == (6.0, 8000)
+
+
+def test_context_is_read_only(repository):
+    repository.save_farm(FARM)
+    context = repository.get_context("farm9")
+    with pytest.raises(AttributeError):
+        context.soil = {}
+    with pytest.raises(TypeError):
+        context.farm["area_m2"] = 1
+
+
+def test_sqlite_import_documents(tmp_path):
+    repository = SQLiteFarmRepository(str(tmp_path / "farms.db"))
+    counts = repository.import_documents(farms=[FARM], soiltests=[_soiltest("t1", "2025-01-01", 6.1)])
+    assert counts == (0, 1, 1)
+    assert SQLiteFarmRepository(repository.path).get_context("farm9").soil["ph"] == 6.1
+
+
+def test_create_farm_repository_uses_environment(monkeypatch, tmp_path):
+    monkeypatch.delenv("FARM_DB_PATH", raising=False)
+    monkeypatch.setenv("FARM_CACHE_SIZE", "3")
+    repository = create_farm_repository()
+    assert repository.backend == "memory"
+    assert repository.get_context(SAMPLE_FARM["_id"]).soil == SAMPLE_SOILTEST["result"]
+    assert repository.stats()["context_cache"]["maxsize"] == 3
+
+    monkeypatch.setenv("FARM_DB_PATH", str(tmp_path / "farms.db"))
+    assert create_farm_repository().backend == "sqlite"
+
+
+def test_unknown_farm_resolves_to_default_context():
+    assert resolve_farm_context("no-such-farm").farm_id == SAMPLE_FARM["_id"]
+
+
+def test_module_repository_reads_dotenv(tmp_path):
+    # app.py의 load_dotenv보다 먼저 import되어도 .env 설정으로 전역 저장소를 생성
+    import os
+    import subprocess
+    import sys
+
+    (tmp_path / ".env").write_text(f"FARM_DB_PATH={tmp_path / 'farms.db'}\nFARM_CACHE_SIZE=7\n")
+    env = {key: value for key, value in os.environ.items() if not key.startswith("FARM_")}
+    env["PYTHONPATH"] = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    output = subprocess.run(
+        [sys.executable, "-c",
+         "from services.farm_repository import farm_repository as r;"
+         "print(r.backend, r.stats()['context_cache']['maxsize'])"],
+        cwd=tmp_path, env=env, capture_output=True, text=True, check=True
+    ).stdout
+    assert output.split() == ["sqlite", "7"]
+
+
+def test_find_farm_context_does_not_fall_back_for_unknown_farms():
+    assert find_farm_context(None).farm_id == SAMPLE_FARM["_id"]
+    assert find_farm_context(SAMPLE_FARM["_id"]).farm_id == SAMPLE_FARM["_id"]
+    with pytest.raises(FarmNotFoundError):
+        find_farm_context("no-such-farm")
+    with pytest.raises(InvalidFarmIdError):
+        find_farm_context(["farm001"])
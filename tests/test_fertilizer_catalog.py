@@ -0,0 +1,86 @@
+import json
+import os
+
+import pytest
+
+from utils.fertilizer_catalog import FertilizerCatalog
+
+PRODUCTS = [
+    {"_id": "base_001", "name": "복합비료", "stage": ["basal"],
+     "grade": {"N": 21, "P2O5": 11, "K2O": 12}, "bag_kg": 20},
+    {"_id": "base_002", "name": "인산칼리", "stage": ["basal"],
+     "grade": {"N": 0, "P2O5": 15, "K2O": 43}, "bag_kg": 20},
+]
+
+TOPDRESS = [
+    {"비료종류": "추비", "질소": 16, "인산": 0, "칼리": 14, "1포대당 무게": 15},
+    {"비료종류": "포장단위 없음", "질소": "10", "인산": None, "칼리": 5},
+]
+
+
+def _write(path, items):
+    path.write_text(json.dumps(items, ensure_ascii=False), encoding="utf-8")
+
+
+@pytest.fixture
+def sources(tmp_path):
+    en = tmp_path / "fertilizers.json"
+    ko = tmp_path / "웃거름.json"
+    _write(en, PRODUCTS)
+    _write(ko, TOPDRESS)
+    return ((str(en), "en", None, None), (str(ko), "ko", "topdress", "add"))
+
+
+def test_sources_are_merged_and_partitioned_by_stage(sources):
+    catalog = FertilizerCatalog(sources, cache_file=None)
+
+    assert len(catalog) == 4
+    assert [p["_id"] for p in catalog.products("basal")] == ["base_001", "base_002"]
+    assert [p["_id"] for p in catalog.products("topdress")] == ["add_001", "add_002"]
+    records, grades = catalog.nitrogen_grades("basal")
+    assert [p["_id"] for p in records] == ["base_001"]
+    assert grades.tolist() == [[21, 11, 12]]
+
+
+def test_korean_schema_is_normalized(sources):
+    first, second = FertilizerCatalog(sources, cache_file=None).products("topdress")
+    assert dict(first["grade"]) == {"N": 16, "P2O5": 0, "K2O": 14}
+    assert (first["name"], first["stage"], first["bag_kg"]) == ("추비", ("topdress",), 15)
+    assert dict(second["grade"]) == {"N": 10, "P2O5": 0, "K2O": 5}
+    assert second["bag_kg"] == 20
+
+
+def test_records_are_read_only(sources):
+    record = FertilizerCatalog(sources, cache_file=None).products("basal")[0]
+
+    with pytest.raises(TypeError):
+        record["name"] = "변경"
+    with pytest.raises(TypeError):
+        record["grade"]["N"] = 0
+
+
+def test_binary_cache_round_trip(sources, tmp_path):
+    cache_file = str(tmp_path / "catalog.npz")
+    first = FertilizerCatalog(sources, cache_file=cache_file)
+    assert len(first) == 4
+    assert os.path.exists(cache_file)
+
+    second = FertilizerCatalog(sources, cache_file=cache_file)
+    assert [p["_id"] for p in second.products()] == [p["_id"] for p in first.products()]
+
+
+def test_reloads_when_source_changes(sources, tmp_path):
+    catalog = FertilizerCatalog(sources, cache_file=str(tmp_path / "catalog.npz"), check_interval=0)
+    assert len(catalog.products("topdress")) == 2
+
+    path = sources[1][0]
+    _write(tmp_path / "웃거름.json", TOPDRESS[:1])
+    stat = os.stat(path)
+    os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000))
+    assert len(catalog.products("topdress")) == 1
+
+
+def test_missing_sources_are_empty(tmp_path):
+    catalog = FertilizerCatalog(((str(tmp_path / "missing.json"), "en", None, None),), cache_file=None)
+    assert len(catalog) == 0
+    assert catalog.nitrogen_grades("basal")[1].shape == (0, 3)
@@ -0,0 +1,79 @@
+from services.farm_state import farm_state
+from services.fertilizer_manager import farm_crop_registry, fertilizer_manager
+
+
+def test_reads_for_unknown_farms_do_not_create_stores():
+    before = set(farm_crop_registry.farm_ids())
+    for i in range(50):
+        farm_id = f"unknown-{i}"
+        assert fertilizer_manager.get_current_recommendations(farm_id=farm_id)["summary"]["total_crops"] == 0
+        assert fertilizer_manager.get_crop_recommendation("콩", farm_id)["status"] == "error"
+        assert fertilizer_manager.remove_crop("콩", farm_id)["status"] == "error"
+        assert fertilizer_manager.refresh_crop(farm_id, "콩") is None
+        assert fertilizer_manager.update_all_fertilizer_recommendations(farm_id=farm_id)["status"] == "error"
+        assert farm_state.get(farm_id, "weather") is None
+    assert set(farm_crop_registry.farm_ids()) == before
+    assert "unknown-0" not in farm_state.keys()
+
+
+def test_unchanged_crops_are_skipped(prescription_api):
+    farm_id = "farm-registry-test"
+    soil = {"ph": 6.0}
+    assert fertilizer_manager.update_crop_list(["맥주보리"], farm_id)["status"] == "success"
+
+    first = fertilizer_manager.update_all_fertilizer_recommendations(soil, farm_id=farm_id)
+    assert first["updated_crops"] == ["맥주보리"]
+    second = fertilizer_manager.update_all_fertilizer_recommendations(soil, farm_id=farm_id)
+    assert (second["updated_crops"], second["skipped_crops"]) == ([], ["맥주보리"])
+    assert len(prescription_api.calls) == 1
+
+    changed = fertilizer_manager.update_all_fertilizer_recommendations({"ph": 6.5}, farm_id=farm_id)
+    assert changed["updated_crops"] == ["맥주보리"]
+    assert len(prescription_api.calls) == 2
+    assert fertilizer_manager.remove_crop("맥주보리", farm_id)["status"] == "success"
+
+
+def test_register_and_refresh_farm_crops(prescription_api):
+    farm = {"_id": "farm-manager-test", "area_m2": 1000, "soil": {"ph": 6.0},
+            "crops": [{"cropname": "맥주보리", "status": "growing"}]}
+    result = fertilizer_manager.refresh_farm(farm)
+    assert result["status"] == "success" and result["updated_crops"] == ["맥주보리"]
+    assert fertilizer_manager.refresh_farm(farm)["status"] == "skipped"
+    stored = fertilizer_manager.get_crop_recommendation("맥주보리", "farm-manager-test")
+    assert stored["status"] == "success" and stored["crop_code"] == "01001"
+    assert len(prescription_api.calls) == 1
+    assert fertilizer_manager.remove_crop("맥주보리", "farm-manager-test")["status"] == "success"
+
+
+def test_refresher_starts_only_in_lock_holder(monkeypatch, tmp_path):
+    from services import fertilizer_manager as manager
+    from utils.process_lock import ProcessLock
+
+    started = []
+    monkeypatch.setattr(manager.recommendation_refresher, "start", lambda: started.append(True))
+    monkeypatch.setattr(manager, "_refresh_lock_checked_at", None)
+    path = str(tmp_path / "refresh.lock")
+    other_worker = ProcessLock(path)
+    assert other_worker.acquire()
+
+    monkeypatch.setattr(manager, "recommendation_refresh_lock", ProcessLock(path))
+    assert not manager.start_recommendation_refresher()
+    assert started == []
+
+    monkeypatch.setattr(manager, "recommendation_refresh_lock", ProcessLock(str(tmp_path / "free.lock")))
+    # 재시도 간격 안에서는 잠금을 다시 시도하지 않음
+    assert not manager.start_recommendation_refresher()
+    monkeypatch.setattr(manager, "_refresh_lock_checked_at", None)
+    assert manager.start_recommendation_refresher()
+    assert started == [True]
+
+
+def test_queued_farm_refresh_keeps_force(monkeypatch):
+    from services import fertilizer_manager as manager
+
+    monkeypatch.setattr(manager.farm_refresher, "request", lambda farm_id: False)
+    monkeypatch.setattr(manager, "_queued_farms", {})
+    farm = {"_id": "queued-force-test", "crops": []}
+    manager.request_farm_refresh([farm], force=True)
+    manager.request_farm_refresh([farm], force=False)
+    assert manager._queued_farms["queued-force-test"] == (farm, True)
@@ -0,0 +1,40 @@
+import pytest
+
+from utils.fertilizer_records import Prescription
+from utils.fertilizer_recommender import recommend_fertilizer_blend, recommend_fertilizers
+
+UREA = {"_id": "urea", "name": "요소", "grade": {"N": 46, "P2O5": 0, "K2O": 0}, "bag_kg": 20}
+COMPOUND = {"_id": "npk", "name": "복합비료", "grade": {"N": 20, "P2O5": 10, "K2O": 10}, "bag_kg": 20}
+
+
+class FakeService:
+    def __init__(self, products, blend):
+        self.products = products
+        self.blend = blend
+
+    def recommend_products(self, need_n, need_p, need_k, base_or_top, top_n, **options):
+        return self.products
+
+    def recommend_blend(self, need_n, need_p, need_k, base_or_top, max_products):
+        return self.blend
+
+
+def _prescription(n, p, k):
+    return Prescription(True, '200', 'OK', '01001', '맥주보리', pre_n=n, pre_p=p, pre_k=k)
+
+
+def test_single_product_usage_is_need_over_grade_fraction():
+    # 질소 10kg ÷ 20% = 50kg (20kg 포대 2.5개), 인산/칼리 각 5kg 공급
+    entry = recommend_fertilizers(FakeService([COMPOUND], []), _prescription(10, 8, 4), "base")[0]
+    assert entry.usage_kg == 50
+    assert entry.bags == 2.5
+    assert (entry.shortage_p_kg, entry.shortage_k_kg) == (3, 0)
+
+
+def test_single_product_and_blend_use_the_same_formula():
+    prescription = _prescription(9.2, 0, 0)
+    single = recommend_fertilizers(FakeService([UREA], []), prescription, "base")[0]
+    blend = recommend_fertilizer_blend(FakeService([], [(UREA, 20.0)]), prescription, "base")
+    assert single.usage_kg == blend["products"][0]["usage_kg"] == pytest.approx(20)
+    assert blend["supplied_N_kg"] == pytest.approx(9.2)
+    assert blend["shortage_N_kg"] == 0
@@ -0,0 +1,47 @@
+import pytest
+
+from utils.fertilizer_records import Prescription, ProductRecommendation
+
+
+def test_prescription_converts_api_fields_once():
+    record = Prescription.from_api_fields({
+        'crop_Code': '01001', 'crop_Nm': '맥주보리',
+        'pre_Fert_N': '4.9', 'pre_Fert_P': '-', 'post_Fert_N': '3.3',
+        'pre_Compost_Cattl': '1500'
+    })
+    assert record.success
+    assert record.needs("base") == (4.9, 0.0, 0.0)
+    assert record.needs("topdress") == (3.3, 0.0, 0.0)
+    assert record.compost_amounts(2)["cattle_kg"] == 3000.0
+
+
+def test_prescription_get_accepts_api_field_names():
+    record = Prescription.from_api_fields({'pre_Fert_K': '3.0'})
+    assert record.get('pre_Fert_K') == 3.0
+    assert record.get('result_Code') == '200'
+    assert record.get('unknown', 'x') == 'x'
+    assert record.to_dict()['pre_Fert_K'] == 3.0
+
+
+def test_prescription_error_has_zero_needs():
+    record = Prescription.error(None, '처방 항목 없음')
+    assert not record.success
+    assert (record.result_code, record.result_msg) == ('', '처방 항목 없음')
+    assert record.needs("base") == (0.0, 0.0, 0.0)
+
+
+def test_records_use_slots():
+    with pytest.raises(AttributeError):
+        Prescription().extra = 1
+
+
+def test_product_recommendation_dict_shape():
+    item = ProductRecommendation('base_001', '복합비료', 21, 11, 12, 2, 40.0,
+                                 8.4, 4.4, 4.8, 0.0, 1.2)
+    assert item.to_dict() == {
+        "K_ratio": 12, "N_ratio": 21, "P_ratio": 11, "bags": 2,
+        "fertilizer_id": "base_001", "fertilizer_name": "복합비료",
+        "need_K_kg": 4.8, "need_N_kg": 8.4, "need_P_kg": 4.4,
+        "shortage_K_kg": 1.2, "shortage_P_kg": 0.0, "usage_kg": 40.0
+    }
+    assert item.get("usage_kg") == 40.0
@@ -0,0 +1,117 @@
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+import requests
+
+from utils import http_client as http_client_module
+from utils.http_client import CircuitBreaker, CircuitOpenError, HttpClient, RetryBudget
+
+
+class FakeResponse:
+    def __init__(self, status_code):
+        self.status_code = status_code
+
+
+class FakeSession:
+    """상태 코드 목록을 순서대로 반환하는 세션"""
+
+    def __init__(self, statuses):
+        self.statuses = list(statuses)
+        self.calls = 0
+
+    def get(self, url, **kwargs):
+        self.calls += 1
+        status = self.statuses.pop(0)
+        if isinstance(status, Exception):
+            raise status
+        return FakeResponse(status)
+
+
+def _client(statuses, **kwargs):
+    client = HttpClient(backoff_base=0, **kwargs)
+    client.session = FakeSession(statuses)
+    return client
+
+
+def test_circuit_breaker_opens_and_allows_one_trial(monkeypatch):
+    now = [0.0]
+    monkeypatch.setattr(http_client_module.time, "monotonic", lambda: now[0])
+    breaker = CircuitBreaker(failure_threshold=2, reset_timeout=30)
+    breaker.record_failure()
+    assert breaker.allow()
+    breaker.record_failure()
+    assert breaker.state == "open"
+    assert not breaker.allow()
+
+    now[0] += 30
+    assert breaker.allow()
+    assert breaker.state == "half_open"
+    assert not breaker.allow()
+    breaker.record_success()
+    assert breaker.state == "closed"
+    assert breaker.allow()
+
+
+def test_retry_budget_limits_retries():
+    budget = RetryBudget(ratio=0.5, min_tokens=1, max_tokens=2)
+    assert budget.withdraw()
+    assert not budget.withdraw()
+    budget.deposit()
+    budget.deposit()
+    assert budget.withdraw()
+
+
+def test_get_retries_transient_status():
+    client = _client([503, 200], max_retries=2)
+    assert client.get("http://api.test/x").status_code == 200
+    stats = client.stats()["api.test"]
+    assert (stats["requests"], stats["retries"], stats["failures"]) == (1, 1, 1)
+    assert stats["circuit"] == "closed"
+
+
+def test_get_returns_last_response_after_retries():
+    client = _client([503, 503, 503], max_retries=2)
+    assert client.get("http://api.test/x").status_code == 503
+    assert client.session.calls == 3
+
+
+def test_get_does_not_retry_read_timeout():
+    client = _client([requests.ReadTimeout()], max_retries=2)
+    with pytest.raises(requests.ReadTimeout):
+        client.get("http://api.test/x")
+    assert client.session.calls == 1
+
+
+def test_open_circuit_short_circuits():
+    client = _client([503, 503], max_retries=0, failure_threshold=2)
+    client.get("http://api.test/x")
+    client.get("http://api.test/x")
+    with pytest.raises(CircuitOpenError):
+        client.get("http://api.test/x")
+    assert client.session.calls == 2
+    assert client.stats()["api.test"]["short_circuited"] == 1
+
+
+def test_stats_are_exact_under_concurrency():
+    client = _client([])
+    client.session = type("Session", (), {"get": lambda self, url, **kwargs: FakeResponse(200)})()
+    with ThreadPoolExecutor(max_workers=16) as executor:
+        list(executor.map(lambda _: client.get("http://api.test/x"), range(2000)))
+    assert client.stats()["api.test"]["requests"] == 2000
+
+
+@pytest.mark.parametrize("error", [requests.exceptions.ChunkedEncodingError(), RuntimeError("hook")])
+def test_failed_trial_does_not_stick_half_open(monkeypatch, error):
+    now = [0.0]
+    monkeypatch.setattr(http_client_module.time, "monotonic", lambda: now[0])
+    client = _client([503, error, 200], max_retries=0, failure_threshold=1, reset_timeout=30)
+    client.get("http://api.test/x")
+    assert client.stats()["api.test"]["circuit"] == "open"
+
+    now[0] += 30
+    with pytest.raises(type(error)):
+        client.get("http://api.test/x")
+    # 응답 수신 오류는 실패로 집계되어 다시 open, requests 외 예외는 시험 슬롯만 반납
+    now[0] += 30
+    assert client.get("http://api.test/x").status_code == 200
+    assert client.stats()["api.test"]["circuit"] == "closed"
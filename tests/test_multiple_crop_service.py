@@ -0,0 +1,34 @@
+from services.multiple_crop_service import FertilizerRecommendationService
+
+
+def test_single_crop_recommendation(prescription_api):
+    result = FertilizerRecommendationService()._get_single_crop_recommendation('맥주보리', {'ph': 6.0}, 250)
+    assert result["crop_code"] == "01001"
+    assert prescription_api.calls[0]["acid"] == 6.0
+    assert result["fertilizer_prescription"]["total_farm_needs"]["base"]["N"] == 4.9 * 25
+    assert result["compost_recommendations"]["cattle_kg"] == 1500 * 25
+    assert result["fertilizer_recommendations"]["base_fertilizers"][0]["fertilizer_id"]
+
+
+def test_single_crop_recommendation_failures(prescription_api):
+    service = FertilizerRecommendationService()
+    assert service._get_single_crop_recommendation('없는작물', {}, 250) == {}
+    prescription_api.fail = True
+    assert service._get_single_crop_recommendation('맥주보리', {}, 250) == {}
+
+
+def test_multiple_crop_recommendations_are_filled_in(prescription_api):
+    result = FertilizerRecommendationService().get_fertilizer_recommendations(['맥주보리', '양파'])
+    assert result["status"] == "success" and result["failed_crops"] == []
+    for crop_name in ('맥주보리', '양파'):
+        recommendation = result["recommendations"][crop_name]
+        assert recommendation["fertilizer"]["base"] and recommendation["fertilizer"]["additional"]
+        assert recommendation["fertilizer"]["base"][0]["usage_kg"] > 0
+        assert all(amount > 0 for amount in recommendation["compost"].values())
+
+
+def test_multiple_crop_upstream_failures_are_reported(prescription_api):
+    prescription_api.fail = True
+    result = FertilizerRecommendationService().get_fertilizer_recommendations(['맥주보리', '없는작물'])
+    assert result["status"] == "error" and result["recommendations"] == {}
+    assert [failed["crop"] for failed in result["failed_crops"]] == ['맥주보리', '없는작물']
@@ -0,0 +1,45 @@
+import numpy as np
+import pytest
+
+from utils.npk_index import NPKIndex
+from utils.npk_scoring import METRICS, score_grades, top_k
+
+
+@pytest.fixture(scope="module")
+def grades():
+    rng = np.random.default_rng(7)
+    return np.round(rng.uniform(0, 40, size=(600, 3)), 1)
+
+
+@pytest.mark.parametrize("metric", ["l1", "l2", "cosine"])
+def test_tree_nearest_matches_full_scan(grades, metric):
+    tree = NPKIndex(grades, min_size=1)
+    linear = NPKIndex(grades, min_size=10 ** 9)
+    assert tree.use_tree and not linear.use_tree
+    for target in [(10, 5, 6), (0.5, 30, 2), (40, 40, 40)]:
+        expected = top_k(score_grades(grades, *target, metric), 5, METRICS[metric][1])
+        assert tree.nearest(*target, 5, metric) == linear.nearest(*target, 5, metric)
+        assert [row for _, row in linear.nearest(*target, 5, metric)] == [row for _, row in expected]
+
+
+def test_within_returns_all_under_tolerance(grades):
+    index = NPKIndex(grades, min_size=1)
+    ranked = index.within(20, 20, 20, 6)
+    scores = score_grades(grades, 20, 20, 20)
+    assert sorted(row for _, row in ranked) == sorted(np.flatnonzero(scores <= 6).tolist())
+    assert [score for score, _ in ranked] == sorted(score for score, _ in ranked)
+
+
+def test_ranges_filter(grades):
+    index = NPKIndex(grades)
+    rows = index.in_ranges({"N": (10, 20), "K": (None, 5)})
+    mask = (grades[:, 0] >= 10) & (grades[:, 0] <= 20) & (grades[:, 2] <= 5)
+    assert rows.tolist() == np.flatnonzero(mask).tolist()
+    ranked = index.nearest(15, 5, 0, 3, ranges={"N": (10, 20), "K": (None, 5)})
+    assert all(mask[row] for _, row in ranked)
+
+
+def test_nearest_many_matches_nearest(grades):
+    index = NPKIndex(grades)
+    targets = [(10, 5, 6), (3, 3, 3)]
+    assert index.nearest_many(targets, 3) == [index.nearest(*target, 3) for target in targets]
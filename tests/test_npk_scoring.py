@@ -0,0 +1,43 @@
+import numpy as np
+import pytest
+
+from utils.npk_scoring import score_grades, top_k
+
+GRADES = np.array([
+    [21, 11, 12],
+    [3, 15, 43],
+    [18, 1, 15],
+    [10, 10, 10],
+], dtype=np.float64)
+
+
+def test_l1_scores_match_manual_sum():
+    scores = score_grades(GRADES, 10, 10, 10)
+    expected = [abs(n - 10) + abs(p - 10) + abs(k - 10) for n, p, k in GRADES]
+    assert scores.tolist() == expected
+
+
+def test_weights_scale_each_nutrient():
+    scores = score_grades(GRADES, 0, 0, 0, weights=(2, 0, 0))
+    assert scores.tolist() == [42, 6, 36, 20]
+
+
+def test_cosine_ignores_magnitude():
+    scores = score_grades(np.array([[1, 1, 1], [5, 5, 5], [1, 0, 0]], dtype=np.float64),
+                          2, 2, 2, metric="cosine")
+    assert scores[0] == pytest.approx(0)
+    assert scores[1] == pytest.approx(0)
+    assert scores[2] > 0
+
+
+def test_unknown_metric_is_rejected():
+    with pytest.raises(ValueError):
+        score_grades(GRADES, 1, 1, 1, metric="chebyshev")
+
+
+@pytest.mark.parametrize("k", [0, 1, 2, 4, 10])
+def test_top_k_matches_full_sort(k):
+    rng = np.random.default_rng(0)
+    scores = np.round(rng.uniform(0, 5, size=200), 2)
+    expected = sorted((round(float(s), 1), i) for i, s in enumerate(scores))[:k]
+    assert top_k(scores, k) == expected
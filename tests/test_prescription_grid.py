@@ -0,0 +1,86 @@
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+import pytest
+
+from utils.fertilizer_records import Prescription
+from utils.prescription_grid import GRID_PARAMS, VALUE_FIELDS, PrescriptionGrid, PrescriptionGridStore, build_grid
+
+AXES = {'acid': (5.0, 6.0, 7.0), 'om': (10, 30), 'vldpha': (100,), 'posifert_K': (1,),
+        'posifert_Ca': (6,), 'posifert_Mg': (5,), 'selc': (2,)}
+
+
+def _fake_fetch(params):
+    # pre_n = pH + om/10, 나머지 항목은 0 (선형이므로 보간 결과를 정확히 알 수 있음)
+    if params['acid'] == 7.0 and params['om'] == 30:
+        raise RuntimeError("upstream")
+    values = dict.fromkeys(VALUE_FIELDS, 0.0)
+    values['pre_n'] = params['acid'] + params['om'] / 10
+    return Prescription(True, '200', 'OK', params['crop_Code'], '맥주보리', *values.values())
+
+
+@pytest.fixture(scope="module")
+def grid():
+    return build_grid(_fake_fetch, ['01001'], AXES, workers=2, progress=lambda message: None)
+
+
+def _params(acid, om, crop_code='01001'):
+    return {'crop_Code': crop_code, 'acid': acid, 'om': om, 'vldpha': 100, 'posifert_K': 1,
+            'posifert_Ca': 6, 'posifert_Mg': 5, 'selc': 2}
+
+
+def test_exact_grid_point(grid):
+    record = grid.lookup(_params(6.0, 10))
+    assert record.success and record.crop_name == '맥주보리'
+    assert record.pre_n == 7.0
+
+
+def test_interpolates_between_points(grid):
+    assert grid.lookup(_params(5.5, 20)) is None
+    assert grid.lookup(_params(5.5, 20), interpolate=True).pre_n == pytest.approx(7.5)
+
+
+def test_outside_grid_or_failed_points_miss(grid):
+    assert grid.lookup(_params(4.0, 10), interpolate=True) is None
+    assert grid.lookup(_params(6.0, 10, crop_code='99999')) is None
+    # 주변 격자점 조회에 실패한 구간은 보간하지 않음
+    assert grid.lookup(_params(7.0, 30)) is None
+    assert grid.lookup(_params(6.5, 20), interpolate=True) is None
+
+
+def test_save_and_load_round_trip(grid, tmp_path):
+    path = str(tmp_path / "grid.npz")
+    grid.save(path)
+    loaded = PrescriptionGrid.load(path)
+    assert len(loaded.axes) == len(GRID_PARAMS)
+    assert np.array_equal(np.isnan(loaded.values), np.isnan(grid.values))
+    assert loaded.lookup(_params(5.5, 20), interpolate=True).pre_n == pytest.approx(7.5)
+
+
+def test_builder_requires_crops_and_respects_call_limit(monkeypatch, capsys):
+    from services.soil_fertilizer_service import SoilFertilizerService
+    from utils import prescription_grid
+
+    def no_api_calls(self, params):
+        raise AssertionError("처방 API를 호출하면 안 됨")
+
+    monkeypatch.setattr(SoilFertilizerService, "request_prescription_live", no_api_calls)
+    with pytest.raises(SystemExit):
+        prescription_grid.main([])
+    with pytest.raises(SystemExit):
+        prescription_grid.main(['--crops', '01001,01005'])
+    assert "API 호출 11664회" in capsys.readouterr().out
+
+    prescription_grid.main(['--crops', '01001', '--dry-run'])
+    assert "API 호출 5832회" in capsys.readouterr().out
+
+
+def test_store_stats_are_exact_under_concurrency(grid, tmp_path):
+    path = str(tmp_path / "grid.npz")
+    grid.save(path)
+    store = PrescriptionGridStore(path)
+    queries = [_params(6.0, 10), _params(5.5, 20), _params(9.0, 10)] * 1000
+    with ThreadPoolExecutor(max_workers=16) as executor:
+        list(executor.map(lambda params: store.lookup(params, interpolate=True), queries))
+    stats = store.stats()
+    assert (stats["hits"], stats["interpolated"], stats["misses"]) == (1000, 1000, 1000)
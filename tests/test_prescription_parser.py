@@ -0,0 +1,54 @@
+import pytest
+
+from tests.conftest import ITEM, PRESCRIPTION_XML
+from utils.prescription_parser import parse_prescription_xml
+
+
+def test_parses_response_envelope():
+    record = parse_prescription_xml(PRESCRIPTION_XML)
+    assert record.success
+    assert (record.crop_code, record.crop_name) == ("01001", "맥주보리")
+    assert record.needs("base") == (4.9, 24.8, 3.0)
+    assert record.needs("topdress") == (3.3, 0.0, 0.0)
+    assert record.compost_amounts(2) == {
+        "cattle_kg": 3000.0, "chicken_kg": 510.0, "mixed_kg": 976.0, "pig_kg": 660.0
+    }
+
+
+def test_parses_openapi_envelope_and_bytes():
+    xml = (f"<OpenAPI_ServiceResponse><cmmMsgHeader><errMsg></errMsg></cmmMsgHeader>"
+           f"<body><items>{ITEM}</items></body></OpenAPI_ServiceResponse>")
+    record = parse_prescription_xml(xml.encode("utf-8"))
+    assert record.success
+    assert record.pre_n == 4.9
+
+
+def test_only_first_item_is_used():
+    second = ITEM.replace("<pre_Fert_N>4.9</pre_Fert_N>", "<pre_Fert_N>9.9</pre_Fert_N>")
+    xml = PRESCRIPTION_XML.replace(ITEM, ITEM + second)
+    assert parse_prescription_xml(xml).pre_n == 4.9
+
+
+@pytest.mark.parametrize("xml, code, message", [
+    ("<response><header><result_Code>03</result_Code><result_Msg>NODATA</result_Msg></header></response>",
+     "03", "NODATA"),
+    ("<OpenAPI_ServiceResponse><cmmMsgHeader><errMsg>SERVICE ERROR</errMsg>"
+     "<returnAuthMsg>SERVICE_KEY_IS_NOT_REGISTERED_ERROR</returnAuthMsg>"
+     "<returnReasonCode>30</returnReasonCode></cmmMsgHeader></OpenAPI_ServiceResponse>",
+     "30", "SERVICE_KEY_IS_NOT_REGISTERED_ERROR"),
+])
+def test_error_responses(xml, code, message):
+    record = parse_prescription_xml(xml)
+    assert not record.success
+    assert (record.result_code, record.result_msg) == (code, message)
+
+
+@pytest.mark.parametrize("xml", ["", "<html>", "<html></html>", "<response><header>",
+                                 "<response><header><result_Code>200</result_Code></header></response>"])
+def test_malformed_or_empty_responses_are_errors(xml):
+    assert not parse_prescription_xml(xml).success
+
+
+def test_invalid_numbers_become_zero():
+    xml = PRESCRIPTION_XML.replace("<pre_Fert_P>24.8</pre_Fert_P>", "<pre_Fert_P>-</pre_Fert_P>")
+    assert parse_prescription_xml(xml).pre_p == 0.0
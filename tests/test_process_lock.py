@@ -0,0 +1,22 @@
+import multiprocessing
+
+from utils.process_lock import ProcessLock
+
+
+def _try_lock(path, queue):
+    queue.put(ProcessLock(path).acquire())
+
+
+def test_only_one_holder(tmp_path):
+    path = str(tmp_path / "refresh.lock")
+    first = ProcessLock(path)
+    assert first.acquire() and first.held
+    assert first.acquire()
+    # 같은 파일의 다른 잠금(다른 워커)은 잡지 못함
+    assert not ProcessLock(path).acquire()
+
+    queue = multiprocessing.get_context("spawn").Queue()
+    process = multiprocessing.get_context("spawn").Process(target=_try_lock, args=(path, queue))
+    process.start()
+    process.join(30)
+    assert queue.get(timeout=5) is False
@@ -0,0 +1,62 @@
+import threading
+
+from utils.refresh_worker import RefreshWorker
+
+
+def _wait_idle(worker):
+    worker._executor.shutdown(wait=True)
+
+
+def test_pending_keys_are_requested_once():
+    release = threading.Event()
+    refreshed = []
+
+    def refresh(key):
+        release.wait(5)
+        refreshed.append(key)
+
+    worker = RefreshWorker(scan=lambda: ["a", "b"], refresh=refresh, workers=2)
+    assert worker.scan_once() == 2
+    assert worker.scan_once() == 0
+    assert not worker.request("a")
+    release.set()
+    _wait_idle(worker)
+
+    assert sorted(refreshed) == ["a", "b"]
+    stats = worker.stats()
+    assert (stats["scans"], stats["requested"], stats["refreshed"], stats["pending"]) == (2, 2, 2, 0)
+
+
+def test_failures_are_counted_and_key_can_be_requested_again():
+    calls = []
+
+    def refresh(key):
+        calls.append(key)
+        raise RuntimeError("upstream")
+
+    worker = RefreshWorker(scan=lambda: [], refresh=refresh, workers=1)
+    assert worker.request("a")
+    worker._executor.submit(lambda: None).result()
+    assert worker.request("a")
+    _wait_idle(worker)
+    assert calls == ["a", "a"]
+    assert worker.stats()["failed"] == 2
+
+
+def test_scan_errors_do_not_stop_the_worker():
+    def scan():
+        raise RuntimeError("db")
+
+    worker = RefreshWorker(scan=scan, refresh=lambda key: None)
+    assert worker.scan_once() == 0
+    assert worker.stats()["scans"] == 0
+
+
+def test_start_and_stop_scheduler():
+    scanned = threading.Event()
+    worker = RefreshWorker(scan=lambda: scanned.set() or [], refresh=lambda key: None, interval=60)
+    assert worker.start()
+    assert not worker.start()
+    assert scanned.wait(5)
+    worker.stop(5)
+    assert not worker.running
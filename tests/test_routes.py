@@ -0,0 +1,208 @@
+"""라우트 요청/응답 (처방 API는 conftest의 가짜 upstream)"""
+import json
+
+
+def test_recommendation_success(client, prescription_api):
+    response = client.post('/api/fertilizer-recommendation', json={'cropname': '맥주보리'})
+    assert response.status_code == 200
+    body = response.get_json()
+    assert body["crop"] == {"code": "01001", "name": "맥주보리"}
+    assert body["fertilizer"]["base"]
+    assert body["compost"]["cattle_kg"] == 1500 * 25
+    assert len(prescription_api.calls) == 1
+
+
+def test_recommendation_unknown_crop(client, prescription_api):
+    response = client.post('/api/fertilizer-recommendation', json={'cropname': '토마또'})
+    assert response.status_code == 400
+    assert response.get_json()["suggestions"]
+    assert prescription_api.calls == []
+
+
+def test_batch_fetches_each_prescription_once(client, prescription_api):
+    jobs = [{'cropname': '맥주보리'}, {'cropname': '맥주보리'}, {'cropname': '없는작물'}, 'x']
+    response = client.post('/api/fertilizer-recommendation/batch', json={'jobs': jobs})
+    body = response.get_json()
+    assert [result["status"] for result in body["results"]] == ["success", "success", "error", "error"]
+    assert body["summary"]["unique_prescriptions"] == 1
+    assert len(prescription_api.calls) == 1
+
+
+def test_batch_requires_jobs(client):
+    assert client.post('/api/fertilizer-recommendation/batch', json={}).status_code == 400
+
+
+def test_stream_writes_one_line_per_job_and_summary(client, prescription_api):
+    jobs = [{'cropname': '맥주보리'}, 'x']
+    response = client.post('/api/fertilizer-recommendation/stream', json={'jobs': jobs})
+    assert response.mimetype == 'application/x-ndjson'
+    lines = [json.loads(line) for line in response.get_data(as_text=True).splitlines()]
+    statuses = {line["index"]: line["status"] for line in lines[:-1]}
+    assert statuses == {0: "success", 1: "error"}
+    assert lines[-1] == {"summary": {"total": 2, "succeeded": 1, "failed": 1}}
+
+
+def test_sweep(client, prescription_api):
+    response = client.post('/api/fertilizer-recommendation/sweep', json={
+        'cropname': '맥주보리',
+        'soil': {'om': 20},
+        'sweep': [{'param': 'ph', 'values': [5.5, 6.5]}, {'param': 'om', 'start': 10, 'stop': 30, 'steps': 3}],
+        'top_n': 2
+    })
+    assert response.status_code == 200
+    body = response.get_json()
+    assert len(body["cells"]) == 2 and len(body["cells"][0]) == 3
+    assert len(body["cells"][0][0]["fertilizer"]["base"]) == 2
+    assert body["summary"]["unique_prescriptions"] == 6
+
+
+def test_crop_search(client):
+    body = client.get('/api/crops?prefix=ㅌㅁ&limit=1').get_json()
+    assert body["total"] == 3
+    assert body["crops"] == [{"name": "토마토", "code": "04016", "category": "과채류"}]
+    assert client.get('/api/crops?limit=x').status_code == 400
+
+
+def test_blend_max_products_is_validated_and_clamped(client):
+    def blend(value):
+        return client.post('/api/fertilizer-recommendation',
+                           json={'cropname': '맥주보리', 'blend': True, 'blend_max_products': value})
+
+    for value in ("two", 1.5, None, True):
+        response = blend(value)
+        assert response.status_code == 400, value
+        assert "blend_max_products" in response.get_json()["message"]
+    for value, limit in ((0, 1), (-4, 1), ("2", 2), (10, 3)):
+        response = blend(value)
+        assert response.status_code == 200
+        products = response.get_json()["blend"]["base"]["products"]
+        assert 1 <= len(products) <= limit
+
+
+def test_recommendation_upstream_failure_is_502(client, prescription_api):
+    prescription_api.fail = True
+    response = client.post('/api/fertilizer-recommendation', json={'cropname': '맥주보리'})
+    assert response.status_code == 502
+    assert response.get_json()["status"] == "error"
+
+
+def test_prescription_key_ignores_number_formatting():
+    from services.soil_fertilizer_service import SoilFertilizerService
+
+    service = SoilFertilizerService()
+    key = service.prescription_key({'crop_code': '01001', 'soil': {'ph': 6.5, 'om': 22}})
+    assert key == service.prescription_key({'crop_code': '01001', 'soil': {'ph': '6.5', 'om': '22'}})
+    assert key != service.prescription_key({'crop_code': '01001', 'soil': {'ph': 6.0}})
+
+
+def test_raw_recommendation(client, prescription_api):
+    response = client.post('/api/fertilizer-raw', json={'cropName': '맥주보리'})
+    assert response.status_code == 200
+    body = response.get_json()
+    assert body["crop"] == {"name": "맥주보리"}
+    assert body["fertilizer"]["basal"] and body["fertilizer"]["basal"][0]["type"] == "base"
+    assert body["fertilizer"]["topdress"][0]["unit"] == "kg"
+    assert len(prescription_api.calls) == 1
+
+
+def test_raw_recommendation_errors(client, prescription_api):
+    assert client.post('/api/fertilizer-raw', json={'cropName': '토마또'}).status_code == 400
+    prescription_api.fail = True
+    assert client.post('/api/fertilizer-raw', json={'cropName': '맥주보리'}).status_code == 502
+
+
+def test_sweep_rejects_bad_input(client, prescription_api):
+    sweep = [{'param': 'ph', 'values': [5.5, 6.5]}]
+    for payload in ({'sweep': sweep, 'top_n': 'x'}, {'sweep': sweep, 'top_n': 2.5},
+                    {'sweep': sweep, 'soil': 'acidic'}, {'sweep': sweep, 'soil': [6.5]},
+                    {'sweep': [{'param': 'nope', 'values': [1]}]}, {},
+                    {'sweep': [{'param': 'ph', 'values': [6.0, 'nan']}]},
+                    {'sweep': [{'param': 'ph', 'start': 5.5, 'stop': 'inf', 'steps': 3}]},
+                    {'sweep': [{'param': 'ph', 'values': 'abc'}]},
+                    {'sweep': [{'param': 'ph', 'start': 5.5, 'stop': 7.0, 'steps': 0}]}):
+        response = client.post('/api/fertilizer-recommendation/sweep', json=payload)
+        assert response.status_code == 400, payload
+        assert response.get_json()["status"] == "error"
+    assert prescription_api.calls == []
+
+
+def test_sweep_limits_points_before_building_axes(client, monkeypatch):
+    import routes.fertilizer as fertilizer_routes
+
+    def _no_linspace(*args, **kwargs):
+        raise AssertionError("격자 제한 초과 요청에서 축 값을 만들면 안 됨")
+    monkeypatch.setattr(fertilizer_routes.np, "linspace", _no_linspace)
+    url = '/api/fertilizer-recommendation/sweep'
+    for sweep in ([{'param': 'ph', 'start': 5.5, 'stop': 7.0, 'steps': 3_000_000}],
+                  [{'param': 'ph', 'start': 5.5, 'stop': 7.0, 'steps': 100},
+                   {'param': 'om', 'values': [1.0] * 100}]):
+        response = client.post(url, json={'sweep': sweep})
+        assert response.status_code == 400
+        assert "격자점" in response.get_json()["message"]
+
+
+def test_farm_refresh_is_queued(client, prescription_api):
+    import time
+    from services.fertilizer_manager import farm_refresher, fertilizer_manager
+
+    farm = {"_id": "route-refresh-test", "area_m2": 1000, "soil": {"ph": 6.0}, "crops": ["맥주보리"]}
+    response = client.post('/api/fertilizer-recommendation/farms/refresh', json={'farms': [farm]})
+    assert response.status_code == 202
+    assert response.get_json()["queued_farms"] == 1
+
+    deadline = time.monotonic() + 5
+    while farm_refresher.stats()["pending"] and time.monotonic() < deadline:
+        time.sleep(0.01)
+    stored = fertilizer_manager.get_crop_recommendation("맥주보리", "route-refresh-test")
+    assert stored["status"] == "success"
+    assert fertilizer_manager.remove_crop("맥주보리", "route-refresh-test")["status"] == "success"
+
+
+def test_farm_refresh_rejects_bad_input(client):
+    url = '/api/fertilizer-recommendation/farms/refresh'
+    assert client.post(url, json={'farm_ids': 'farm-1'}).status_code == 400
+    assert client.post(url, json={'farm_ids': [['farm-1']]}).status_code == 400
+    assert client.post(url, json={'farms': [{'_id': {'a': 1}}]}).status_code == 400
+
+
+def test_unknown_or_malformed_farmid(client, prescription_api):
+    url = '/api/fertilizer-recommendation'
+    assert client.post(url, json={'farmid': 'no-such-farm'}).status_code == 404
+    assert client.post(url, json={'farmid': ['farm001']}).status_code == 400
+    assert client.post('/api/fertilizer-raw', json={'farmid': 'no-such-farm'}).status_code == 404
+    assert prescription_api.calls == []
+
+    response = client.post('/api/fertilizer-recommendation/batch', json={'jobs': [
+        {'cropname': '맥주보리'}, {'farmid': 'no-such-farm'}, {'farmid': ['x']}
+    ]})
+    assert response.status_code == 200
+    results = response.get_json()["results"]
+    assert [result["status"] for result in results] == ["success", "error", "error"]
+    assert "no-such-farm" in results[1]["message"]
+
+
+def test_batch_reports_malformed_jobs_individually(client, prescription_api):
+    response = client.post('/api/fertilizer-recommendation/batch', json={'jobs': [
+        {'cropname': '맥주보리'},
+        {'cropname': '맥주보리', 'soil': [1, 2]},
+        {'cropname': '맥주보리', 'soil': {'ph': [6.5]}},
+    ]})
+    assert response.status_code == 200
+    body = response.get_json()
+    assert [result["status"] for result in body["results"]] == ["success", "error", "error"]
+    assert [result["index"] for result in body["results"]] == [0, 1, 2]
+    assert body["summary"]["failed"] == 2
+    assert len(prescription_api.calls) == 1
+
+
+def test_non_object_soil_is_rejected_before_the_prescription_call(client, prescription_api):
+    response = client.post('/api/fertilizer-recommendation', json={'cropname': '맥주보리', 'soil': [1, 2]})
+    assert response.status_code == 400
+    assert "soil" in response.get_json()["message"]
+
+    response = client.post('/api/fertilizer-recommendation/stream', json={'jobs': [
+        {'cropname': '맥주보리', 'soil': 'ph=6'}
+    ]})
+    lines = [json.loads(line) for line in response.get_data(as_text=True).splitlines()]
+    assert lines[0]["status"] == "error" and "soil" in lines[0]["message"]
+    assert prescription_api.calls == []
@@ -0,0 +1,38 @@
+import copy
+
+from config.crop_codes import get_crop_code
+from config.user_data import USER_DATA
+from services.fertilizer_recommendation_service import FertilizerRecommendationService
+from services.soil_fertilizer_service import SoilFertilizerService
+
+
+def _farm_info(crop_code='01001', **soil):
+    return {'crop_code': crop_code, 'soil': {'ph': 6.5, **soil}}
+
+
+def test_prescriptions_are_cached_by_crop_and_soil(prescription_api):
+    service = SoilFertilizerService()
+    service.fetch_fertilizer_api(_farm_info())
+    # 같은 값을 문자열로 보내도 같은 처방 조건
+    service.fetch_fertilizer_api(_farm_info(ph='6.5'))
+    assert len(prescription_api.calls) == 1
+    service.fetch_fertilizer_api(_farm_info(ph=6.0))
+    service.fetch_fertilizer_api(_farm_info(crop_code='01002'))
+    assert len(prescription_api.calls) == 3
+    assert prescription_api.calls[1]['acid'] == 6.0
+
+
+def test_failed_prescriptions_are_not_cached(prescription_api):
+    prescription_api.fail = True
+    service = SoilFertilizerService()
+    assert not service.fetch_fertilizer_api(_farm_info()).success
+    service.fetch_fertilizer_api(_farm_info())
+    assert len(prescription_api.calls) == 2
+
+
+def test_requested_crop_and_soil_are_used_without_touching_user_data(prescription_api):
+    before = copy.deepcopy(USER_DATA)
+    FertilizerRecommendationService().get_fertilizer_recommendation('콩', {'ph': 5.5})
+    assert prescription_api.calls[0]['crop_Code'] == get_crop_code('콩')
+    assert prescription_api.calls[0]['acid'] == 5.5
+    assert USER_DATA == before
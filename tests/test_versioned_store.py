@@ -0,0 +1,61 @@
+from types import MappingProxyType
+
+import pytest
+
+from utils.versioned_store import VersionedStore, VersionedStoreMap, freeze, thaw
+
+
+def test_snapshots_are_read_only():
+    store = VersionedStore({"crops": {"벼": {"code": "01001"}}, "names": ["벼"]})
+    data = store.snapshot().data
+    assert isinstance(data, MappingProxyType)
+    assert data["names"] == ("벼",)
+    with pytest.raises(TypeError):
+        data["crops"]["벼"]["code"] = "x"
+
+
+def test_update_publishes_new_version_and_keeps_old_snapshot():
+    store = VersionedStore({"count": 0})
+    before = store.snapshot()
+    published, after = store.update(lambda data: {**data, "count": data["count"] + 1})
+    assert published and after.version == 1
+    assert (before.data["count"], after.data["count"]) == (0, 1)
+
+
+def test_update_returning_none_or_stale_version_does_not_publish():
+    store = VersionedStore({"count": 0})
+    assert store.update(lambda data: None) == (False, store.snapshot())
+    store.update(lambda data: {"count": 1})
+    published, snapshot = store.update(lambda data: {"count": 2}, expected_version=0)
+    assert not published and snapshot.data["count"] == 1
+
+
+def test_copy_false_shares_unchanged_parts():
+    store = VersionedStore({"a": {"x": 1}, "b": {"y": 2}})
+    before = store.snapshot().data
+    store.update(lambda data: {**data, "b": {"y": 3}}, copy=False)
+    after = store.snapshot().data
+    assert after["a"] is before["a"]
+    assert after["b"]["y"] == 3
+
+
+def test_freeze_thaw_round_trip():
+    value = {"a": [1, {"b": 2}]}
+    assert thaw(freeze(value)) == value
+
+
+def test_store_map_keeps_keys_independent():
+    stores = VersionedStoreMap({"crops": {}})
+    stores.store("farm1").update(lambda data: {"crops": {"벼": 1}})
+    assert stores.store("farm2").snapshot().data["crops"] == {}
+    assert stores.store("farm1").version == 1
+
+
+def test_store_map_reads_do_not_create_stores():
+    stores = VersionedStoreMap({"crops": {}})
+    snapshot = stores.snapshot("missing")
+    assert (snapshot.version, snapshot.data["crops"]) == (0, {})
+    assert stores.keys() == []
+    stores.store("farm1").update(lambda data: {"crops": {"벼": 1}})
+    assert stores.snapshot("farm1").version == 1
+    assert stores.keys() == ["farm1"]
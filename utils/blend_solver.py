@@ -0,0 +1,135 @@
+"""
+다중 비료 배합 계산
+1~3개 제품과 각 사용량(kg)을 골라 N/P/K 필요량과의 과부족(최소제곱)을 최소화
+제품 쌍의 그람 행렬 역행렬을 미리 계산해 두고, 요청마다 벡터 연산으로 비음수 최소제곱(NNLS)을 풂
+"""
+from itertools import combinations
+
+import numpy as np
+
+# 3개 배합 후보를 고를 때 사용하는 상위 제품 수 (C(16, 3) = 560 조합)
+TRIPLE_POOL_SIZE = 16
+
+# 잔차 비교 허용 오차 (이보다 작으면 같은 잔차로 보고 제품 수/총 사용량으로 비교)
+_TOL = 1e-9
+
+
+class BlendSolver:
+    """카탈로그 성분표(n×3)에 대한 1~3개 제품 배합 NNLS 풀이기"""
+
+    def __init__(self, grades, weights=None):
+        """
+        Args:
+            grades: (n, 3) 성분 함량(%) 배열 (N, P2O5, K2O) - 행 번호가 제품 번호
+            weights: N, P, K 과부족 가중치 (기본 1, 1, 1)
+        """
+        self.weights = np.ones(3) if weights is None else np.asarray(weights, dtype=np.float64)
+        w = np.sqrt(self.weights)
+
+        # 성분이 같은 제품은 하나만 후보로 사용 (가장 앞선 행)
+        self.rows = self._unique_rows(grades)
+        # 제품 1kg당 공급 성분(kg), 가중치 적용
+        self.columns = grades[self.rows] / 100.0 * w
+        self.norms2 = np.einsum("ij,ij->i", self.columns, self.columns)
+
+        # 제품 쌍: 2×2 그람 행렬과 행렬식 미리 계산
+        m = len(self.rows)
+        usable = np.flatnonzero(self.norms2 > 0)
+        if len(usable) >= 2:
+            i, j = np.array(list(combinations(usable, 2))).T
+        else:
+            i = j = np.empty(0, dtype=np.intp)
+        g_ij = np.einsum("ij,ij->i", self.columns[i], self.columns[j])
+        det = self.norms2[i] * self.norms2[j] - g_ij ** 2
+        independent = det > _TOL * np.maximum(self.norms2[i] * self.norms2[j], _TOL)
+        self.pair_i = i[independent]
+        self.pair_j = j[independent]
+        self.pair_gij = g_ij[independent]
+        self.pair_det = det[independent]
+        self.size = m
+
+    @staticmethod
+    def _unique_rows(grades):
+        if len(grades) == 0:
+            return np.empty(0, dtype=np.intp)
+        _, first = np.unique(grades, axis=0, return_index=True)
+        return np.sort(first)
+
+    def solve(self, need_n, need_p, need_k, max_products=3):
+        """
+        필요량에 가장 가까운 배합 계산
+
+        Returns:
+            {"rows": [카탈로그 행 번호...], "amounts_kg": [사용량...], "residual": 가중 잔차 제곱합}
+            (후보 제품이 없으면 None)
+        """
+        if self.size == 0:
+            return None
+        b = np.array((need_n, need_p, need_k), dtype=np.float64) * np.sqrt(self.weights)
+        b2 = float(b @ b)
+        ab = self.columns @ b
+
+        # 후보: (잔차, 제품 수, 총 사용량, 열 번호 튜플, 사용량 튜플)
+        candidates = []
+
+        # 1개 제품: x = max(0, a·b / a·a)
+        with np.errstate(invalid="ignore", divide="ignore"):
+            x1 = np.where(self.norms2 > 0, np.maximum(ab, 0) / self.norms2, 0.0)
+        r1 = b2 - x1 * ab
+        best1 = int(np.argmin(r1))
+        candidates.append((float(r1[best1]), 1, float(x1[best1]), (best1,), (float(x1[best1]),)))
+
+        if max_products >= 2 and len(self.pair_i):
+            # 2개 제품: 정규방정식 해가 모두 양수인 쌍만 (음수면 최적해는 1개 제품 쪽에 있음)
+            ab_i = ab[self.pair_i]
+            ab_j = ab[self.pair_j]
+            xi = (self.norms2[self.pair_j] * ab_i - self.pair_gij * ab_j) / self.pair_det
+            xj = (self.norms2[self.pair_i] * ab_j - self.pair_gij * ab_i) / self.pair_det
+            feasible = (xi > 0) & (xj > 0)
+            if feasible.any():
+                r2 = np.where(feasible, b2 - (xi * ab_i + xj * ab_j), np.inf)
+                best2 = int(np.argmin(r2))
+                i, j = int(self.pair_i[best2]), int(self.pair_j[best2])
+                candidates.append((float(r2[best2]), 2, float(xi[best2] + xj[best2]),
+                                   (i, j), (float(xi[best2]), float(xj[best2]))))
+
+        if max_products >= 3 and self.size >= 3:
+            candidates.extend(self._solve_triples(b, ab, x1, r1))
+
+        residual, _, _, cols, amounts = min(
+            candidates, key=lambda c: (round(c[0] / max(b2, 1.0) / _TOL), c[1], c[2])
+        )
+        used = [(int(self.rows[c]), amount) for c, amount in zip(cols, amounts) if amount > 0]
+        return {
+            "rows": [row for row, _ in used],
+            "amounts_kg": [amount for _, amount in used],
+            "residual": max(residual, 0.0)
+        }
+
+    def _solve_triples(self, b, ab, x1, r1):
+        """
+        3개 제품: 1개 제품 잔차 상위 후보끼리 3×3 연립방정식을 일괄 풀이
+        해가 모두 양수면 잔차 0 (필요량 정확히 충족), 아니면 최적해는 2개 이하 배합에 있음
+        """
+        pool_size = min(TRIPLE_POOL_SIZE, self.size)
+        pool = np.argsort(r1, kind="stable")[:pool_size]
+        pool = pool[self.norms2[pool] > 0]
+        if len(pool) < 3:
+            return []
+        triples = np.array(list(combinations(sorted(pool.tolist()), 3)))
+        matrices = self.columns[triples].transpose(0, 2, 1)  # (t, 3성분, 3제품)
+        det = np.linalg.det(matrices)
+        ok = np.abs(det) > _TOL
+        if not ok.any():
+            return []
+        triples = triples[ok]
+        solutions = np.linalg.solve(matrices[ok], np.broadcast_to(b, (len(triples), 3))[..., None])[..., 0]
+        feasible = (solutions > 0).all(axis=1)
+        if not feasible.any():
+            return []
+        triples = triples[feasible]
+        solutions = solutions[feasible]
+        totals = solutions.sum(axis=1)
+        best = int(np.argmin(totals))
+        return [(0.0, 3, float(totals[best]), tuple(int(c) for c in triples[best]),
+                 tuple(float(x) for x in solutions[best]))]
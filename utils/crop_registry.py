@@ -0,0 +1,196 @@
+"""
+통합 작물 레지스트리
+config.crop_codes(농촌진흥청 작물코드표)를 기준으로 작물명 → 코드 조회 색인을 한 번 만들어 두고
+정확 일치 → 정규화 일치(공백/괄호 제거, 괄호 안 조건 제거) 순으로 dict 조회
+없는 작물은 글자 bigram 색인으로 비슷한 작물명을 점수순으로 제안 (None을 처방 API로 보내지 않도록)
+"""
+import re
+import unicodedata
+from collections import Counter
+from typing import Dict, List, Optional
+
+from config.crop_codes import CROP_CODES
+
+# 작물코드표에 없는 흔한 동의어 → 작물코드표 이름
+CROP_SYNONYMS = {
+    "쌀": "벼(일반답)",
+    "논벼": "벼(일반답)",
+    "대두": "콩",
+    "키위": "참다래(1년생)",
+    "방토": "방울토마토(시설)",
+    "파": "대파(노지)",
+}
+
+# 코드 앞 두 자리 → 분류 (config.crop_codes 구분)
+CROP_CATEGORIES = {
+    "00": "식량작물",
+    "01": "식량작물",
+    "02": "식량작물",
+    "03": "식량작물",
+    "04": "과채류",
+    "05": "근채류",
+    "06": "양념채소",
+    "07": "엽채류",
+    "08": "산채류",
+    "09": "과수류",
+    "10": "약용식물",
+    "11": "화훼류",
+    "12": "특용작물",
+    "13": "사료작물",
+}
+
+# 제안 최소 유사도 (Dice 계수) 및 기본 제안 수
+SUGGEST_MIN_SCORE = 0.3
+SUGGEST_LIMIT = 5
+
+_PARENTHETICAL = re.compile(r"\([^)]*\)")
+_SEPARATORS = re.compile(r"[\s()\[\],·]+")
+
+
+def compact_name(name: str) -> str:
+    """공백/괄호/쉼표를 제거한 비교용 이름 ("토마토 (노지)" → "토마토노지")"""
+    return _SEPARATORS.sub("", unicodedata.normalize("NFKC", name)).lower()
+
+
+def base_name(name: str) -> str:
+    """괄호 안 재배 조건을 제거한 비교용 이름 ("토마토(노지)" → "토마토")"""
+    return compact_name(_PARENTHETICAL.sub("", unicodedata.normalize("NFKC", name)))
+
+
+def _bigrams(text: str):
+    return {text[i:i + 2] for i in range(len(text) - 1)} or {text}
+
+
+class CropEntry:
+    """작물 조회 결과 (name: 작물코드표 이름, matched: 조회 방식 "exact" / "normalized")"""
+    __slots__ = ("name", "code", "category", "matched")
+
+    def __init__(self, name, code, category, matched="exact"):
+        self.name = name
+        self.code = code
+        self.category = category
+        self.matched = matched
+
+    def to_dict(self):
+        return {"name": self.name, "code": self.code, "category": self.category, "matched": self.matched}
+
+
+class UnknownCropError(ValueError):
+    """작물코드표에 없는 작물 (suggestions: 비슷한 작물명 점수순)"""
+
+    def __init__(self, crop_name, suggestions):
+        super().__init__(f"지원하지 않는 작물입니다: {crop_name}")
+        self.crop_name = crop_name
+        self.suggestions = suggestions
+
+
+class CropRegistry:
+    """작물명/코드 색인 (생성 시 한 번 구축, 이후 읽기 전용)"""
+
+    def __init__(self, crop_codes: Dict[str, str], synonyms: Dict[str, str] = None):
+        """
+        Args:
+            crop_codes: 작물명 → 코드 (순서상 같은 코드의 첫 이름이 대표 이름)
+            synonyms: 동의어 → crop_codes의 작물명
+        """
+        self._names = {}
+        self._by_code = {}
+        for name, code in crop_codes.items():
+            self._by_code.setdefault(code, name)
+        for name, code in crop_codes.items():
+            self._names[name] = self._entry(self._by_code[code], code)
+        for synonym, name in (synonyms or {}).items():
+            if name in self._names and synonym not in self._names:
+                self._names[synonym] = self._names[name]
+
+        # 정규화 색인: 공백/괄호만 제거한 이름이 괄호 안 조건까지 제거한 이름보다 우선
+        # 같은 기본 이름이 여러 개면 괄호 없는 이름(별칭), 그다음 표 순서가 우선
+        self._compact = {}
+        self._base = {}
+        for name, entry in self._names.items():
+            self._compact.setdefault(compact_name(name), entry)
+        for name, entry in sorted(self._names.items(), key=lambda item: "(" in item[0]):
+            self._base.setdefault(base_name(name), entry)
+
+        # 제안용 bigram 색인 (작물코드표 이름 + 동의어)
+        self._suggest_names = list(self._names)
+        self._suggest_grams = [_bigrams(compact_name(name)) for name in self._suggest_names]
+        self._gram_index = {}
+        for i, grams in enumerate(self._suggest_grams):
+            for gram in grams:
+                self._gram_index.setdefault(gram, []).append(i)
+
+    @staticmethod
+    def _entry(name, code):
+        return CropEntry(name, code, CROP_CATEGORIES.get(code[:2], "기타"))
+
+    def lookup(self, crop_name) -> Optional[CropEntry]:
+        """작물명 조회 (정확 → 정규화 일치, 없으면 None)"""
+        if not isinstance(crop_name, str):
+            return None
+        entry = self._names.get(crop_name)
+        if entry is not None:
+            return entry
+        entry = self._compact.get(compact_name(crop_name)) or self._base.get(base_name(crop_name))
+        if entry is None:
+            return None
+        return CropEntry(entry.name, entry.code, entry.category, "normalized")
+
+    def resolve(self, crop_name) -> CropEntry:
+        """작물명 조회 (없으면 제안 목록을 담은 UnknownCropError)"""
+        entry = self.lookup(crop_name)
+        if entry is None:
+            raise UnknownCropError(crop_name, self.suggest(crop_name))
+        return entry
+
+    def code(self, crop_name) -> Optional[str]:
+        entry = self.lookup(crop_name)
+        return entry.code if entry is not None else None
+
+    def name(self, crop_code) -> Optional[str]:
+        """코드 → 작물코드표 대표 이름"""
+        return self._by_code.get(crop_code)
+
+    def names(self) -> List[str]:
+        """조회 가능한 모든 작물명 (작물코드표 이름 + 동의어)"""
+        return list(self._names)
+
+    def suggest(self, crop_name, limit: int = SUGGEST_LIMIT) -> List[Dict]:
+        """
+        비슷한 작물명 제안 (글자 bigram Dice 계수 점수순, 동점은 표 순서)
+
+        Returns:
+            [{"name", "code", "score"}, ...]
+        """
+        if not isinstance(crop_name, str) or not compact_name(crop_name):
+            return []
+        query = _bigrams(compact_name(crop_name))
+        hits = Counter()
+        for gram in query:
+            for i in self._gram_index.get(gram, ()):
+                hits[i] += 1
+        scored = []
+        for i, common in hits.items():
+            score = 2 * common / (len(query) + len(self._suggest_grams[i]))
+            if score >= SUGGEST_MIN_SCORE:
+                scored.append((-score, i))
+        scored.sort()
+        suggestions = []
+        for negative_score, i in scored[:limit]:
+            name = self._suggest_names[i]
+            suggestions.append({"name": name, "code": self._names[name].code, "score": round(-negative_score, 3)})
+        return suggestions
+
+
+# 전역 작물 레지스트리
+crop_registry = CropRegistry(CROP_CODES, CROP_SYNONYMS)
+
+
+def get_crop_code(crop_name) -> Optional[str]:
+    """작물명 → 코드 (정확/정규화 일치, 없으면 None)"""
+    return crop_registry.code(crop_name)
+
+
+def get_crop_name(crop_code) -> Optional[str]:
+    """코드 → 작물코드표 대표 이름"""
+    return crop_registry.name(crop_code)
@@ -0,0 +1,137 @@
+"""
+작물명 자동완성 색인
+작물 레지스트리의 이름(작물코드표 이름 + 동의어)을 한글 자모 단위로 분해해 접두어 트라이를 미리 구축
+입력 중인 음절("토마" → "톰")이나 초성("ㅌㅁ")도 트라이 한 번 내려가기로 조회 (키 입력당 마이크로초 단위)
+"""
+import unicodedata
+from typing import Dict, List
+
+from utils.crop_registry import CropRegistry, compact_name, crop_registry
+
+# 기본 결과 수 / 최대 결과 수
+SEARCH_LIMIT = 20
+SEARCH_MAX_LIMIT = 100
+
+_HANGUL_BASE = 0xAC00
+_HANGUL_LAST = 0xD7A3
+_CHOSEONG = "ㄱㄲㄴㄷㄸㄹㅁㅂㅃㅅㅆㅇㅈㅉㅊㅋㅌㅍㅎ"
+_JUNGSEONG = "ㅏㅐㅑㅒㅓㅔㅕㅖㅗㅘㅙㅚㅛㅜㅝㅞㅟㅠㅡㅢㅣ"
+_JONGSEONG = ("", "ㄱ", "ㄲ", "ㄳ", "ㄴ", "ㄵ", "ㄶ", "ㄷ", "ㄹ", "ㄺ", "ㄻ", "ㄼ", "ㄽ", "ㄾ", "ㄿ", "ㅀ",
+              "ㅁ", "ㅂ", "ㅄ", "ㅅ", "ㅆ", "ㅇ", "ㅈ", "ㅊ", "ㅋ", "ㅌ", "ㅍ", "ㅎ")
+
+# 겹받침/이중모음 → 입력 순서대로의 기본 자모 ("닭" 입력 중 "달"도, "과" 입력 중 "고"도 접두어가 되도록)
+_COMPOUND_JAMO = {
+    "ㄳ": "ㄱㅅ", "ㄵ": "ㄴㅈ", "ㄶ": "ㄴㅎ", "ㄺ": "ㄹㄱ", "ㄻ": "ㄹㅁ", "ㄼ": "ㄹㅂ", "ㄽ": "ㄹㅅ",
+    "ㄾ": "ㄹㅌ", "ㄿ": "ㄹㅍ", "ㅀ": "ㄹㅎ", "ㅄ": "ㅂㅅ",
+    "ㅘ": "ㅗㅏ", "ㅙ": "ㅗㅐ", "ㅚ": "ㅗㅣ", "ㅝ": "ㅜㅓ", "ㅞ": "ㅜㅔ", "ㅟ": "ㅜㅣ", "ㅢ": "ㅡㅣ",
+}
+
+_CONSONANTS = set(_CHOSEONG) | set(_JONGSEONG[1:])
+
+# NFKC 정규화(compact_name)는 호환 자모(ㅌ)를 첫소리/가운뎃소리/끝소리 자모로 바꾸므로 다시 호환 자모로 되돌림
+_COMPAT_JAMO = {}
+for _jamo in set(_CHOSEONG) | set(_JUNGSEONG) | set(_JONGSEONG[1:]):
+    for _form in (_jamo, unicodedata.normalize("NFKC", _jamo)):
+        _COMPAT_JAMO[_form] = _COMPOUND_JAMO.get(_jamo, _jamo)
+
+
+def decompose_jamo(text: str) -> str:
+    """한글 음절을 기본 자모열로 분해 ("토마토" → "ㅌㅗㅁㅏㅌㅗ", "과" → "ㄱㅗㅏ"), 한글 외 문자는 그대로"""
+    parts = []
+    for char in text:
+        code = ord(char)
+        if _HANGUL_BASE <= code <= _HANGUL_LAST:
+            offset = code - _HANGUL_BASE
+            jong = _JONGSEONG[offset % 28]
+            parts.append(_CHOSEONG[offset // 588])
+            parts.append(_COMPAT_JAMO[_JUNGSEONG[offset // 28 % 21]])
+            if jong:
+                parts.append(_COMPAT_JAMO[jong])
+        else:
+            parts.append(_COMPAT_JAMO.get(char, char))
+    return "".join(parts)
+
+
+def initial_consonants(text: str) -> str:
+    """한글 음절의 초성열 ("토마토" → "ㅌㅁㅌ"), 한글 외 문자는 그대로"""
+    parts = []
+    for char in text:
+        code = ord(char)
+        if _HANGUL_BASE <= code <= _HANGUL_LAST:
+            parts.append(_CHOSEONG[(code - _HANGUL_BASE) // 588])
+        else:
+            parts.append(_COMPAT_JAMO.get(char, char))
+    return "".join(parts)
+
+
+def _is_initials(text: str) -> bool:
+    return all(char in _CONSONANTS for char in text)
+
+
+class _PrefixTrie:
+    """문자 단위 트라이 (각 노드에 해당 접두어로 시작하는 이름 번호를 정렬 순서로 미리 저장)"""
+    __slots__ = ("_root",)
+
+    def __init__(self, keys: List[str]):
+        """keys: 이름 번호 순서(정렬 순서)대로의 색인 키"""
+        self._root = ({}, [])
+        for i, key in enumerate(keys):
+            node = self._root
+            node[1].append(i)
+            for char in key:
+                node = node[0].setdefault(char, ({}, []))
+                node[1].append(i)
+
+    def find(self, prefix: str) -> List[int]:
+        node = self._root
+        for char in prefix:
+            node = node[0].get(char)
+            if node is None:
+                return []
+        return node[1]
+
+
+class CropSearchIndex:
+    """작물명 접두어 검색 색인 (생성 시 한 번 구축, 이후 읽기 전용)"""
+
+    def __init__(self, registry: CropRegistry):
+        # 짧은 이름 → 작물코드표 순서 (동의어는 표 이름 뒤)
+        names = registry.names()
+        order = {name: i for i, name in enumerate(names)}
+        names.sort(key=lambda name: (len(compact_name(name)), order[name]))
+        self._results = []
+        for name in names:
+            entry = registry.lookup(name)
+            self._results.append({"name": name, "code": entry.code, "category": entry.category})
+        self._jamo = _PrefixTrie([decompose_jamo(compact_name(name)) for name in names])
+        self._initials = _PrefixTrie([initial_consonants(compact_name(name)) for name in names])
+
+    def __len__(self):
+        return len(self._results)
+
+    def search(self, prefix: str, limit: int = SEARCH_LIMIT) -> Dict:
+        """
+        작물명 접두어 검색
+
+        Args:
+            prefix: 입력 중인 작물명 ("토마", "톰", "ㅌㅁ" 등, 공백/괄호 무시, 빈 값이면 전체)
+            limit: 최대 결과 수
+
+        Returns:
+            {"total": 일치 수, "crops": [{"name", "code", "category"}, ...]}
+        """
+        key = compact_name(prefix or "")
+        jamo = decompose_jamo(key)
+        if jamo and _is_initials(jamo):
+            # 자음만 입력: 초성 검색 ("ㅌㅁ" → 토마토), 자음 하나면 자모 검색과 같은 결과
+            matches = self._initials.find(jamo)
+        else:
+            matches = self._jamo.find(jamo)
+        return {
+            "total": len(matches),
+            "crops": [self._results[i] for i in matches[:max(limit, 0)]]
+        }
+
+
+# 전역 작물 검색 색인
+crop_search = CropSearchIndex(crop_registry)
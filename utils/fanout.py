@@ -0,0 +1,51 @@
+"""
+작물별 동시 실행 (fan-out)
+작물마다 upstream 호출이 있는 작업을 제한된 공용 스레드 풀에서 동시에 실행하고 전체 마감 시간을 적용
+"""
+import os
+from concurrent.futures import ThreadPoolExecutor, wait
+
+# 작물별 작업 공용 스레드 풀 (동시 요청이 많아도 upstream 동시 호출 수를 제한)
+crop_executor = ThreadPoolExecutor(
+    max_workers=int(os.getenv('CROP_FANOUT_WORKERS', 8)),
+    thread_name_prefix='crop-fanout'
+)
+
+# 작물별 작업 전체 마감 시간 (초)
+CROP_FANOUT_DEADLINE = float(os.getenv('CROP_FANOUT_DEADLINE', 20))
+
+
+class FanoutTimeout(Exception):
+    """마감 시간 안에 끝나지 않은 작업"""
+
+
+def fan_out(fn, keys, deadline=None, executor=None):
+    """
+    keys 각각에 fn(key)를 동시에 실행
+
+    Args:
+        fn: 작업 함수 (key → 결과)
+        keys: 작업 키 목록 (예: 작물명)
+        deadline: 전체 마감 시간 (초, 기본 CROP_FANOUT_DEADLINE)
+        executor: 스레드 풀 (기본 crop_executor)
+
+    Returns:
+        keys 순서의 [(key, 결과 또는 예외)] - 마감 시간을 넘긴 작업은 FanoutTimeout
+        (넘긴 작업은 취소하거나, 이미 실행 중이면 백그라운드에서 끝나도록 두고 결과는 버림)
+    """
+    executor = executor or crop_executor
+    deadline = CROP_FANOUT_DEADLINE if deadline is None else deadline
+    futures = [(key, executor.submit(fn, key)) for key in keys]
+    _, not_done = wait([future for _, future in futures], timeout=deadline)
+
+    results = []
+    for key, future in futures:
+        if future in not_done:
+            future.cancel()
+            results.append((key, FanoutTimeout(f"{deadline:g}초 안에 완료되지 않았습니다.")))
+            continue
+        try:
+            results.append((key, future.result()))
+        except Exception as e:
+            results.append((key, e))
+    return results
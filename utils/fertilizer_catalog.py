@@ -0,0 +1,318 @@
+"""
+비료 제품 카탈로그
+data/fertilizers.json(영문 스키마)과 밑거름.json/웃거름.json(한글 스키마)을 하나의 열 단위(columnar) 구조로 통합
+최초 로드 시 바이너리 캐시(.npz)를 만들어 두고, 원본 파일이 바뀌지 않았으면 JSON을 다시 파싱하지 않음
+원본 파일 수정 시각(mtime)이 바뀌면 다음 조회 시 다시 읽음
+"""
+import json
+import os
+import tempfile
+import threading
+import time
+from types import MappingProxyType
+
+import numpy as np
+
+from utils.blend_solver import BlendSolver
+from utils.npk_index import NPKIndex
+
+DATA_DIR = os.path.join(os.path.dirname(__file__), '..', 'data')
+FERTILIZERS_FILE = os.path.join(DATA_DIR, 'fertilizers.json')
+CACHE_FILE = os.getenv('FERTILIZER_CATALOG_CACHE', os.path.join(DATA_DIR, '.fertilizer_catalog.npz'))
+
+STAGES = ("basal", "topdress")
+STAGE_BITS = {"basal": 1, "topdress": 2}
+
+# 포장단위가 없거나 0인 제품의 기본 포대 무게 (kg)
+DEFAULT_BAG_KG = 20
+
+# (파일 경로, 스키마, 단계, _id 접두사) - 같은 _id는 앞선 소스가 우선
+# 밑거름/웃거름 _id는 파일 내 순번으로 생성 (fertilizers.json의 base_001, add_001 등과 동일 규칙)
+CATALOG_SOURCES = (
+    (FERTILIZERS_FILE, "en", None, None),
+    (os.path.join(DATA_DIR, '밑거름.json'), "ko", "basal", "base"),
+    (os.path.join(DATA_DIR, '웃거름.json'), "ko", "topdress", "add"),
+)
+
+_COLUMNS = ("ids", "names", "stage_bits", "grades", "bag_kg")
+
+
+def _normalize_en(fert):
+    """fertilizers.json 항목 → (_id, 이름, 단계 비트, (N, P2O5, K2O), 포대 kg)"""
+    grade = fert.get('grade', {})
+    stage_bits = 0
+    for stage in fert.get('stage', []):
+        stage_bits |= STAGE_BITS.get(stage, 0)
+    return (
+        fert.get('_id', ''),
+        fert.get('name', ''),
+        stage_bits,
+        (float(grade.get('N', 0)), float(grade.get('P2O5', 0)), float(grade.get('K2O', 0))),
+        float(fert.get('bag_kg') or DEFAULT_BAG_KG)
+    )
+
+
+def _normalize_ko(fert, stage, fert_id):
+    """밑거름.json/웃거름.json 항목 → (_id, 이름, 단계 비트, (N, P2O5, K2O), 포대 kg)"""
+    bag_kg = fert.get('1포대당 무게', fert.get('포장단위'))
+    return (
+        fert_id,
+        fert.get('비료종류', ''),
+        STAGE_BITS[stage],
+        (float(fert.get('질소') or 0), float(fert.get('인산') or 0), float(fert.get('칼리') or 0)),
+        float(bag_kg or DEFAULT_BAG_KG)
+    )
+
+
+def _source_signature(sources):
+    """원본 파일 목록의 (이름, mtime, 크기) 서명"""
+    signature = []
+    for path, *_ in sources:
+        try:
+            st = os.stat(path)
+            signature.append(f"{os.path.basename(path)}:{st.st_mtime_ns}:{st.st_size}")
+        except OSError:
+            signature.append(f"{os.path.basename(path)}:-")
+    return "|".join(signature)
+
+
+def _parse_sources(sources):
+    """원본 JSON을 읽어 열 단위 배열로 변환"""
+    rows = []
+    seen = set()
+    for path, schema, stage, id_prefix in sources:
+        if not os.path.exists(path):
+            continue
+        with open(path, 'r', encoding='utf-8') as f:
+            items = json.load(f)
+        for index, fert in enumerate(items, 1):
+            if schema == "en":
+                row = _normalize_en(fert)
+            else:
+                row = _normalize_ko(fert, stage, f"{id_prefix}_{index:03d}")
+            if row[0] in seen:
+                continue
+            seen.add(row[0])
+            rows.append(row)
+
+    return {
+        "ids": np.array([row[0] for row in rows], dtype=np.str_),
+        "names": np.array([row[1] for row in rows], dtype=np.str_),
+        "stage_bits": np.array([row[2] for row in rows], dtype=np.uint8),
+        "grades": np.array([row[3] for row in rows], dtype=np.float64).reshape(-1, 3),
+        "bag_kg": np.array([row[4] for row in rows], dtype=np.float64),
+    }
+
+
+def _read_cache(path, signature):
+    """바이너리 캐시 읽기 (서명이 다르거나 읽을 수 없으면 None)"""
+    try:
+        with np.load(path, allow_pickle=False) as data:
+            if str(data["signature"]) != signature:
+                return None
+            return {key: data[key] for key in _COLUMNS}
+    except (OSError, KeyError, ValueError):
+        return None
+
+
+def _write_cache(path, signature, columns):
+    """바이너리 캐시 원자적 저장 (쓰기 불가 환경이면 건너뜀)"""
+    try:
+        fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(os.path.abspath(path)), suffix=".tmp")
+        try:
+            with os.fdopen(fd, "wb") as f:
+                np.savez(f, signature=np.array(signature), **columns)
+            os.replace(tmp_path, path)
+        except BaseException:
+            os.unlink(tmp_path)
+            raise
+    except OSError as e:
+        print(f"⚠️ 비료 카탈로그 캐시 저장 실패: {e}")
+
+
+def _readonly(array):
+    array.flags.writeable = False
+    return array
+
+
+def _as_number(value):
+    """정수 값은 int로 (원본 JSON과 같은 표현 유지)"""
+    value = float(value)
+    return int(value) if value.is_integer() else value
+
+
+class _CatalogSnapshot:
+    """한 시점의 카탈로그 열 데이터와 단계별 인덱스"""
+
+    def __init__(self, columns):
+        self.ids = columns["ids"]
+        self.names = columns["names"]
+        self.stage_bits = columns["stage_bits"]
+        self.grades = _readonly(columns["grades"])
+        self.bag_kg = _readonly(columns["bag_kg"])
+        self.rows_by_stage = {}
+        self.nitrogen_rows_by_stage = {}
+        self.nitrogen_grades_by_stage = {}
+        has_nitrogen = self.grades[:, 0] > 0
+        for stage, bit in STAGE_BITS.items():
+            in_stage = (self.stage_bits & bit) != 0
+            self.rows_by_stage[stage] = np.flatnonzero(in_stage)
+            rows = np.flatnonzero(in_stage & has_nitrogen)
+            self.nitrogen_rows_by_stage[stage] = rows
+            self.nitrogen_grades_by_stage[stage] = _readonly(self.grades[rows])
+        self._nitrogen_index_by_stage = {}
+        self._blend_solver_by_stage = {}
+        self._index_lock = threading.Lock()
+
+    def nitrogen_index(self, stage):
+        """단계별 질소 함유 제품 NPK 인덱스 (최초 사용 시 생성)"""
+        index = self._nitrogen_index_by_stage.get(stage)
+        if index is None:
+            with self._index_lock:
+                index = self._nitrogen_index_by_stage.get(stage)
+                if index is None:
+                    index = NPKIndex(self.nitrogen_grades_by_stage[stage])
+                    self._nitrogen_index_by_stage[stage] = index
+        return index
+
+    def blend_solver(self, stage):
+        """단계별 전체 제품 배합 풀이기 (최초 사용 시 제품 쌍 사전 계산)"""
+        solver = self._blend_solver_by_stage.get(stage)
+        if solver is None:
+            with self._index_lock:
+                solver = self._blend_solver_by_stage.get(stage)
+                if solver is None:
+                    solver = BlendSolver(self.grades[self.rows_by_stage[stage]])
+                    self._blend_solver_by_stage[stage] = solver
+        return solver
+
+    def record(self, row):
+        """행 번호의 읽기 전용 레코드 (fertilizers.json과 같은 구조)"""
+        grade = self.grades[row]
+        bits = int(self.stage_bits[row])
+        return MappingProxyType({
+            "_id": str(self.ids[row]),
+            "name": str(self.names[row]),
+            "stage": tuple(stage for stage, bit in STAGE_BITS.items() if bits & bit),
+            "grade": MappingProxyType({
+                "N": _as_number(grade[0]),
+                "P2O5": _as_number(grade[1]),
+                "K2O": _as_number(grade[2])
+            }),
+            "bag_kg": _as_number(self.bag_kg[row])
+        })
+
+
+class _RecordView:
+    """행 번호 목록을 레코드 시퀀스로 노출 (접근한 행만 레코드 생성)"""
+    __slots__ = ("_snapshot", "_rows")
+
+    def __init__(self, snapshot, rows):
+        self._snapshot = snapshot
+        self._rows = rows
+
+    def __len__(self):
+        return len(self._rows)
+
+    def __getitem__(self, index):
+        return self._snapshot.record(int(self._rows[index]))
+
+
+class FertilizerCatalog:
+    """통합 비료 카탈로그 (열 단위 저장, 단계별 인덱스, 읽기 전용 레코드)"""
+
+    def __init__(self, sources=CATALOG_SOURCES, cache_file: str = CACHE_FILE, check_interval: float = 1.0):
+        """
+        Args:
+            sources: (파일 경로, 스키마 "en"|"ko", 단계, _id 접두사) 목록
+            cache_file: 바이너리 캐시 경로 (None이면 캐시 사용 안 함)
+            check_interval: 원본 파일 변경 확인 최소 간격 (초)
+        """
+        self.sources = sources
+        self.cache_file = cache_file
+        self.check_interval = check_interval
+        self._signature = None
+        self._checked_at = 0.0
+        self._snapshot = None
+        self._lock = threading.Lock()
+
+    def _current(self) -> _CatalogSnapshot:
+        """원본 파일이 바뀌었으면 다시 로드한 뒤 현재 스냅샷 반환"""
+        now = time.monotonic()
+        snapshot = self._snapshot
+        if snapshot is not None and now - self._checked_at < self.check_interval:
+            return snapshot
+        signature = _source_signature(self.sources)
+        self._checked_at = now
+        if snapshot is not None and signature == self._signature:
+            return snapshot
+        with self._lock:
+            if self._snapshot is None or signature != self._signature:
+                self._snapshot = _CatalogSnapshot(self._load_columns(signature))
+                self._signature = signature
+            return self._snapshot
+
+    def _load_columns(self, signature):
+        if self.cache_file:
+            columns = _read_cache(self.cache_file, signature)
+            if columns is not None:
+                return columns
+        columns = _parse_sources(self.sources)
+        if self.cache_file:
+            _write_cache(self.cache_file, signature, columns)
+        return columns
+
+    def __len__(self):
+        return len(self._current().ids)
+
+    def products(self, stage: str = None):
+        """전체 또는 단계별 제품 레코드 시퀀스"""
+        snapshot = self._current()
+        if stage is None:
+            rows = range(len(snapshot.ids))
+        else:
+            rows = snapshot.rows_by_stage.get(stage, ())
+        return _RecordView(snapshot, rows)
+
+    def nitrogen_grades(self, stage: str) -> tuple:
+        """
+        질소 함량이 있는 단계별 제품 반환
+
+        Returns:
+            (레코드 시퀀스, (n, 3) 성분 배열[N, P2O5, K2O]) - 배열 행 순서는 레코드 순서와 같음
+        """
+        snapshot = self._current()
+        rows = snapshot.nitrogen_rows_by_stage.get(stage)
+        if rows is None:
+            return _RecordView(snapshot, ()), _readonly(np.empty((0, 3)))
+        return _RecordView(snapshot, rows), snapshot.nitrogen_grades_by_stage[stage]
+
+    def nitrogen_index(self, stage: str) -> tuple:
+        """
+        질소 함량이 있는 단계별 제품과 NPK 최근접 인덱스 반환
+
+        Returns:
+            (레코드 시퀀스, NPKIndex) - 인덱스 행 번호는 레코드 시퀀스 위치와 같음
+        """
+        snapshot = self._current()
+        rows = snapshot.nitrogen_rows_by_stage.get(stage)
+        if rows is None:
+            return _RecordView(snapshot, ()), NPKIndex(_readonly(np.empty((0, 3))))
+        return _RecordView(snapshot, rows), snapshot.nitrogen_index(stage)
+
+    def blend_solver(self, stage: str) -> tuple:
+        """
+        단계별 전체 제품과 배합 풀이기 반환
+
+        Returns:
+            (레코드 시퀀스, BlendSolver) - 풀이기 행 번호는 레코드 시퀀스 위치와 같음
+        """
+        snapshot = self._current()
+        rows = snapshot.rows_by_stage.get(stage)
+        if rows is None:
+            return _RecordView(snapshot, ()), BlendSolver(np.empty((0, 3)))
+        return _RecordView(snapshot, rows), snapshot.blend_solver(stage)
+
+
+# 전역 카탈로그 인스턴스
+fertilizer_catalog = FertilizerCatalog()
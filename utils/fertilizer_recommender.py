@@ -1,39 +1,91 @@
 import math
 
-def recommend_fertilizers(service, prescription, base_or_top, top_n=3):
-	if base_or_top == "base":
-		need_N = float(prescription.get('pre_Fert_N', 0))
-		need_P = float(prescription.get('pre_Fert_P', 0))
-		need_K = float(prescription.get('pre_Fert_K', 0))
-	else:
-		need_N = float(prescription.get('post_Fert_N', 0))
-		need_P = float(prescription.get('post_Fert_P', 0))
-		need_K = float(prescription.get('post_Fert_K', 0))
-
-	result = []
-	for fert in service.recommend_products(need_N, need_P, need_K, base_or_top, top_n):
-		supplied_N = float(fert.get("grade", {}).get("N", 0))
-		supplied_P = float(fert.get("grade", {}).get("P2O5", 0))
-		supplied_K = float(fert.get("grade", {}).get("K2O", 0))
+from utils.fertilizer_records import ProductRecommendation
+
+def recommend_fertilizers(service, prescription, base_or_top, top_n=3, **search_options):
+	"""
+	처방 필요량에 가까운 비료 제품과 사용량 계산
+
+	search_options는 service.recommend_products로 전달 (metric, weights, tolerance, ranges)
+	"""
+	need_N, need_P, need_K = prescription.needs(base_or_top)
+
+	return [
+		_fertilizer_entry(fert, need_N, need_P, need_K)
+		for fert in service.recommend_products(need_N, need_P, need_K, base_or_top, top_n, **search_options)
+	]
+
+def recommend_fertilizers_many(service, prescriptions, base_or_top, top_n=3):
+	"""여러 처방에 대한 recommend_fertilizers를 한 번의 벡터 연산으로 계산 (처방 순서대로 반환)"""
+	needs = [prescription.needs(base_or_top) for prescription in prescriptions]
+	return [
+		[_fertilizer_entry(fert, *need) for fert in ferts]
+		for need, ferts in zip(needs, service.recommend_products_many(needs, base_or_top, top_n))
+	]
+
+def _fertilizer_entry(fert, need_N, need_P, need_K):
+	"""
+	질소 기준 사용량과 인산/칼리 부족분 계산 (ProductRecommendation 반환)
+
+	사용량(kg) = 질소 필요량(kg) ÷ 질소 함량(%)/100 (배합 추천, get_fertilizer_usage와 같은 식)
+	"""
+	supplied_N = float(fert.get("grade", {}).get("N", 0))
+	supplied_P = float(fert.get("grade", {}).get("P2O5", 0))
+	supplied_K = float(fert.get("grade", {}).get("K2O", 0))
+	bag_kg = float(fert.get("bag_kg", 20))
+	usage_kg = (need_N / (supplied_N / 100)) if supplied_N else 0
+	supplied_P_total = usage_kg * supplied_P / 100 if supplied_P else 0
+	supplied_K_total = usage_kg * supplied_K / 100 if supplied_K else 0
+	shortage_P_kg = max(0, need_P - supplied_P_total)
+	shortage_K_kg = max(0, need_K - supplied_K_total)
+	bags = round(usage_kg / bag_kg, 2) if bag_kg else 0
+	return ProductRecommendation(
+		fert.get("_id", ""), fert.get("name", ""), supplied_N, supplied_P, supplied_K,
+		bags, round(usage_kg, 2), need_N, need_P, need_K,
+		round(shortage_P_kg, 2), round(shortage_K_kg, 2)
+	)
+
+def recommend_fertilizer_blend(service, prescription, base_or_top, max_products=3):
+	"""
+	N/P/K 필요량을 함께 맞추는 1~3개 제품 배합과 제품별 사용량 계산
+
+	질소 기준 단일 제품 추천(recommend_fertilizers)과 달리 인산/칼리 과부족까지 최소화
+	"""
+	need_N, need_P, need_K = prescription.needs(base_or_top)
+
+	products = []
+	supplied_N = supplied_P = supplied_K = 0.0
+	for fert, usage_kg in service.recommend_blend(need_N, need_P, need_K, base_or_top, max_products):
+		grade = fert.get("grade", {})
+		N_ratio = float(grade.get("N", 0))
+		P_ratio = float(grade.get("P2O5", 0))
+		K_ratio = float(grade.get("K2O", 0))
 		bag_kg = float(fert.get("bag_kg", 20))
-		usage_kg = (need_N / supplied_N * bag_kg) if supplied_N else 0
-		supplied_P_total = usage_kg * supplied_P / 100 if supplied_P else 0
-		supplied_K_total = usage_kg * supplied_K / 100 if supplied_K else 0
-		shortage_P_kg = max(0, need_P - supplied_P_total)
-		shortage_K_kg = max(0, need_K - supplied_K_total)
-		bags = round(usage_kg / bag_kg, 2) if bag_kg else 0
-		result.append({
-			"K_ratio": supplied_K,
-			"N_ratio": supplied_N,
-			"P_ratio": supplied_P,
-			"bags": bags,
+		supplied_N += usage_kg * N_ratio / 100
+		supplied_P += usage_kg * P_ratio / 100
+		supplied_K += usage_kg * K_ratio / 100
+		products.append({
+			"K_ratio": K_ratio,
+			"N_ratio": N_ratio,
+			"P_ratio": P_ratio,
+			"bags": round(usage_kg / bag_kg, 2) if bag_kg else 0,
 			"fertilizer_id": fert.get("_id", ""),
 			"fertilizer_name": fert.get("name", ""),
-			"need_K_kg": need_K,
-			"need_N_kg": need_N,
-			"need_P_kg": need_P,
-			"shortage_K_kg": round(shortage_K_kg, 2),
-			"shortage_P_kg": round(shortage_P_kg, 2),
 			"usage_kg": round(usage_kg, 2)
 		})
-	return result
+
+	return {
+		"products": products,
+		"need_K_kg": need_K,
+		"need_N_kg": need_N,
+		"need_P_kg": need_P,
+		"supplied_K_kg": round(supplied_K, 2),
+		"supplied_N_kg": round(supplied_N, 2),
+		"supplied_P_kg": round(supplied_P, 2),
+		"shortage_K_kg": round(max(0, need_K - supplied_K), 2),
+		"shortage_N_kg": round(max(0, need_N - supplied_N), 2),
+		"shortage_P_kg": round(max(0, need_P - supplied_P), 2),
+		"excess_K_kg": round(max(0, supplied_K - need_K), 2),
+		"excess_N_kg": round(max(0, supplied_N - need_N), 2),
+		"excess_P_kg": round(max(0, supplied_P - need_P), 2)
+	}
@@ -0,0 +1,165 @@
+"""
+비료 처방 / 제품 추천 레코드
+API 응답 문자열은 경계(파서)에서 한 번만 float로 변환하고, 서비스와 라우트는 속성으로 접근
+__slots__로 요청마다 만드는 객체의 메모리와 생성 비용을 줄이며 응답 JSON 변환은 to_dict() 하나로 처리
+"""
+
+# 처방 API 항목 필드명 → Prescription 속성명
+PRESCRIPTION_FIELDS = {
+    'crop_Code': 'crop_code',
+    'crop_Nm': 'crop_name',
+    'pre_Fert_N': 'pre_n',
+    'pre_Fert_P': 'pre_p',
+    'pre_Fert_K': 'pre_k',
+    'post_Fert_N': 'post_n',
+    'post_Fert_P': 'post_p',
+    'post_Fert_K': 'post_k',
+    'pre_Compost_Cattl': 'compost_cattle',
+    'pre_Compost_Pig': 'compost_pig',
+    'pre_Compost_Chick': 'compost_chicken',
+    'pre_Compost_Mix': 'compost_mixed'
+}
+
+_TEXT_FIELDS = ('crop_Code', 'crop_Nm')
+
+# get()으로 조회 가능한 전체 API 필드명 (헤더 포함)
+_API_FIELDS = {
+    'success': 'success',
+    'result_Code': 'result_code',
+    'result_Msg': 'result_msg',
+    **PRESCRIPTION_FIELDS
+}
+
+
+def _to_float(value):
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return 0.0
+
+
+class Prescription:
+    """
+    토양 비료 처방 (10a 기준 성분량 kg, 퇴비량 kg)
+
+    캐시에 저장되어 여러 요청이 공유하므로 생성 후 수정하지 않는다.
+    """
+    __slots__ = (
+        'success', 'result_code', 'result_msg', 'crop_code', 'crop_name',
+        'pre_n', 'pre_p', 'pre_k', 'post_n', 'post_p', 'post_k',
+        'compost_cattle', 'compost_pig', 'compost_chicken', 'compost_mixed'
+    )
+
+    def __init__(self, success=False, result_code='', result_msg='', crop_code='', crop_name='',
+                 pre_n=0.0, pre_p=0.0, pre_k=0.0, post_n=0.0, post_p=0.0, post_k=0.0,
+                 compost_cattle=0.0, compost_pig=0.0, compost_chicken=0.0, compost_mixed=0.0):
+        self.success = success
+        self.result_code = result_code
+        self.result_msg = result_msg
+        self.crop_code = crop_code
+        self.crop_name = crop_name
+        self.pre_n = pre_n
+        self.pre_p = pre_p
+        self.pre_k = pre_k
+        self.post_n = post_n
+        self.post_p = post_p
+        self.post_k = post_k
+        self.compost_cattle = compost_cattle
+        self.compost_pig = compost_pig
+        self.compost_chicken = compost_chicken
+        self.compost_mixed = compost_mixed
+
+    @classmethod
+    def from_api_fields(cls, item, result_code='200', result_msg='OK', success=True):
+        """API 항목 필드(문자열) dict에서 생성 (수치 필드는 여기서 한 번만 변환, 잘못된 값은 0)"""
+        values = {}
+        for field, attr in PRESCRIPTION_FIELDS.items():
+            value = item.get(field)
+            if field in _TEXT_FIELDS:
+                values[attr] = value or ''
+            else:
+                values[attr] = _to_float(value)
+        return cls(success, result_code, result_msg, **values)
+
+    @classmethod
+    def error(cls, result_code, result_msg):
+        """처방 실패 결과 (수치는 모두 0)"""
+        return cls(False, result_code or '', result_msg)
+
+    def needs(self, base_or_top):
+        """밑거름(base) 또는 웃거름 N/P/K 필요량"""
+        if base_or_top == "base":
+            return self.pre_n, self.pre_p, self.pre_k
+        return self.post_n, self.post_p, self.post_k
+
+    def compost_amounts(self, farm_size_10a):
+        """농장 면적 기준 퇴비 4종 필요량 (kg)"""
+        return {
+            "cattle_kg": self.compost_cattle * farm_size_10a,
+            "chicken_kg": self.compost_chicken * farm_size_10a,
+            "mixed_kg": self.compost_mixed * farm_size_10a,
+            "pig_kg": self.compost_pig * farm_size_10a,
+        }
+
+    def get(self, field, default=None):
+        """API 필드명으로 조회 (기존 dict 방식 호출부 호환)"""
+        attr = _API_FIELDS.get(field)
+        return default if attr is None else getattr(self, attr)
+
+    def to_dict(self):
+        """API 필드명 기준 dict (수치는 float)"""
+        return {field: getattr(self, attr) for field, attr in _API_FIELDS.items()}
+
+    def __repr__(self):
+        return (f"Prescription(success={self.success}, crop_code={self.crop_code!r}, "
+                f"pre=({self.pre_n}, {self.pre_p}, {self.pre_k}), "
+                f"post=({self.post_n}, {self.post_p}, {self.post_k}))")
+
+
+class ProductRecommendation:
+    """비료 제품 추천 1건 (질소 기준 사용량과 인산/칼리 부족분)"""
+    __slots__ = (
+        'fertilizer_id', 'fertilizer_name', 'n_ratio', 'p_ratio', 'k_ratio',
+        'bags', 'usage_kg', 'need_n_kg', 'need_p_kg', 'need_k_kg',
+        'shortage_p_kg', 'shortage_k_kg'
+    )
+
+    def __init__(self, fertilizer_id, fertilizer_name, n_ratio, p_ratio, k_ratio, bags, usage_kg,
+                 need_n_kg, need_p_kg, need_k_kg, shortage_p_kg, shortage_k_kg):
+        self.fertilizer_id = fertilizer_id
+        self.fertilizer_name = fertilizer_name
+        self.n_ratio = n_ratio
+        self.p_ratio = p_ratio
+        self.k_ratio = k_ratio
+        self.bags = bags
+        self.usage_kg = usage_kg
+        self.need_n_kg = need_n_kg
+        self.need_p_kg = need_p_kg
+        self.need_k_kg = need_k_kg
+        self.shortage_p_kg = shortage_p_kg
+        self.shortage_k_kg = shortage_k_kg
+
+    def to_dict(self):
+        """/api/fertilizer-recommendation 응답의 비료 항목 형식"""
+        return {
+            "K_ratio": self.k_ratio,
+            "N_ratio": self.n_ratio,
+            "P_ratio": self.p_ratio,
+            "bags": self.bags,
+            "fertilizer_id": self.fertilizer_id,
+            "fertilizer_name": self.fertilizer_name,
+            "need_K_kg": self.need_k_kg,
+            "need_N_kg": self.need_n_kg,
+            "need_P_kg": self.need_p_kg,
+            "shortage_K_kg": self.shortage_k_kg,
+            "shortage_P_kg": self.shortage_p_kg,
+            "usage_kg": self.usage_kg
+        }
+
+    def get(self, key, default=None):
+        """응답 필드명으로 조회 (기존 dict 방식 호출부 호환)"""
+        return self.to_dict().get(key, default)
+
+    def __repr__(self):
+        return (f"ProductRecommendation({self.fertilizer_id!r}, {self.fertilizer_name!r}, "
+                f"usage_kg={self.usage_kg})")
@@ -0,0 +1,234 @@
+"""
+외부 API 공용 HTTP 클라이언트
+data.go.kr(비료 처방), KMA(기상) 호출에 keep-alive 커넥션 풀, 재시도, 서킷 브레이커 적용
+"""
+import os
+import random
+import threading
+import time
+from urllib.parse import urlsplit
+
+import requests
+from dotenv import load_dotenv
+from requests.adapters import HTTPAdapter
+
+load_dotenv()
+
+# 재시도 대상 상태 코드 (일시적 upstream 오류)
+RETRY_STATUS_CODES = (429, 500, 502, 503, 504)
+
+
+class CircuitOpenError(requests.RequestException):
+    """서킷이 열려 있어 요청을 보내지 않고 즉시 실패한 경우"""
+
+
+class CircuitBreaker:
+    """
+    호스트별 서킷 브레이커
+
+    연속 실패가 failure_threshold에 도달하면 open 상태가 되어 reset_timeout 동안 즉시 실패시킨다.
+    이후 half-open 상태에서 1건만 시험 요청을 허용하고, 성공하면 closed로 복귀한다.
+    """
+
+    def __init__(self, failure_threshold: int = 5, reset_timeout: float = 30):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.state = "closed"
+        self.failures = 0
+        self.opened_at = 0.0
+        self._trial_in_flight = False
+        self._lock = threading.Lock()
+
+    def allow(self) -> bool:
+        """요청 허용 여부"""
+        with self._lock:
+            if self.state == "closed":
+                return True
+            if self.state == "open":
+                if time.monotonic() - self.opened_at < self.reset_timeout:
+                    return False
+                self.state = "half_open"
+                self._trial_in_flight = False
+            if self._trial_in_flight:
+                return False
+            self._trial_in_flight = True
+            return True
+
+    def record_success(self):
+        with self._lock:
+            self.state = "closed"
+            self.failures = 0
+            self._trial_in_flight = False
+
+    def record_failure(self):
+        with self._lock:
+            self.failures += 1
+            self._trial_in_flight = False
+            if self.state == "half_open" or self.failures >= self.failure_threshold:
+                self.state = "open"
+                self.opened_at = time.monotonic()
+
+    def release(self):
+        """성공/실패로 집계하지 않고 half-open 시험 요청 슬롯만 반납 (upstream과 무관한 예외)"""
+        with self._lock:
+            self._trial_in_flight = False
+
+
+class RetryBudget:
+    """
+    재시도 예산 (요청 대비 재시도 비율 제한)
+
+    요청마다 ratio만큼 토큰을 적립하고 재시도마다 1개를 사용한다.
+    upstream 장애 시 재시도가 트래픽을 증폭시키지 않도록 한다.
+    """
+
+    def __init__(self, ratio: float = 0.2, min_tokens: float = 3, max_tokens: float = 10):
+        self.ratio = ratio
+        self.max_tokens = max_tokens
+        self.tokens = float(min_tokens)
+        self._lock = threading.Lock()
+
+    def deposit(self):
+        with self._lock:
+            self.tokens = min(self.max_tokens, self.tokens + self.ratio)
+
+    def withdraw(self) -> bool:
+        with self._lock:
+            if self.tokens >= 1:
+                self.tokens -= 1
+                return True
+            return False
+
+
+class _HostState:
+    """호스트별 서킷/재시도 예산/통계 (통계는 여러 스레드가 갱신하므로 서킷 브레이커 잠금 안에서 변경)"""
+
+    def __init__(self, failure_threshold, reset_timeout, retry_ratio):
+        self.breaker = CircuitBreaker(failure_threshold, reset_timeout)
+        self.budget = RetryBudget(retry_ratio)
+        self.requests = 0
+        self.retries = 0
+        self.failures = 0
+        self.short_circuited = 0
+
+    def count(self, name):
+        with self.breaker._lock:
+            setattr(self, name, getattr(self, name) + 1)
+
+    def stats(self) -> dict:
+        with self.breaker._lock:
+            return {
+                "circuit": self.breaker.state,
+                "requests": self.requests,
+                "retries": self.retries,
+                "failures": self.failures,
+                "short_circuited": self.short_circuited
+            }
+
+
+class HttpClient:
+    """keep-alive 세션 기반 공용 HTTP 클라이언트 (스레드 간 공유)"""
+
+    def __init__(self, pool_maxsize: int = 10, max_retries: int = 2, backoff_base: float = 0.2,
+                 failure_threshold: int = 5, reset_timeout: float = 30, retry_ratio: float = 0.2):
+        """
+        Args:
+            pool_maxsize: 호스트별 최대 커넥션 수 (초과 요청은 커넥션 반환까지 대기)
+            max_retries: 요청당 최대 재시도 횟수
+            backoff_base: 재시도 대기 기준 시간 (초, 지수 증가 + full jitter)
+            failure_threshold: 서킷 open까지의 연속 실패 횟수
+            reset_timeout: 서킷 open 유지 시간 (초)
+            retry_ratio: 요청 대비 허용 재시도 비율
+        """
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+        self._failure_threshold = failure_threshold
+        self._reset_timeout = reset_timeout
+        self._retry_ratio = retry_ratio
+        self._hosts = {}
+        self._lock = threading.Lock()
+
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=10, pool_maxsize=pool_maxsize, pool_block=True)
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+
+    def _host_state(self, url) -> _HostState:
+        host = urlsplit(url).netloc
+        with self._lock:
+            state = self._hosts.get(host)
+            if state is None:
+                state = _HostState(self._failure_threshold, self._reset_timeout, self._retry_ratio)
+                self._hosts[host] = state
+            return state
+
+    def get(self, url, params=None, timeout=10, **kwargs):
+        """
+        GET 요청 (재시도 + 서킷 브레이커)
+
+        Returns:
+            requests.Response (재시도 후에도 5xx면 마지막 응답 그대로 반환)
+
+        Raises:
+            CircuitOpenError: 호스트 서킷이 열려 있는 경우 (네트워크 요청 없이 즉시)
+            requests.RequestException: 재시도 후에도 연결 오류인 경우, 응답 타임아웃 또는 응답 수신 오류
+        """
+        state = self._host_state(url)
+        state.count("requests")
+        state.budget.deposit()
+
+        attempt = 0
+        while True:
+            if not state.breaker.allow():
+                state.count("short_circuited")
+                raise CircuitOpenError(f"circuit open: {urlsplit(url).netloc}")
+            try:
+                response = self.session.get(url, params=params, timeout=timeout, **kwargs)
+            except requests.ReadTimeout:
+                # 응답 대기 중 타임아웃은 재시도하지 않음 (이미 timeout만큼 워커를 점유함)
+                state.breaker.record_failure()
+                state.count("failures")
+                raise
+            except requests.ConnectionError:
+                state.breaker.record_failure()
+                state.count("failures")
+                if not self._should_retry(state, attempt):
+                    raise
+            except requests.RequestException:
+                # 응답 본문 수신 오류, 리다이렉트 초과 등 (재시도하지 않음)
+                state.breaker.record_failure()
+                state.count("failures")
+                raise
+            except BaseException:
+                # requests 외 예외 (훅 오류, 인터럽트 등) - 시험 요청 슬롯이 계속 잡혀 서킷이 half-open에 멈추지 않도록 반납
+                state.breaker.release()
+                raise
+            else:
+                if response.status_code not in RETRY_STATUS_CODES:
+                    state.breaker.record_success()
+                    return response
+                state.breaker.record_failure()
+                state.count("failures")
+                if not self._should_retry(state, attempt):
+                    return response
+            attempt += 1
+            state.count("retries")
+            time.sleep(random.uniform(0, self.backoff_base * (2 ** attempt)))
+
+    def _should_retry(self, state, attempt) -> bool:
+        return attempt < self.max_retries and state.budget.withdraw()
+
+    def stats(self) -> dict:
+        """호스트별 서킷 상태 및 요청 통계"""
+        with self._lock:
+            hosts = dict(self._hosts)
+        return {host: state.stats() for host, state in hosts.items()}
+
+
+# 전역 공용 클라이언트 (SoilFertilizerService, WeatherService 공유)
+http_client = HttpClient(
+    pool_maxsize=int(os.getenv('HTTP_POOL_MAXSIZE', 10)),
+    max_retries=int(os.getenv('HTTP_MAX_RETRIES', 2)),
+    failure_threshold=int(os.getenv('HTTP_CIRCUIT_FAILURES', 5)),
+    reset_timeout=float(os.getenv('HTTP_CIRCUIT_RESET', 30))
+)
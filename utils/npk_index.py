@@ -0,0 +1,210 @@
+"""
+NPK 성분 공간 최근접 이웃 인덱스
+카탈로그 성분표(n×3)에 대해 k개 최근접, 허용 오차 이내(반경), 성분별 범위 조건 검색 제공
+제품 수가 많을 때는 KD-tree(scipy)로 후보만 추린 뒤 npk_scoring과 같은 식으로 정확히 점수를 매김
+"""
+import threading
+
+import numpy as np
+
+from utils.npk_scoring import METRICS, score_grades, score_grades_many, top_k
+
+try:
+    from scipy.spatial import cKDTree
+except ImportError:  # scipy가 없으면 선형 탐색으로 동작
+    cKDTree = None
+
+# 이 크기 미만이면 트리 없이 벡터 선형 탐색이 더 빠름
+INDEX_MIN_SIZE = 256
+
+# 여러 목표를 한 번에 점수 계산할 때 (목표 수 × 제품 수) 상한 (메모리 제한)
+MANY_CHUNK_CELLS = 1_000_000
+
+# 부동소수점 오차로 경계의 후보가 빠지지 않도록 반경에 더하는 여유
+_EPS = 1e-9
+
+NUTRIENT_AXES = {"N": 0, "P": 1, "K": 2}
+
+
+class NPKIndex:
+    """(n, 3) 성분 배열에 대한 최근접/반경/범위 검색 인덱스"""
+
+    def __init__(self, grades, min_size: int = INDEX_MIN_SIZE):
+        """
+        Args:
+            grades: (n, 3) float 배열 (N, P2O5, K2O) - 인덱스는 배열 행 번호
+            min_size: KD-tree를 사용할 최소 제품 수
+        """
+        self.grades = grades
+        self.use_tree = cKDTree is not None and len(grades) >= min_size
+        self._trees = {}
+        self._lock = threading.Lock()
+        # 성분별 정렬 순서 (범위 조건 검색용)
+        self._order = [np.argsort(grades[:, axis], kind="stable") for axis in range(3)]
+        self._sorted = [grades[order, axis] for axis, order in enumerate(self._order)]
+
+    def __len__(self):
+        return len(self.grades)
+
+    def nearest(self, target_n, target_p, target_k, k, metric="l1", weights=None, ranges=None):
+        """
+        목표 N/P/K에 가장 가까운 k개 제품
+
+        Args:
+            ranges: 성분별 범위 조건 {"N": (하한, 상한), ...} (None은 제한 없음)
+
+        Returns:
+            [(반올림 점수, 행 번호), ...] - score_grades + top_k 전체 탐색 결과와 동일
+        """
+        decimals = METRICS[metric][1]
+        target = (target_n, target_p, target_k)
+        if ranges:
+            rows = self.in_ranges(ranges)
+        elif self.use_tree and k < len(self.grades):
+            rows = self._tree_candidates(target, k, metric, weights, decimals)
+        else:
+            rows = None
+        return self._rank(rows, target, metric, weights, decimals, k)
+
+    def nearest_many(self, targets, k, metric="l1", weights=None):
+        """
+        여러 목표 N/P/K 각각의 최근접 k개 (목표별 nearest와 같은 결과)
+
+        트리를 쓰지 않는 크기에서는 (목표 × 제품) 점수 행렬을 한 번에 계산
+
+        Args:
+            targets: (m, 3) 목표 N/P/K 배열
+
+        Returns:
+            목표 순서대로 [(반올림 점수, 행 번호), ...] 리스트
+        """
+        targets = np.asarray(targets, dtype=np.float64).reshape(-1, 3)
+        if self.use_tree:
+            return [self.nearest(*target, k, metric, weights) for target in targets]
+        decimals = METRICS[metric][1]
+        chunk = max(1, MANY_CHUNK_CELLS // max(len(self.grades), 1))
+        results = []
+        for start in range(0, len(targets), chunk):
+            scores = score_grades_many(self.grades, targets[start:start + chunk], metric, weights)
+            results.extend(top_k(row, k, decimals) for row in scores)
+        return results
+
+    def within(self, target_n, target_p, target_k, tolerance, metric="l1", weights=None, ranges=None):
+        """
+        목표 N/P/K와의 점수가 tolerance 이하인 모든 제품 (점수 순)
+
+        Returns:
+            [(반올림 점수, 행 번호), ...]
+        """
+        decimals = METRICS[metric][1]
+        target = (target_n, target_p, target_k)
+        if ranges:
+            rows = self.in_ranges(ranges)
+        elif self.use_tree:
+            rows = self._ball(target, tolerance, metric, weights)
+        else:
+            rows = None
+        return self._rank(rows, target, metric, weights, decimals, len(self.grades), tolerance)
+
+    def in_ranges(self, ranges):
+        """
+        성분별 범위 조건을 모두 만족하는 행 번호 (오름차순)
+
+        가장 좁은 성분 범위를 정렬 배열 이분 탐색으로 먼저 자르고 나머지 조건은 후보에만 적용
+        """
+        bounds = []
+        for nutrient, (low, high) in ranges.items():
+            axis = NUTRIENT_AXES[nutrient]
+            values = self._sorted[axis]
+            start = 0 if low is None else np.searchsorted(values, low, side="left")
+            stop = len(values) if high is None else np.searchsorted(values, high, side="right")
+            bounds.append((stop - start, axis, start, stop, low, high))
+        if not bounds:
+            return np.arange(len(self.grades))
+        bounds.sort()
+        _, axis, start, stop, _, _ = bounds[0]
+        rows = self._order[axis][start:stop]
+        for _, axis, _, _, low, high in bounds[1:]:
+            values = self.grades[rows, axis]
+            mask = np.ones(len(rows), dtype=bool)
+            if low is not None:
+                mask &= values >= low
+            if high is not None:
+                mask &= values <= high
+            rows = rows[mask]
+        return np.sort(rows)
+
+    def _rank(self, rows, target, metric, weights, decimals, k, tolerance=None):
+        """후보 행(None이면 전체)에 대해 정확한 점수로 순위 계산"""
+        grades = self.grades if rows is None else self.grades[rows]
+        scores = score_grades(grades, *target, metric, weights)
+        if tolerance is not None:
+            keep = np.flatnonzero(scores <= tolerance)
+            ranked = sorted((round(float(scores[i]), decimals), int(i)) for i in keep)
+        else:
+            ranked = top_k(scores, k, decimals)
+        if rows is None:
+            return ranked
+        return [(score, int(rows[i])) for score, i in ranked]
+
+    def _tree(self, metric, weights):
+        """(지표, 가중치)별 KD-tree를 지연 생성 (점수 공간이 트리 거리와 단조 관계가 되도록 좌표 변환)"""
+        w = np.ones(3) if weights is None else np.asarray(weights, dtype=np.float64)
+        key = (metric, tuple(w.tolist()))
+        entry = self._trees.get(key)
+        if entry is not None:
+            return entry
+        with self._lock:
+            entry = self._trees.get(key)
+            if entry is None:
+                # l1: Σ w·|d| = ‖w·d‖₁, l2: √Σ w·d² = ‖√w·d‖₂
+                scale = w if metric == "l1" else np.sqrt(w)
+                points = self.grades * scale
+                rows = np.arange(len(points))
+                extra = np.empty(0, dtype=np.intp)
+                if metric == "cosine":
+                    norms = np.linalg.norm(points, axis=1)
+                    nonzero = norms > 0
+                    # 영벡터는 코사인 점수가 항상 1 (최댓값)이므로 트리 밖에 두고 후보에 항상 포함
+                    extra = np.flatnonzero(~nonzero)
+                    rows = np.flatnonzero(nonzero)
+                    points = points[nonzero] / norms[nonzero, None]
+                entry = (cKDTree(points), scale, rows, extra)
+                self._trees[key] = entry
+        return entry
+
+    def _to_tree_space(self, metric, scale, target):
+        point = np.asarray(target, dtype=np.float64) * scale
+        if metric == "cosine":
+            norm = np.linalg.norm(point)
+            if norm == 0:
+                return None
+            point = point / norm
+        return point
+
+    def _tree_candidates(self, target, k, metric, weights, decimals):
+        """k번째 이웃 점수 + 반올림 여유 이내의 후보 행 (반올림 동점으로 순위가 바뀔 수 있는 행 포함)"""
+        tree, scale, tree_rows, extra = self._tree(metric, weights)
+        point = self._to_tree_space(metric, scale, target)
+        if point is None or k >= len(tree_rows):
+            return None
+        p = 1 if metric == "l1" else 2
+        distances, _ = tree.query(point, k=k, p=p)
+        kth_distance = float(np.atleast_1d(distances)[-1])
+        kth_score = kth_distance ** 2 / 2 if metric == "cosine" else kth_distance
+        return self._ball(target, kth_score + 10.0 ** -decimals, metric, weights)
+
+    def _ball(self, target, max_score, metric, weights):
+        """점수가 max_score 이하일 수 있는 후보 행 (오름차순)"""
+        tree, scale, tree_rows, extra = self._tree(metric, weights)
+        point = self._to_tree_space(metric, scale, target)
+        if point is None:
+            return None
+        if metric == "l1":
+            hits = tree.query_ball_point(point, max_score + _EPS, p=1)
+        elif metric == "l2":
+            hits = tree.query_ball_point(point, max_score + _EPS, p=2)
+        else:
+            hits = tree.query_ball_point(point, np.sqrt(2 * max(max_score, 0)) + _EPS, p=2)
+        rows = tree_rows[np.asarray(hits, dtype=np.intp)]
+        return np.sort(np.concatenate((rows, extra)))
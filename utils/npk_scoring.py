@@ -0,0 +1,105 @@
+"""
+NPK 성분 점수 계산
+카탈로그 성분표(n×3 배열: N, P2O5, K2O)와 목표 필요량의 거리를 벡터 연산으로 계산하고 상위 k개 선택
+"""
+import numpy as np
+
+
+def l1_scores(grades, target, weights):
+    """가중 맨해튼 거리: Σ w·|성분 - 목표|"""
+    return (weights[0] * np.abs(grades[..., 0] - target[..., 0])
+            + weights[1] * np.abs(grades[..., 1] - target[..., 1])
+            + weights[2] * np.abs(grades[..., 2] - target[..., 2]))
+
+
+def l2_scores(grades, target, weights):
+    """가중 유클리드 거리: √Σ w·(성분 - 목표)²"""
+    d0 = grades[..., 0] - target[..., 0]
+    d1 = grades[..., 1] - target[..., 1]
+    d2 = grades[..., 2] - target[..., 2]
+    return np.sqrt(weights[0] * d0 * d0 + weights[1] * d1 * d1 + weights[2] * d2 * d2)
+
+
+def cosine_scores(grades, target, weights):
+    """NPK 비율 코사인 거리: 1 - cos(성분, 목표) (함량 크기와 무관하게 비율만 비교)"""
+    dot = (weights[0] * grades[..., 0] * target[..., 0]
+           + weights[1] * grades[..., 1] * target[..., 1]
+           + weights[2] * grades[..., 2] * target[..., 2])
+    g_norm = np.sqrt(weights[0] * grades[..., 0] ** 2 + weights[1] * grades[..., 1] ** 2
+                     + weights[2] * grades[..., 2] ** 2)
+    t_norm = np.sqrt(weights[0] * target[..., 0] ** 2 + weights[1] * target[..., 1] ** 2
+                     + weights[2] * target[..., 2] ** 2)
+    norms = g_norm * t_norm
+    with np.errstate(invalid="ignore", divide="ignore"):
+        cos = np.where(norms > 0, dot / norms, 0.0)
+    return 1.0 - cos
+
+
+# 지표 이름 → (점수 함수, 추천점수 반올림 자릿수)
+METRICS = {
+    "l1": (l1_scores, 1),
+    "l2": (l2_scores, 1),
+    "cosine": (cosine_scores, 4),
+}
+
+
+def score_grades(grades, target_n, target_p, target_k, metric="l1", weights=None):
+    """
+    성분표 전체에 대한 점수 계산 (낮을수록 목표에 가까움)
+
+    Args:
+        grades: (n, 3) float 배열 (N, P2O5, K2O)
+        target_n, target_p, target_k: 목표 필요량
+        metric: "l1" | "l2" | "cosine"
+        weights: N, P, K 가중치 (기본 1, 1, 1)
+
+    Returns:
+        (n,) 점수 배열
+    """
+    target = np.array((target_n, target_p, target_k), dtype=np.float64)
+    return _score(grades, target, metric, weights)
+
+
+def score_grades_many(grades, targets, metric="l1", weights=None):
+    """
+    여러 목표 필요량에 대한 점수를 한 번에 계산
+
+    Args:
+        grades: (n, 3) 성분 배열
+        targets: (m, 3) 목표 N/P/K 배열
+
+    Returns:
+        (m, n) 점수 배열 - 각 행은 score_grades(grades, *targets[i])와 같음
+    """
+    targets = np.asarray(targets, dtype=np.float64).reshape(-1, 1, 3)
+    return _score(grades, targets, metric, weights)
+
+
+def _score(grades, target, metric, weights):
+    if metric not in METRICS:
+        raise ValueError(f"지원하지 않는 점수 지표입니다: {metric}")
+    score_fn, _ = METRICS[metric]
+    w = np.ones(3) if weights is None else np.asarray(weights, dtype=np.float64)
+    return score_fn(grades, target, w)
+
+
+def top_k(scores, k, decimals=1):
+    """
+    반올림 점수 기준 상위 k개 인덱스 반환 (동점은 인덱스 순)
+
+    argpartition으로 k번째 점수를 찾고, 반올림으로 순위가 바뀔 수 있는 후보만
+    남겨 정확히 정렬한다. 결과는 전체 정렬 후 자른 것과 동일하다.
+
+    Returns:
+        [(반올림 점수, 인덱스), ...] (길이 ≤ k)
+    """
+    n = len(scores)
+    if n == 0 or k <= 0:
+        return []
+    if n <= k:
+        candidates = range(n)
+    else:
+        kth = scores[np.argpartition(scores, k - 1)[k - 1]]
+        candidates = np.flatnonzero(scores <= kth + 10.0 ** -decimals).tolist()
+    ranked = sorted((round(float(scores[i]), decimals), i) for i in candidates)
+    return ranked[:k]
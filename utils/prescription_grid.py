@@ -0,0 +1,289 @@
+"""
+오프라인 처방 격자 (로컬 처방 모델)
+처방 API 결과는 작물 코드와 토양 7개 항목의 결정적 함수이므로, 작물별로 토양 격자점을 미리 조회해
+압축 배열 파일(.npz)로 저장해 두고 요청 시 표 조회 또는 다중 선형 보간으로 응답
+격자 밖 조건만 실시간 API로 조회
+
+격자 생성: python -m utils.prescription_grid --crops 01001,01005 --out data/prescription_grid.npz [--axis acid=5.5,6.5,7.5]
+(처방 API는 호출량 제한이 있으므로 작물을 명시하고, 예상 호출 수가 --max-calls를 넘으면 시작하지 않음)
+"""
+import argparse
+import itertools
+import os
+import tempfile
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+
+from utils.fertilizer_records import Prescription
+
+DATA_DIR = os.path.join(os.path.dirname(__file__), '..', 'data')
+DEFAULT_GRID_FILE = os.path.join(DATA_DIR, 'prescription_grid.npz')
+
+# 격자 축 (처방 API 토양 파라미터, 순서 고정)
+GRID_PARAMS = ('acid', 'om', 'vldpha', 'posifert_K', 'posifert_Ca', 'posifert_Mg', 'selc')
+
+# 격자에 저장하는 처방 수치 (Prescription 속성, 순서 고정)
+VALUE_FIELDS = (
+    'pre_n', 'pre_p', 'pre_k', 'post_n', 'post_p', 'post_k',
+    'compost_cattle', 'compost_pig', 'compost_chicken', 'compost_mixed'
+)
+
+# 기본 격자점 (pH, 유기물, 유효인산, 치환성 K/Ca/Mg, EC) - 실제 토양 분포에 맞게 --axis로 조정
+DEFAULT_AXES = {
+    'acid': (5.0, 5.5, 6.0, 6.5, 7.0, 7.5),
+    'om': (10, 20, 30, 40),
+    'vldpha': (10, 100, 300),
+    'posifert_K': (0.2, 1, 4),
+    'posifert_Ca': (2, 6, 10),
+    'posifert_Mg': (1, 5, 13),
+    'selc': (0.5, 2, 6)
+}
+
+# 격자 생성 1회 최대 API 호출 수 (기본 격자 1개 작물 5,832회)
+DEFAULT_MAX_CALLS = 10000
+
+# 보간 결과 반올림 자릿수 (API 응답 수치 정밀도에 맞춤)
+INTERPOLATE_DECIMALS = 2
+
+
+class PrescriptionGrid:
+    """작물 × 토양 격자 처방 표"""
+
+    def __init__(self, crop_codes, crop_names, axes, values):
+        """
+        Args:
+            crop_codes: 작물 코드 배열 (C,)
+            crop_names: 작물명 배열 (C,) - API 응답의 crop_Nm
+            axes: GRID_PARAMS 순서의 축별 오름차순 격자점 배열
+            values: (C, 축1 길이, ..., 축7 길이, len(VALUE_FIELDS)) 처방 수치 (조회 실패 격자점은 NaN)
+        """
+        self.crop_codes = np.asarray(crop_codes)
+        self.crop_names = np.asarray(crop_names)
+        self.axes = [np.asarray(axis, dtype=np.float64) for axis in axes]
+        self.values = values
+        self._crop_index = {str(code): i for i, code in enumerate(self.crop_codes)}
+
+    def __contains__(self, crop_code):
+        return crop_code in self._crop_index
+
+    def lookup(self, params, interpolate=False):
+        """
+        처방 API 파라미터로 격자 처방 조회
+
+        Args:
+            params: _build_api_params 결과 (crop_Code + 토양 7개 항목)
+            interpolate: 격자점 사이 값이면 다중 선형 보간 (False면 격자점과 정확히 일치할 때만)
+
+        Returns:
+            Prescription 또는 None (격자에 없는 작물, 격자 범위 밖, 보간 불가, 주변 격자점 조회 실패)
+        """
+        return self._lookup(params, interpolate)[0]
+
+    def _lookup(self, params, interpolate):
+        """(Prescription 또는 None, 보간 여부)"""
+        crop = self._crop_index.get(str(params.get('crop_Code')))
+        if crop is None:
+            return None, False
+        index = [crop]
+        weights = []
+        for name, axis in zip(GRID_PARAMS, self.axes):
+            try:
+                value = float(params[name])
+            except (KeyError, TypeError, ValueError):
+                return None, False
+            pos = int(np.searchsorted(axis, value))
+            if pos < len(axis) and axis[pos] == value:
+                index.append(slice(pos, pos + 1))
+                weights.append(None)
+            elif 0 < pos < len(axis) and interpolate:
+                index.append(slice(pos - 1, pos + 1))
+                weights.append((value - axis[pos - 1]) / (axis[pos] - axis[pos - 1]))
+            else:
+                return None, False
+
+        block = self.values[tuple(index)]
+        if np.isnan(block).any():
+            return None, False
+        # 축마다 앞쪽 차원을 하나씩 줄여 가며 보간 (격자점과 일치하는 축은 그대로 선택)
+        for t in weights:
+            block = block[0] if t is None else block[0] * (1 - t) + block[1] * t
+        interpolated = any(t is not None for t in weights)
+        if interpolated:
+            block = np.round(block, INTERPOLATE_DECIMALS)
+        record = Prescription(True, '200', 'OK', str(self.crop_codes[crop]), str(self.crop_names[crop]),
+                              *(float(v) for v in block))
+        return record, interpolated
+
+    def save(self, path):
+        """압축 배열 파일로 원자적 저장"""
+        fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(os.path.abspath(path)), suffix=".tmp")
+        try:
+            with os.fdopen(fd, "wb") as f:
+                np.savez_compressed(
+                    f,
+                    crop_codes=self.crop_codes,
+                    crop_names=self.crop_names,
+                    values=self.values,
+                    **{f"axis_{name}": axis for name, axis in zip(GRID_PARAMS, self.axes)}
+                )
+            os.replace(tmp_path, path)
+        except BaseException:
+            os.unlink(tmp_path)
+            raise
+
+    @classmethod
+    def load(cls, path):
+        with np.load(path, allow_pickle=False) as data:
+            return cls(
+                data["crop_codes"],
+                data["crop_names"],
+                [data[f"axis_{name}"] for name in GRID_PARAMS],
+                data["values"]
+            )
+
+
+class PrescriptionGridStore:
+    """격자 파일 지연 로드 + 조회 통계 (파일이 없으면 격자 없이 동작)"""
+
+    def __init__(self, path=None):
+        self._path = path
+        self._grid = None
+        self._loaded = False
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.interpolated = 0
+        self.misses = 0
+
+    @property
+    def path(self):
+        return self._path or os.getenv('PRESCRIPTION_GRID_PATH', DEFAULT_GRID_FILE)
+
+    def get(self):
+        """PrescriptionGrid 또는 None"""
+        if not self._loaded:
+            with self._lock:
+                if not self._loaded:
+                    try:
+                        self._grid = PrescriptionGrid.load(self.path)
+                    except (OSError, KeyError, ValueError) as e:
+                        print(f"⚠️ 처방 격자 파일 로드 실패 (실시간 API 사용): {e}")
+                    self._loaded = True
+        return self._grid
+
+    def lookup(self, params, interpolate=False):
+        """격자 처방 조회 (격자가 없거나 격자 밖이면 None)"""
+        grid = self.get()
+        if grid is None:
+            self._count("misses")
+            return None
+        record, interpolated = grid._lookup(params, interpolate)
+        if record is None:
+            self._count("misses")
+        elif interpolated:
+            self._count("interpolated")
+        else:
+            self._count("hits")
+        return record
+
+    def _count(self, name):
+        # 요청 스레드들이 동시에 갱신하므로 잠금 안에서 증가 (+=는 원자적이지 않아 집계가 누락됨)
+        with self._lock:
+            setattr(self, name, getattr(self, name) + 1)
+
+    def stats(self):
+        grid = self._grid
+        with self._lock:
+            hits, interpolated, misses = self.hits, self.interpolated, self.misses
+        return {
+            "loaded": grid is not None,
+            "crops": len(grid.crop_codes) if grid is not None else 0,
+            "hits": hits,
+            "interpolated": interpolated,
+            "misses": misses
+        }
+
+
+# 전역 격자 저장소 (SoilFertilizerService 공유)
+prescription_grid = PrescriptionGridStore()
+
+
+def build_grid(fetch, crop_codes, axes=None, workers=4, progress=print):
+    """
+    처방 API를 격자점마다 조회해 PrescriptionGrid 생성
+
+    Args:
+        fetch: 처방 API 파라미터 dict → Prescription (실패 시 예외 또는 success=False)
+        crop_codes: 작물 코드 목록
+        axes: {토양 파라미터: 격자점 목록} (기본 DEFAULT_AXES)
+        workers: 동시 API 호출 수
+    """
+    axes = {**DEFAULT_AXES, **(axes or {})}
+    axis_values = [sorted(float(v) for v in axes[name]) for name in GRID_PARAMS]
+    shape = tuple(len(axis) for axis in axis_values)
+    points = list(itertools.product(*axis_values))
+    values = np.full((len(crop_codes),) + shape + (len(VALUE_FIELDS),), np.nan)
+    crop_names = [''] * len(crop_codes)
+
+    def _fetch(params):
+        try:
+            record = fetch(params)
+        except Exception:
+            return None
+        return record if record.success else None
+
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        for c, crop_code in enumerate(crop_codes):
+            params_list = [{'crop_Code': crop_code, **dict(zip(GRID_PARAMS, point))} for point in points]
+            failed = 0
+            for flat, record in enumerate(executor.map(_fetch, params_list)):
+                if record is None:
+                    failed += 1
+                    continue
+                crop_names[c] = crop_names[c] or record.crop_name
+                values[(c,) + np.unravel_index(flat, shape)] = [getattr(record, f) for f in VALUE_FIELDS]
+            progress(f"[{c + 1}/{len(crop_codes)}] {crop_code} {crop_names[c]}: "
+                     f"{len(points) - failed}/{len(points)} 격자점")
+    return PrescriptionGrid(np.array(crop_codes), np.array(crop_names), axis_values, values)
+
+
+def _parse_axis(text):
+    name, _, values = text.partition('=')
+    if name not in GRID_PARAMS or not values:
+        raise argparse.ArgumentTypeError(f"축 형식: 이름=값1,값2,... (이름: {', '.join(GRID_PARAMS)})")
+    return name, [float(v) for v in values.split(',')]
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="처방 API 격자 조회 결과로 오프라인 처방 격자 생성")
+    parser.add_argument('--out', default=DEFAULT_GRID_FILE, help="저장 경로 (.npz)")
+    parser.add_argument('--crops', required=True, help="작물 코드 목록 (쉼표 구분, 예: 01001,01005)")
+    parser.add_argument('--axis', action='append', type=_parse_axis, default=[], help="격자점 지정: 이름=값1,값2,...")
+    parser.add_argument('--workers', type=int, default=4, help="동시 API 호출 수")
+    parser.add_argument('--max-calls', type=int, default=DEFAULT_MAX_CALLS,
+                        help=f"예상 API 호출 수 상한 (기본 {DEFAULT_MAX_CALLS}, 넘으면 시작하지 않음)")
+    parser.add_argument('--dry-run', action='store_true', help="예상 API 호출 수만 출력")
+    args = parser.parse_args(argv)
+
+    crop_codes = list(dict.fromkeys(code.strip() for code in args.crops.split(',') if code.strip()))
+    if not crop_codes:
+        parser.error("--crops에 작물 코드를 1개 이상 지정해야 합니다.")
+    axes = dict(args.axis)
+    per_crop = int(np.prod([len(axes.get(name, DEFAULT_AXES[name])) for name in GRID_PARAMS]))
+    calls = len(crop_codes) * per_crop
+    print(f"작물 {len(crop_codes)}개 × 격자점 {per_crop}개 = API 호출 {calls}회")
+    if args.dry_run:
+        return
+    if calls > args.max_calls:
+        parser.error(f"예상 API 호출 수 {calls}회가 --max-calls {args.max_calls}회를 넘습니다 "
+                     f"(--axis로 격자점을 줄이거나 --max-calls를 늘리세요).")
+
+    from services.soil_fertilizer_service import SoilFertilizerService
+    service = SoilFertilizerService()
+    grid = build_grid(service.request_prescription_live, crop_codes, axes, args.workers)
+    grid.save(args.out)
+    print(f"저장 완료: {args.out}")
+
+if __name__ == "__main__":
+    main()
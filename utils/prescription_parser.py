@@ -0,0 +1,96 @@
+"""
+비료 처방 API XML 응답 파서
+XML 전체를 dict로 변환하지 않고 pull 파서로 한 번만 훑으면서 사용하는 필드만 추출
+'response', 'OpenAPI_ServiceResponse' 두 가지 응답 형태를 모두 처리하며 오류는 예외 대신 결과로 반환
+"""
+import xml.etree.ElementTree as ET
+
+from utils.fertilizer_records import PRESCRIPTION_FIELDS, Prescription
+
+# 헤더에서 읽는 필드 (response: result_Code/resultCode, OpenAPI: errMsg/returnAuthMsg/returnReasonCode)
+HEADER_FIELDS = (
+    'result_Code', 'resultCode', 'result_Msg', 'resultMsg',
+    'errMsg', 'returnAuthMsg', 'returnReasonCode'
+)
+
+_HEADER_TAGS = ('header', 'cmmMsgHeader')
+_ENVELOPES = ('response', 'OpenAPI_ServiceResponse')
+
+# 한 번에 파서에 넣는 크기 (첫 item을 다 읽으면 나머지는 파싱하지 않음)
+_CHUNK_SIZE = 4096
+
+
+def parse_prescription_xml(xml_content):
+    """
+    처방 API XML 응답을 Prescription 레코드로 변환
+
+    Args:
+        xml_content: XML 문자열 또는 bytes
+
+    Returns:
+        정상: success=True, 처방 필드 12개 (수치는 float)
+        오류: success=False (result_code, result_msg에 오류 내용)
+    """
+    if not xml_content:
+        return Prescription.error('', '빈 응답')
+
+    parser = ET.XMLPullParser(events=('start', 'end'))
+    root = None
+    header = {}
+    item = {}
+    depth = 0
+    header_depth = None
+    item_depth = None
+    item_done = False
+    try:
+        for start in range(0, len(xml_content), _CHUNK_SIZE):
+            parser.feed(xml_content[start:start + _CHUNK_SIZE])
+            for event, elem in parser.read_events():
+                tag = elem.tag
+                if event == 'start':
+                    depth += 1
+                    if root is None:
+                        root = tag
+                        if root not in _ENVELOPES:
+                            return Prescription.error('', f'알 수 없는 응답 형식: {root}')
+                    elif tag in _HEADER_TAGS and header_depth is None:
+                        header_depth = depth
+                    elif tag == 'item' and item_depth is None and header_depth is None:
+                        item_depth = depth
+                    continue
+
+                if header_depth is not None:
+                    if tag in HEADER_FIELDS:
+                        header[tag] = (elem.text or '').strip()
+                    elif depth == header_depth:
+                        header_depth = None
+                elif tag in PRESCRIPTION_FIELDS and tag not in item:
+                    # item 요소 없이 items 바로 아래에 필드가 오는 응답도 처리
+                    item[tag] = (elem.text or '').strip()
+                elif depth == item_depth:
+                    item_done = True
+                depth -= 1
+                elem.clear()
+                if item_done:
+                    break
+            if item_done:
+                break
+        if not item_done:
+            parser.close()
+    except ET.ParseError as e:
+        return Prescription.error('', f'XML 파싱 오류: {e}')
+
+    if root == 'response':
+        result_code = header.get('result_Code') or header.get('resultCode')
+        result_msg = header.get('result_Msg') or header.get('resultMsg') or ''
+        if result_code != '200':
+            return Prescription.error(result_code, result_msg or '처방 API 오류')
+    else:
+        error_msg = header.get('errMsg', '')
+        if error_msg == 'SERVICE ERROR':
+            return Prescription.error(header.get('returnReasonCode', ''),
+                                      header.get('returnAuthMsg') or error_msg)
+
+    if not item:
+        return Prescription.error('', '처방 항목 없음')
+    return Prescription.from_api_fields(item)
@@ -0,0 +1,54 @@
+"""
+프로세스 간 단일 실행 잠금 (파일 잠금)
+같은 노드의 gunicorn 워커 여러 개 중 잠금을 잡은 한 프로세스만 작업(예: 백그라운드 갱신 스케줄러)을 실행
+잠금은 프로세스가 살아 있는 동안 유지되고, 프로세스가 종료되면 운영체제가 해제하므로 다른 워커가 이어받을 수 있음
+"""
+import os
+import threading
+
+try:
+    import fcntl
+except ImportError:  # Windows 개발 환경: 파일 잠금 없이 단일 프로세스로 간주
+    fcntl = None
+
+
+class ProcessLock:
+    """비차단 배타 파일 잠금 (fork 이전에 잡은 잠금은 자식 프로세스의 것으로 보지 않음)"""
+
+    def __init__(self, path: str):
+        self.path = path
+        self._file = None
+        self._pid = None
+        self._lock = threading.Lock()
+
+    @property
+    def held(self) -> bool:
+        return self._pid == os.getpid()
+
+    def acquire(self) -> bool:
+        """
+        잠금 시도 (기다리지 않음)
+
+        Returns:
+            현재 프로세스가 잠금을 보유하면 True, 다른 프로세스가 보유 중이면 False
+        """
+        with self._lock:
+            if self.held:
+                return True
+            if fcntl is None:
+                self._pid = os.getpid()
+                return True
+            lock_file = open(self.path, "a+")
+            try:
+                fcntl.flock(lock_file.fileno(), fcntl.LOCK_EX | fcntl.LOCK_NB)
+            except OSError:
+                lock_file.close()
+                return False
+            # 진단용으로 보유 프로세스 ID 기록
+            lock_file.seek(0)
+            lock_file.truncate()
+            lock_file.write(str(os.getpid()))
+            lock_file.flush()
+            self._file = lock_file
+            self._pid = os.getpid()
+            return True
@@ -0,0 +1,124 @@
+"""
+백그라운드 갱신 작업자 (stale-while-revalidate)
+스케줄러 스레드가 주기적으로 갱신 시점이 된 키를 찾아 제한된 스레드 풀에서 갱신
+읽기 경로는 만료된 항목의 갱신을 요청만 하고 현재 데이터를 바로 반환
+"""
+import random
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+
+class RefreshWorker:
+    """
+    주기 스캔 + 비동기 갱신 요청
+
+    같은 키는 대기/실행 중 한 번만 갱신하고, 동시 갱신 수는 스레드 풀 크기로 제한한다.
+    """
+
+    def __init__(self, scan, refresh, interval: float = 30, workers: int = 2, name: str = "refresh"):
+        """
+        Args:
+            scan: () → 갱신 시점이 된 키 목록
+            refresh: 키 → 갱신 실행 (예외는 실패로 집계)
+            interval: 스캔 주기 (초, 매 주기 ±10% 지터)
+            workers: 최대 동시 갱신 수
+            name: 스레드 이름 접두사
+        """
+        self._scan = scan
+        self._refresh = refresh
+        self.interval = interval
+        self.name = name
+        self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix=name)
+        self._pending = set()
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread = None
+        self.scans = 0
+        self.requested = 0
+        self.refreshed = 0
+        self.failed = 0
+
+    @property
+    def running(self) -> bool:
+        thread = self._thread
+        return thread is not None and thread.is_alive()
+
+    def start(self) -> bool:
+        """스케줄러 스레드 시작 (이미 실행 중이면 False)"""
+        with self._lock:
+            if self.running:
+                return False
+            self._stop.clear()
+            self._thread = threading.Thread(target=self._run, name=f"{self.name}-scheduler", daemon=True)
+            self._thread.start()
+            return True
+
+    def stop(self, timeout: float = None):
+        """스케줄러 스레드 중지 (실행 중인 갱신은 끝까지 실행)"""
+        self._stop.set()
+        thread = self._thread
+        if thread is not None:
+            thread.join(timeout)
+
+    def request(self, key) -> bool:
+        """
+        키 갱신 요청 (바로 반환)
+
+        Returns:
+            새로 요청했으면 True, 이미 대기/실행 중이면 False
+        """
+        with self._lock:
+            if key in self._pending:
+                return False
+            self._pending.add(key)
+            self.requested += 1
+        try:
+            self._executor.submit(self._run_refresh, key)
+        except RuntimeError:
+            # 인터프리터 종료 중 (스레드 풀 종료)
+            with self._lock:
+                self._pending.discard(key)
+            return False
+        return True
+
+    def scan_once(self) -> int:
+        """갱신 시점이 된 키를 찾아 갱신 요청 → 새로 요청한 키 수"""
+        try:
+            keys = list(self._scan())
+        except Exception as e:
+            print(f"⚠️ 백그라운드 갱신 대상 조회 실패 ({self.name}): {e}")
+            return 0
+        with self._lock:
+            self.scans += 1
+        return sum(self.request(key) for key in keys)
+
+    def _run(self):
+        # 시작 직후 한 번 스캔하고, 이후 지터를 준 주기로 반복 (여러 워커 프로세스의 스캔 시점 분산)
+        while True:
+            self.scan_once()
+            if self._stop.wait(self.interval * random.uniform(0.9, 1.1)):
+                return
+
+    def _run_refresh(self, key):
+        try:
+            self._refresh(key)
+        except Exception as e:
+            print(f"⚠️ 백그라운드 갱신 실패 ({self.name}, {key}): {e}")
+            outcome = "failed"
+        else:
+            outcome = "refreshed"
+        with self._lock:
+            self._pending.discard(key)
+            setattr(self, outcome, getattr(self, outcome) + 1)
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "running": self.running,
+                "interval": self.interval,
+                "pending": len(self._pending),
+                "scans": self.scans,
+                "requested": self.requested,
+                "refreshed": self.refreshed,
+                "failed": self.failed
+            }
@@ -0,0 +1,75 @@
+"""
+동일 키 동시 요청 병합 (singleflight)
+같은 키로 진행 중인 호출이 있으면 새로 호출하지 않고 그 결과를 함께 기다림
+"""
+import threading
+
+
+class _Call:
+    """진행 중인 호출 1건"""
+    __slots__ = ("event", "result", "error", "waiters")
+
+    def __init__(self):
+        self.event = threading.Event()
+        self.result = None
+        self.error = None
+        self.waiters = 0
+
+
+class SingleFlight:
+    """키별로 동시에 하나의 호출만 실행하고 나머지 호출자는 결과를 공유"""
+
+    def __init__(self):
+        self._calls = {}
+        self._lock = threading.Lock()
+        self.executions = 0
+        self.merged = 0
+
+    def do(self, key, fn):
+        """
+        key에 대해 fn()을 실행 (이미 실행 중이면 그 결과를 기다려 반환)
+
+        Args:
+            key: 병합 기준 키 (hashable)
+            fn: 인자 없는 호출 함수
+
+        Returns:
+            fn()의 반환값 (fn이 예외를 던지면 모든 대기자에게 같은 예외 전달)
+        """
+        with self._lock:
+            call = self._calls.get(key)
+            if call is not None:
+                call.waiters += 1
+                self.merged += 1
+                leader = False
+            else:
+                call = _Call()
+                self._calls[key] = call
+                self.executions += 1
+                leader = True
+
+        if not leader:
+            call.event.wait()
+            if call.error is not None:
+                raise call.error
+            return call.result
+
+        try:
+            call.result = fn()
+            return call.result
+        except BaseException as e:
+            call.error = e
+            raise
+        finally:
+            with self._lock:
+                del self._calls[key]
+            call.event.set()
+
+    def stats(self) -> dict:
+        """병합 통계 반환"""
+        with self._lock:
+            return {
+                "in_flight": len(self._calls),
+                "executions": self.executions,
+                "merged": self.merged
+            }
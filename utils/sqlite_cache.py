@@ -0,0 +1,193 @@
+"""
+SQLite(WAL) 기반 프로세스 간 공유 캐시
+gunicorn 워커 여러 개가 같은 노드의 캐시 파일 하나를 함께 사용 (외부 캐시 서버 불필요)
+TTLCache와 같은 인터페이스(get/set/delete/clear/stats)를 제공하며 SHARED_CACHE_PATH 설정 시 사용
+"""
+import os
+import pickle
+import sqlite3
+import threading
+import time
+
+from utils.ttl_cache import TTLCache
+
+# 조회 시각(LRU 순서) 갱신 최소 간격 (초) - 읽기마다 쓰기가 발생하지 않도록 제한
+TOUCH_INTERVAL = 30
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS cache (
+    namespace TEXT NOT NULL,
+    key TEXT NOT NULL,
+    value BLOB NOT NULL,
+    expires_at REAL NOT NULL,
+    accessed_at REAL NOT NULL,
+    PRIMARY KEY (namespace, key)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS cache_lru ON cache (namespace, accessed_at);
+"""
+
+
+class SQLiteCache:
+    """
+    만료 시간(TTL)과 최대 크기(LRU 제거)를 가지는 SQLite 공유 캐시
+
+    값은 pickle로 저장하므로 애플리케이션만 쓰는 로컬 파일에 사용한다.
+    만료 시각은 프로세스 간에 공유되므로 벽시계 시간(time.time) 기준이다.
+    """
+
+    def __init__(self, path: str, namespace: str, maxsize: int = 1024, ttl: float = 3600):
+        """
+        Args:
+            path: SQLite 파일 경로 (같은 파일을 쓰는 프로세스끼리 공유)
+            namespace: 캐시 구분 이름 (예: "prescription", "weather")
+            maxsize: 네임스페이스별 최대 보관 항목 수
+            ttl: 항목 유효 시간 (초)
+        """
+        self.path = path
+        self.namespace = namespace
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+
+    def _conn(self):
+        """스레드별 연결 (fork 이후 자식 프로세스에서는 새로 연결)"""
+        conn = getattr(self._local, "conn", None)
+        if conn is None or self._local.pid != os.getpid():
+            conn = sqlite3.connect(self.path, timeout=5, isolation_level=None, check_same_thread=False)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.executescript(_SCHEMA)
+            self._local.conn = conn
+            self._local.pid = os.getpid()
+        return conn
+
+    def _count(self, name, n=1):
+        with self._lock:
+            setattr(self, name, getattr(self, name) + n)
+
+    def get(self, key, default=None):
+        """캐시 조회 (만료된 항목은 제거 후 miss 처리)"""
+        now = time.time()
+        db_key = repr(key)
+        try:
+            conn = self._conn()
+            row = conn.execute(
+                "SELECT value, expires_at, accessed_at FROM cache WHERE namespace = ? AND key = ?",
+                (self.namespace, db_key)
+            ).fetchone()
+            if row is None:
+                self._count("misses")
+                return default
+            value, expires_at, accessed_at = row
+            if expires_at <= now:
+                conn.execute("DELETE FROM cache WHERE namespace = ? AND key = ? AND expires_at <= ?",
+                             (self.namespace, db_key, now))
+                self._count("expirations")
+                self._count("misses")
+                return default
+            if now - accessed_at > TOUCH_INTERVAL:
+                conn.execute("UPDATE cache SET accessed_at = ? WHERE namespace = ? AND key = ?",
+                             (now, self.namespace, db_key))
+            result = pickle.loads(value)
+        except (sqlite3.Error, pickle.UnpicklingError, EOFError) as e:
+            print(f"⚠️ 공유 캐시 조회 실패 ({self.namespace}): {e}")
+            self._count("misses")
+            return default
+        self._count("hits")
+        return result
+
+    def set(self, key, value, ttl: float = None):
+        """캐시 저장 (저장과 LRU 제거를 한 트랜잭션으로 원자적으로 처리)"""
+        now = time.time()
+        expires_at = now + (self.ttl if ttl is None else ttl)
+        blob = pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL)
+        try:
+            conn = self._conn()
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                conn.execute(
+                    "INSERT OR REPLACE INTO cache (namespace, key, value, expires_at, accessed_at) "
+                    "VALUES (?, ?, ?, ?, ?)",
+                    (self.namespace, repr(key), blob, expires_at, now)
+                )
+                overflow = conn.execute(
+                    "SELECT COUNT(*) FROM cache WHERE namespace = ?", (self.namespace,)
+                ).fetchone()[0] - self.maxsize
+                if overflow > 0:
+                    # 만료 항목을 먼저 지우고, 그래도 넘치면 가장 오래 조회하지 않은 항목 제거
+                    expired = conn.execute("DELETE FROM cache WHERE namespace = ? AND expires_at <= ?",
+                                           (self.namespace, now)).rowcount
+                    overflow -= expired
+                    if overflow > 0:
+                        conn.execute(
+                            "DELETE FROM cache WHERE namespace = ? AND key IN ("
+                            "SELECT key FROM cache WHERE namespace = ? ORDER BY accessed_at LIMIT ?)",
+                            (self.namespace, self.namespace, overflow)
+                        )
+                        self._count("evictions", overflow)
+                    self._count("expirations", expired)
+                conn.execute("COMMIT")
+            except BaseException:
+                conn.execute("ROLLBACK")
+                raise
+        except sqlite3.Error as e:
+            print(f"⚠️ 공유 캐시 저장 실패 ({self.namespace}): {e}")
+
+    def delete(self, key):
+        """항목 제거"""
+        try:
+            self._conn().execute("DELETE FROM cache WHERE namespace = ? AND key = ?",
+                                 (self.namespace, repr(key)))
+        except sqlite3.Error as e:
+            print(f"⚠️ 공유 캐시 삭제 실패 ({self.namespace}): {e}")
+
+    def clear(self):
+        """네임스페이스 전체 항목 및 통계 초기화"""
+        try:
+            self._conn().execute("DELETE FROM cache WHERE namespace = ?", (self.namespace,))
+        except sqlite3.Error as e:
+            print(f"⚠️ 공유 캐시 초기화 실패 ({self.namespace}): {e}")
+        with self._lock:
+            self.hits = self.misses = self.evictions = self.expirations = 0
+
+    def __len__(self):
+        try:
+            return self._conn().execute(
+                "SELECT COUNT(*) FROM cache WHERE namespace = ?", (self.namespace,)
+            ).fetchone()[0]
+        except sqlite3.Error:
+            return 0
+
+    def stats(self) -> dict:
+        """캐시 적중/실패 통계 반환 (적중/실패는 현재 프로세스 기준, size는 공유 파일 기준)"""
+        size = len(self)
+        with self._lock:
+            total = self.hits + self.misses
+            return {
+                "backend": "sqlite",
+                "size": size,
+                "maxsize": self.maxsize,
+                "ttl": self.ttl,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "expirations": self.expirations,
+                "hit_rate": round(self.hits / total, 4) if total else 0.0
+            }
+
+
+def create_cache(namespace: str, maxsize: int, ttl: float):
+    """
+    외부 API 응답 캐시 생성
+
+    SHARED_CACHE_PATH가 설정되어 있으면 프로세스 간 공유 SQLite 캐시, 아니면 프로세스 내 TTLCache
+    """
+    path = os.getenv('SHARED_CACHE_PATH')
+    if path:
+        return SQLiteCache(path, namespace, maxsize, ttl)
+    return TTLCache(maxsize, ttl)
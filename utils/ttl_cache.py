@@ -0,0 +1,84 @@
+"""
+TTL + LRU 인메모리 캐시
+외부 API 응답(비료 처방, 기상 관측 등)을 프로세스 내에서 재사용하기 위한 캐시
+"""
+import threading
+import time
+from collections import OrderedDict
+
+
+class TTLCache:
+    """만료 시간(TTL)과 최대 크기(LRU 제거)를 가지는 스레드 안전 캐시"""
+
+    def __init__(self, maxsize: int = 1024, ttl: float = 3600):
+        """
+        Args:
+            maxsize: 최대 보관 항목 수 (초과 시 가장 오래 사용하지 않은 항목 제거)
+            ttl: 항목 유효 시간 (초)
+        """
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+
+    def get(self, key, default=None):
+        """캐시 조회 (만료된 항목은 제거 후 miss 처리)"""
+        now = time.monotonic()
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None:
+                self.misses += 1
+                return default
+            expires_at, value = entry
+            if expires_at <= now:
+                del self._data[key]
+                self.expirations += 1
+                self.misses += 1
+                return default
+            self._data.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def set(self, key, value, ttl: float = None):
+        """캐시 저장 (ttl을 지정하지 않으면 기본 ttl 사용)"""
+        expires_at = time.monotonic() + (self.ttl if ttl is None else ttl)
+        with self._lock:
+            self._data[key] = (expires_at, value)
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+                self.evictions += 1
+
+    def delete(self, key):
+        """항목 제거"""
+        with self._lock:
+            self._data.pop(key, None)
+
+    def clear(self):
+        """전체 항목 및 통계 초기화"""
+        with self._lock:
+            self._data.clear()
+            self.hits = self.misses = self.evictions = self.expirations = 0
+
+    def __len__(self):
+        return len(self._data)
+
+    def stats(self) -> dict:
+        """캐시 적중/실패 통계 반환"""
+        with self._lock:
+            total = self.hits + self.misses
+            return {
+                "backend": "memory",
+                "size": len(self._data),
+                "maxsize": self.maxsize,
+                "ttl": self.ttl,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "expirations": self.expirations,
+                "hit_rate": round(self.hits / total, 4) if total else 0.0
+            }
@@ -0,0 +1,124 @@
+"""
+버전 스냅샷 저장소 (copy-on-write)
+읽기는 잠금 없이 현재 스냅샷 참조만 가져오고, 쓰기는 새 스냅샷을 만들어 참조를 한 번에 교체
+스냅샷 데이터는 읽기 전용(MappingProxyType, tuple)이라 읽는 쪽에서 수정할 수 없음
+"""
+import threading
+from types import MappingProxyType
+
+
+def freeze(value):
+    """
+    dict/list를 읽기 전용 구조(MappingProxyType/tuple)로 깊은 변환
+
+    이미 변환된 MappingProxyType은 그대로 사용 (이전 스냅샷과 변경되지 않은 부분을 공유)
+    """
+    if isinstance(value, MappingProxyType):
+        return value
+    if isinstance(value, dict):
+        return MappingProxyType({key: freeze(item) for key, item in value.items()})
+    if isinstance(value, (list, tuple)):
+        return tuple(freeze(item) for item in value)
+    return value
+
+
+def thaw(value):
+    """freeze의 역변환 (JSON 응답용 일반 dict/list 복사본)"""
+    if isinstance(value, (dict, MappingProxyType)):
+        return {key: thaw(item) for key, item in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [thaw(item) for item in value]
+    return value
+
+
+class Snapshot:
+    """버전 번호가 붙은 읽기 전용 데이터"""
+    __slots__ = ("version", "data")
+
+    def __init__(self, version, data):
+        self.version = version
+        self.data = data
+
+    def to_dict(self):
+        """데이터의 일반 dict 복사본"""
+        return thaw(self.data)
+
+
+class VersionedStore:
+    """
+    스레드 안전 버전 스냅샷 저장소
+
+    snapshot()은 잠금 없이 현재 스냅샷을 반환한다 (참조 읽기는 원자적).
+    update()는 쓰기끼리만 직렬화하며, 새 스냅샷을 완성한 뒤 참조를 교체하므로
+    읽는 쪽은 항상 이전 또는 새 스냅샷 전체를 보게 된다.
+    """
+
+    def __init__(self, initial):
+        self._snapshot = Snapshot(0, freeze(initial))
+        self._write_lock = threading.Lock()
+
+    def snapshot(self) -> Snapshot:
+        return self._snapshot
+
+    @property
+    def version(self) -> int:
+        return self._snapshot.version
+
+    def update(self, fn, expected_version=None, copy=True):
+        """
+        새 스냅샷 발행
+
+        Args:
+            fn: 현재 데이터 → 새 데이터. None을 반환하면 변경 없음
+                (잠금을 잡은 채 실행되므로 외부 API 호출 등 느린 작업은 밖에서 처리)
+            expected_version: 지정 시 현재 버전과 다르면 발행하지 않음 (낙관적 동시성 제어)
+            copy: True면 fn에 일반 dict 깊은 복사본을 전달, False면 읽기 전용 데이터를 그대로 전달
+                  (fn이 바뀐 부분만 새로 만들고 나머지는 공유하므로 큰 데이터의 쓰기 비용이 작음)
+
+        Returns:
+            (발행 여부, 현재 스냅샷)
+        """
+        with self._write_lock:
+            current = self._snapshot
+            if expected_version is not None and current.version != expected_version:
+                return False, current
+            data = fn(current.to_dict() if copy else current.data)
+            if data is None:
+                return False, current
+            self._snapshot = Snapshot(current.version + 1, freeze(data))
+            return True, self._snapshot
+
+
+class VersionedStoreMap:
+    """
+    키(예: 농장 ID)별 VersionedStore
+
+    저장소는 처음 쓰는 키에만 만든다 (store). 읽기(snapshot)는 없는 키에 대해 initial 데이터의
+    빈 스냅샷을 반환하고 저장소를 만들지 않으므로, 임의의 키 조회로 메모리가 늘지 않는다.
+    키마다 쓰기가 따로 직렬화되므로 서로 다른 키의 쓰기는 경합하지 않는다.
+    """
+
+    def __init__(self, initial):
+        self._initial = initial
+        self._empty = Snapshot(0, freeze(initial))
+        self._stores = {}
+        self._lock = threading.Lock()
+
+    def store(self, key) -> VersionedStore:
+        """키의 저장소 (쓰기용, 없으면 생성)"""
+        store = self._stores.get(key)
+        if store is None:
+            with self._lock:
+                store = self._stores.get(key)
+                if store is None:
+                    store = VersionedStore(self._initial)
+                    self._stores[key] = store
+        return store
+
+    def snapshot(self, key) -> Snapshot:
+        """키의 현재 스냅샷 (읽기용, 저장소가 없으면 만들지 않고 빈 스냅샷)"""
+        store = self._stores.get(key)
+        return store.snapshot() if store is not None else self._empty
+
+    def keys(self):
+        return list(self._stores)